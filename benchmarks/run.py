@@ -0,0 +1,306 @@
+"""
+Latency benchmarks for the public pages.
+
+    python benchmarks/run.py --scales 10 1000 100000 --output bench.json
+
+For each scale a scratch SQLite database is seeded by ``populate_data
+--scale`` with that many projects (each with technologies and gallery
+images), then /, /projects/ and /projects/<id>/ are driven twice: through
+Django's test client in this process, which also counts queries, and over
+HTTP against a gunicorn started on a local port with concurrent keep-alive
+clients. The results
+(p50/p95/p99 latency, throughput, query counts, peak RSS) are written as
+JSON so runs from different commits can be diffed.
+
+The real database, media, static files and caches are never touched:
+DATABASE_URL, MEDIA_ROOT, STATIC_ROOT and CACHE_DIR point into a temporary
+directory, through the environment so the gunicorn server gets them too.
+collectstatic runs there as in a deploy, since production settings serve
+hashed static files.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+WORK_DIR = Path(tempfile.mkdtemp(prefix='portfolio-bench-'))
+DATABASE_PATH = WORK_DIR / 'bench.sqlite3'
+
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE_PATH}'
+os.environ['MEDIA_ROOT'] = str(WORK_DIR / 'media')
+os.environ['STATIC_ROOT'] = str(WORK_DIR / 'static')
+os.environ['CACHE_DIR'] = str(WORK_DIR / 'cache')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio.settings')
+sys.path.insert(0, str(BASE_DIR))
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import caches  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from portfolioapp.models import Project  # noqa: E402
+from portfolioapp.related import SimilarityIndex, rebuild_related_projects  # noqa: E402
+
+# Detail pages are requested round-robin over this many projects
+DETAIL_SAMPLE = 50
+
+
+# -- seeding -----------------------------------------------------------------
+
+def reset_database():
+    connections.close_all()
+    for suffix in ('', '-wal', '-shm'):
+        path = Path(f'{DATABASE_PATH}{suffix}')
+        if path.exists():
+            path.unlink()
+    call_command('migrate', verbosity=0)
+
+
+def seed(scale, images_per_project, seed_number):
+    """Seed ``scale`` projects and the profile sections; returns the detail sample ids"""
+    reset_database()
+    call_command(
+        'populate_data', scale=scale, seed=seed_number, images_per_project=images_per_project,
+        skip_related=True, stdout=open(os.devnull, 'w'),
+    )
+    project_ids = list(Project.objects.values_list('id', flat=True))
+    sample = random.Random(seed_number).sample(project_ids, min(DETAIL_SAMPLE, len(project_ids)))
+    # Only the benchmarked detail pages need their related projects
+    rebuild_related_projects(sample, index=SimilarityIndex())
+    return sample
+
+
+# -- measuring ---------------------------------------------------------------
+
+def summarize(latencies, elapsed):
+    latencies = sorted(latencies)
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+    }
+
+
+def peak_rss_kib():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def bench_client(paths, requests):
+    """Sequential in-process requests; latency includes all middleware"""
+    client = Client()
+    caches['pages'].clear()
+    results = {}
+    for name, urls in paths.items():
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            started = time.perf_counter()
+            response = client.get(urls[0], secure=True)
+            cold = time.perf_counter() - started
+        assert response.status_code == 200, (urls[0], response.status_code)
+        cold_queries = len(primary) + len(replica)
+
+        latencies = []
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            began = time.perf_counter()
+            for number in range(requests):
+                started = time.perf_counter()
+                client.get(urls[number % len(urls)], secure=True)
+                latencies.append(time.perf_counter() - started)
+            elapsed = time.perf_counter() - began
+        results[name] = {
+            **summarize(latencies, elapsed),
+            'cold_ms': round(cold * 1000, 3),
+            'cold_queries': cold_queries,
+            'queries_per_request': round((len(primary) + len(replica)) / requests, 2),
+        }
+    return results
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def process_tree_peak_rss_kib(pid):
+    """Sum of VmHWM over a process and its children (Linux only)"""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as status:
+                for line in status:
+                    if line.startswith('VmHWM:'):
+                        total += int(line.split()[1])
+            with open(f'/proc/{current}/task/{current}/children') as children:
+                pending.extend(int(child) for child in children.read().split())
+        except OSError:
+            if current == pid:
+                return None
+    return total
+
+
+class Server:
+    """gunicorn serving the scratch database on a free local port"""
+
+    def __init__(self, workers, worker_class):
+        self.port = free_port()
+        command = [
+            sys.executable, '-m', 'gunicorn', '--workers', str(workers),
+            '--bind', f'127.0.0.1:{self.port}', '--log-level', 'critical',
+        ]
+        if worker_class == 'asgi':
+            command += ['-k', 'uvicorn_worker.UvicornWorker', 'portfolio.asgi:application']
+        else:
+            command += ['portfolio.wsgi:application']
+        self.process = subprocess.Popen(command, cwd=BASE_DIR, env=os.environ.copy())
+
+    def wait_ready(self, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError('gunicorn exited during startup')
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=0.5).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError('gunicorn did not start listening')
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+def bench_server(server, paths, requests, concurrency):
+    """Concurrent keep-alive HTTP clients against the running server"""
+    results = {}
+    for name, urls in paths.items():
+        local = threading.local()
+        # Proxies mark TLS this way; production settings redirect plain HTTP
+        headers = {'X-Forwarded-Proto': 'https'}
+
+        def fetch(number):
+            if not hasattr(local, 'connection'):
+                local.connection = http.client.HTTPConnection('127.0.0.1', server.port, timeout=60)
+            started = time.perf_counter()
+            local.connection.request('GET', urls[number % len(urls)], headers=headers)
+            response = local.connection.getresponse()
+            response.read()
+            if response.status != 200:
+                raise RuntimeError(f'{urls[number % len(urls)]}: HTTP {response.status}')
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            # Warm every worker's caches and connections first
+            list(pool.map(fetch, range(concurrency * 2)))
+            began = time.perf_counter()
+            latencies = list(pool.map(fetch, range(requests)))
+            elapsed = time.perf_counter() - began
+        results[name] = summarize(latencies, elapsed)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 1000, 100000],
+                        help='Numbers of projects to seed, one run each')
+    parser.add_argument('--images-per-project', type=int, default=3)
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=8, help='HTTP clients against gunicorn')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--worker-class', choices=['asgi', 'wsgi'], default='wsgi',
+                        help='gunicorn entry point; wsgi as in the Procfile')
+    parser.add_argument('--no-server', action='store_true', help='Only run the test client pass')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='JSON file to write; stdout if omitted')
+    args = parser.parse_args()
+
+    call_command('collectstatic', interactive=False, verbosity=0)
+    report = {
+        'commit': git_commit(),
+        'started_at': datetime.now(dt_timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'settings': {key: value for key, value in vars(args).items() if key != 'output'},
+        'scales': [],
+    }
+    try:
+        for scale in args.scales:
+            started = time.perf_counter()
+            sample = seed(scale, args.images_per_project, args.seed)
+            seconds = time.perf_counter() - started
+            paths = {
+                '/': ['/'],
+                '/projects/': ['/projects/'],
+                '/projects/<id>/': [f'/projects/{project_id}/' for project_id in sample],
+            }
+            result = {
+                'projects': scale,
+                'images_per_project': args.images_per_project,
+                'seed_seconds': round(seconds, 2),
+                'client': bench_client(paths, args.requests),
+                # Peak of this process so far, so it only grows across scales
+                'client_peak_rss_kib': peak_rss_kib(),
+            }
+            if not args.no_server:
+                connections.close_all()
+                server = Server(args.workers, args.worker_class)
+                try:
+                    server.wait_ready()
+                    result['server'] = bench_server(server, paths, args.requests, args.concurrency)
+                    result['server_peak_rss_kib'] = process_tree_peak_rss_kib(server.process.pid)
+                finally:
+                    server.stop()
+            report['scales'].append(result)
+            print(f'{scale} projects done', file=sys.stderr)
+    finally:
+        connections.close_all()
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,21 @@ ASGI config for portfolio project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+An alternative to the WSGI entry point the Procfile runs: gunicorn
+manages uvicorn workers, each serving many connections on one event loop,
+so slow clients don't tie up a worker while the async views wait on the
+database:
+
+    gunicorn portfolio.asgi:application -k uvicorn_worker.UvicornWorker
+
+It isn't the default because the middleware stack isn't async-capable
+(FileServingMiddleware is WhiteNoise, sync only), so every request hops
+between the event loop and a thread; benchmarks/run.py measures it slower
+than WSGI on every page. Compare both with ``--worker-class`` before
+switching.
+
+For local development, ``uvicorn portfolio.asgi:application --reload``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,210 @@
+"""
+Per-view budgets for SQL queries and response time.
+
+Views declare what a request may cost with ``@query_budget(queries=4,
+ms=150)`` (on the class for class-based views). The budget counts every
+query and millisecond from the view being called to the response being
+rendered, decorators and template included, so a template that starts
+querying in a loop shows up as a blown budget.
+
+Budgets are checked:
+
+- by QueryBudgetTests, which requests every budgeted page at several data
+  scales and fails with the offending queries; it checks query counts
+  only, as timings depend on the machine running the tests
+- at runtime by QueryBudgetMiddleware when QUERY_BUDGET_LOGGING is on,
+  which logs a JSON line on the ``portfolio.budgets`` logger for each
+  request over its budget
+
+Each recorded query carries its origin: the innermost template line and
+the project's own frames that led to it, e.g.
+``["main/projects.html:117", "portfolioapp/views.py:160 in get_queryset"]``.
+Async views run their queries in worker threads, whose stacks don't
+reach the view's coroutine, so those show only the synchronous frames.
+Walking the stack costs a few microseconds per query, so the middleware
+only records requests to budgeted views while logging is on.
+"""
+import json
+import logging
+import os
+import sys
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger('portfolio.budgets')
+
+# Queries shown per offending request, slowest first
+LOGGED_QUERIES = 20
+ORIGIN_FRAMES = 4
+
+MANAGE_PY = os.path.join(settings.BASE_DIR, 'manage.py')
+
+_current = ContextVar('query_log', default=None)
+
+
+@dataclass(frozen=True)
+class Budget:
+    queries: int
+    ms: float
+
+
+def query_budget(queries, ms):
+    """Declare the most SQL queries and milliseconds a view may take"""
+    def decorator(view):
+        view.query_budget = Budget(queries, ms)
+        return view
+    return decorator
+
+
+def view_budget(view_func):
+    """The Budget declared on a resolved view function, or None"""
+    # as_view() keeps the class on the function it returns
+    view = getattr(view_func, 'view_class', view_func)
+    return getattr(view, 'query_budget', None)
+
+
+def _project_file(filename):
+    """``filename`` relative to BASE_DIR when it's the project's own code"""
+    if 'site-packages' in filename or filename in (__file__, MANAGE_PY):
+        return None
+    base_dir = str(settings.BASE_DIR)
+    if not filename.startswith(base_dir + os.sep):
+        return None
+    return os.path.relpath(filename, base_dir)
+
+
+def query_origin():
+    """Innermost template line and project frames of the running query"""
+    origin = []
+    template_line = None
+    frame = sys._getframe(1)
+    while frame is not None and len(origin) < ORIGIN_FRAMES:
+        code = frame.f_code
+        if code.co_name == 'render_annotated' and template_line is None:
+            # django.template.base.Node.render_annotated; the first one up
+            # the stack is the node that ran the query
+            node = frame.f_locals.get('self')
+            template = getattr(getattr(node, 'origin', None), 'template_name', None)
+            token = getattr(node, 'token', None)
+            if template and token is not None:
+                template_line = f'{template}:{token.lineno}'
+                origin.append(template_line)
+        else:
+            filename = _project_file(code.co_filename)
+            if filename:
+                origin.append(f'{filename}:{frame.f_lineno} in {code.co_name}')
+        frame = frame.f_back
+    return origin
+
+
+class QueryLog:
+    """Queries run while recording, with their duration and origin"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.queries = []
+
+    @property
+    def ms(self):
+        return ((self.finished or time.perf_counter()) - self.started) * 1000
+
+    def over(self, budget):
+        """Descriptions of how this log exceeds ``budget``; empty when within it"""
+        problems = []
+        if len(self.queries) > budget.queries:
+            problems.append(f'{len(self.queries)} queries, budget {budget.queries}')
+        if self.ms > budget.ms:
+            problems.append(f'{self.ms:.1f}ms, budget {budget.ms:g}ms')
+        return problems
+
+    def report(self, limit=LOGGED_QUERIES):
+        """The slowest ``limit`` queries as dicts, for logs and test failures"""
+        return [
+            {'sql': sql[:500], 'ms': round(ms, 2), 'origin': origin}
+            for sql, ms, origin in sorted(self.queries, key=lambda query: -query[1])[:limit]
+        ]
+
+
+def record_query(execute, sql, params, many, context):
+    log = _current.get()
+    if log is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        log.queries.append((sql, (time.perf_counter() - started) * 1000, query_origin()))
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # Same approach as profiling.py: a wrapper on every connection, which
+    # finds the request's log through the context
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder, dispatch_uid='portfolio.budgets')
+for _connection in connections.all(initialized_only=True):
+    install_query_recorder(None, _connection)
+
+
+class record_queries:
+    """
+    Context manager recording the queries run inside it::
+
+        with record_queries() as log:
+            client.get(url)
+        log.over(budget)
+    """
+
+    def __enter__(self):
+        self.log = QueryLog()
+        self.token = _current.set(self.log)
+        return self.log
+
+    def __exit__(self, *exc_info):
+        self.log.finished = time.perf_counter()
+        _current.reset(self.token)
+
+
+class QueryBudgetMiddleware(MiddlewareMixin):
+    """Logs requests to budgeted views that go over their budget"""
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not settings.QUERY_BUDGET_LOGGING:
+            return None
+        budget = view_budget(view_func)
+        if budget is not None:
+            request._query_budget = budget
+            request._query_log = QueryLog()
+            _current.set(request._query_log)
+        return None
+
+    def process_response(self, request, response):
+        log = getattr(request, '_query_log', None)
+        if log is None:
+            return response
+        log.finished = time.perf_counter()
+        # Not reset(): under ASGI this may run in another context copy
+        _current.set(None)
+
+        problems = log.over(request._query_budget)
+        if problems:
+            logger.warning(json.dumps({
+                'method': request.method,
+                'path': request.get_full_path(),
+                'view': request.resolver_match.view_name if request.resolver_match else None,
+                'status': response.status_code,
+                'over_budget': problems,
+                'query_count': len(log.queries),
+                'ms': round(log.ms, 2),
+                'queries': log.report(),
+            }))
+        return response
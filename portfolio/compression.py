@@ -0,0 +1,169 @@
+"""
+Brotli and gzip compression of dynamic responses.
+
+Replaces Django's GZipMiddleware. WhiteNoise already serves static files
+precompressed, so this only sees HTML, JSON and other text from views.
+The encoding is negotiated from Accept-Encoding, brotli first when the
+``brotli`` package is installed.
+
+Pages from conditional_page views are compressed once per content
+version: their ETag only changes with the data, so the compressed bytes
+are kept in the page cache under the ETag, the URL and the encoding, and
+pages served from cache_page, or re-rendered with the same data, reuse
+them. The page cache is cleared on every data change, so that level is
+only a little above the per-request one; brotli's top quality costs tens
+of milliseconds on a 50 KB page, more than rendering it. Other responses,
+including ones ConditionalGetMiddleware gave an ETag from the body, are
+compressed per request at a fast level and not kept, and streaming
+responses chunk by chunk, flushing after each so the client gets them as
+they come.
+
+Responses that set cookies or vary on them may carry per-visitor secrets
+(CSRF tokens in the admin), which compression can leak (BREACH), so they
+are left alone.
+"""
+import gzip
+import hashlib
+import zlib
+
+from django.core.cache import caches
+from django.utils.cache import has_vary_header, patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from portfolioapp.cache import PAGE_CACHE_ALIAS, page_cache_timeout
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+)
+# Not worth the header and the CPU below this
+MIN_LENGTH = 200
+# (brotli quality, gzip level) for cached and for per-request compression
+CACHED_LEVELS = (8, 9)
+FAST_LEVELS = (5, 6)
+
+
+def negotiate(accept_encoding):
+    """The preferred encoding the client accepts, or None"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, *params = part.split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(content, encoding, levels=FAST_LEVELS):
+    brotli_quality, gzip_level = levels
+    if encoding == 'br':
+        return brotli.compress(content, quality=brotli_quality)
+    # mtime=0 so the same content always gives the same bytes
+    return gzip.compress(content, compresslevel=gzip_level, mtime=0)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding):
+        brotli_quality, gzip_level = FAST_LEVELS
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=brotli_quality)
+            self.compress = compressor.process
+            self.flush = compressor.flush
+            self.finish = compressor.finish
+        else:
+            compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self.compress = compressor.compress
+            self.flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = compressor.flush
+
+    def chunk(self, data):
+        return self.compress(data) + self.flush()
+
+
+def compress_stream(chunks, encoding):
+    compressor = _StreamCompressor(encoding)
+    for data in chunks:
+        if data:
+            yield compressor.chunk(data)
+    yield compressor.finish()
+
+
+async def compress_async_stream(chunks, encoding):
+    compressor = _StreamCompressor(encoding)
+    async for data in chunks:
+        if data:
+            yield compressor.chunk(data)
+    yield compressor.finish()
+
+
+def _cache_key(request, etag, encoding):
+    url = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'compressed:{encoding}:{url}:{etag.strip(chr(34))}'
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+    if not content_type.startswith(COMPRESSIBLE_TYPES):
+        return False
+    if response.has_header('Content-Encoding'):
+        return False
+    if response.cookies or has_vary_header(response, 'Cookie'):
+        return False
+    return response.streaming or len(response.content) >= MIN_LENGTH
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Should come after WhiteNoise and before anything that reads the body"""
+
+    def process_response(self, request, response):
+        if not is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            # The compressed size is only known once it's all sent
+            del response.headers['Content-Length']
+        else:
+            etag = response.get('ETag')
+            if etag and response.status_code == 200 and getattr(response, 'content_versioned', False):
+                cache = caches[PAGE_CACHE_ALIAS]
+                key = _cache_key(request, etag, encoding)
+                compressed = cache.get(key)
+                if compressed is None:
+                    compressed = compress(response.content, encoding, CACHED_LEVELS)
+                    cache.set(key, compressed, page_cache_timeout())
+            else:
+                compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The compressed body isn't byte-identical to what a strong ETag
+        # promised; a weak one still matches If-None-Match
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
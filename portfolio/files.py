@@ -0,0 +1,136 @@
+"""
+Serving static and media files, in production as well as DEBUG.
+
+FileServingMiddleware is WhiteNoise's middleware (static files, including
+the résumé PDF) extended to MEDIA_ROOT under MEDIA_URL, so uploads no
+longer depend on django.conf.urls.static, which only works with DEBUG on.
+Both get WhiteNoise's handling:
+
+- ETag and Last-Modified from the file's mtime and size, with 304s
+- single byte-range requests (206), e.g. PDF viewers and video seeking
+- long-lived ``immutable`` caching for content-hashed names: the manifest
+  names of collected static files, and the names ContentHashedStorage
+  gives uploads and their derivatives (``<hash>.png``,
+  ``<hash>.w640.webp``) when it's the media storage; other media files,
+  whose names could be reused for new content, get MEDIA_MAX_AGE
+
+WhiteNoise ignores Range on precompressed variants, which breaks ranged
+reads of the PDF, so range requests are answered from the uncompressed
+file.
+
+File bodies aren't read in Python when it can be avoided. Under WSGI the
+response goes through wsgi.file_wrapper, which gunicorn serves with
+sendfile(). ASGI has no such path, so behind nginx or Apache set
+SENDFILE_HEADER and the body is handed to the front server
+(X-Accel-Redirect or X-Sendfile), which also does its own ranges. nginx
+gets internal URIs under SENDFILE_URL_PREFIX, ``media/`` for MEDIA_ROOT
+and ``static/`` for STATIC_ROOT, wherever those are; files outside both,
+e.g. from the static finders in development, are sent by Django.
+"""
+import os
+import posixpath
+from urllib.parse import quote, urlparse
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import HttpResponse
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import NotARegularFileError
+from whitenoise.string_utils import ensure_leading_trailing_slash
+
+from .storage import HASHED_NAME_RE, VARIANT_NAME_RE
+
+
+class FileServingMiddleware(WhiteNoiseMiddleware):
+    """Replaces WhiteNoiseMiddleware in MIDDLEWARE, in the same position"""
+
+    def __init__(self, get_response=None, settings=settings):
+        # Set first: WhiteNoise builds the static file headers while it
+        # initialises, through add_cache_headers
+        self.media_prefix = ensure_leading_trailing_slash(urlparse(settings.MEDIA_URL).path)
+        self.media_root = os.path.abspath(settings.MEDIA_ROOT) + os.sep
+        self.media_max_age = settings.MEDIA_MAX_AGE
+        self.sendfile_header = settings.SENDFILE_HEADER
+        self.sendfile_roots = [(self.media_root, settings.SENDFILE_URL_PREFIX + 'media/')]
+        if settings.STATIC_ROOT:
+            self.sendfile_roots.append(
+                (os.path.abspath(settings.STATIC_ROOT) + os.sep, settings.SENDFILE_URL_PREFIX + 'static/')
+            )
+        super().__init__(get_response, settings)
+
+    def __call__(self, request):
+        if request.path_info.startswith(self.media_prefix):
+            media_file = self.find_media_file(request.path_info)
+            if media_file is not None:
+                return self.serve(media_file, request)
+            return self.get_response(request)
+        return super().__call__(request)
+
+    def find_media_file(self, url):
+        # Looked up per request: uploads arrive while the process runs
+        if not self.url_is_canonical(url):
+            return None
+        path = os.path.join(self.media_root, url[len(self.media_prefix):])
+        if not self.path_is_child_of(path, self.media_root):
+            return None
+        try:
+            return self.get_static_file(path, url)
+        except NotARegularFileError:
+            return None
+
+    def add_cache_headers(self, headers, path, url):
+        # WhiteNoise answers ranges without saying so; clients that resume
+        # downloads or seek look for this first
+        headers['Accept-Ranges'] = 'bytes'
+        if url.startswith(self.media_prefix) and not self.immutable_file_test(path, url):
+            headers['Cache-Control'] = f'max-age={self.media_max_age}, public'
+        else:
+            super().add_cache_headers(headers, path, url)
+
+    def immutable_file_test(self, path, url):
+        if url.startswith(self.media_prefix):
+            # Only a content-hashed storage guarantees a name never gets
+            # other content
+            if not getattr(default_storage, 'deduplicates', False):
+                return False
+            name = posixpath.basename(url)
+            return bool(HASHED_NAME_RE.match(name) or VARIANT_NAME_RE.match(name))
+        return super().immutable_file_test(path, url)
+
+    def serve(self, static_file, request):
+        if request.META.get('HTTP_RANGE'):
+            # Ranges are only honoured on the uncompressed file
+            request.META = {**request.META, 'HTTP_ACCEPT_ENCODING': ''}
+        if self.sendfile_header and request.method == 'GET' and not static_file.is_not_modified(request.META):
+            response = self.hand_off(static_file, request)
+            if response is not None:
+                return response
+        return super().serve(static_file, request)
+
+    def internal_uri(self, path):
+        """nginx's internal URI for ``path``, or None if it's under neither root"""
+        for root, prefix in self.sendfile_roots:
+            if path.startswith(root):
+                return quote(prefix + path[len(root):].replace(os.sep, '/'))
+        return None
+
+    def hand_off(self, static_file, request):
+        """
+        Empty response telling the front server which file to send, or
+        None if it can't reach the file
+        """
+        path, headers = static_file.get_path_and_headers(request.META)
+        if self.sendfile_header == 'X-Accel-Redirect':
+            target = self.internal_uri(path)
+            if target is None:
+                return None
+        else:
+            target = path
+        response = HttpResponse()
+        del response['Content-Type']
+        for key, value in headers:
+            # The front server sets the length of what it actually sends
+            if key != 'Content-Length':
+                response[key] = value
+        response[self.sendfile_header] = target
+        return response
@@ -0,0 +1,169 @@
+"""
+Opt-in per-request profiling.
+
+A request is profiled when it's picked by PROFILING_SAMPLE_RATE or sends
+``X-Profile: <PROFILING_TOKEN>``. Profiled requests get a Server-Timing
+header (shown in the browser's network panel) and a JSON log line on the
+``portfolio.profiling`` logger with:
+
+- the number of SQL queries and the time spent in them, over all aliases
+- view and template render time, and the total
+- the change in allocated memory blocks, which is process-wide, so
+  concurrent requests blur it
+
+With PROFILING_PROFILE_DIR set, profiled requests also run under cProfile.
+Those slower than PROFILING_SLOW_MS are saved as .prof files, keeping the
+newest PROFILING_MAX_PROFILES. cProfile only sees the thread that handles
+the request, so for async views mostly the middleware and rendering.
+"""
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger('portfolio.profiling')
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+
+_current = ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.allocated_blocks = sys.getallocatedblocks()
+        self.queries = 0
+        self.query_time = 0.0
+        self.view_started = None
+        self.view_finished = None
+        self.render_finished = None
+        self.profiler = None
+
+    def timings(self):
+        """``{name: milliseconds}`` of the request so far"""
+        now = time.perf_counter()
+        timings = {'db': self.query_time * 1000}
+        if self.view_started is not None:
+            view_finished = self.view_finished or now
+            timings['view'] = (view_finished - self.view_started) * 1000
+            if self.render_finished is not None:
+                timings['render'] = (self.render_finished - view_finished) * 1000
+        timings['total'] = (now - self.started) * 1000
+        return timings
+
+
+def record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.query_time += time.perf_counter() - started
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # Connections are per thread, so the wrapper goes on each new one and
+    # finds the request's profile through the context
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder, dispatch_uid='portfolio.profiling')
+for _connection in connections.all(initialized_only=True):
+    install_query_recorder(None, _connection)
+
+
+def should_profile(request):
+    token = settings.PROFILING_TOKEN
+    if token and request.META.get(PROFILE_HEADER) == token:
+        return True
+    return random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+def save_profile(profiler, request, total_ms):
+    directory = settings.PROFILING_PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'index'
+    name = f'{time.strftime("%Y%m%d-%H%M%S")}-{request.method}-{slug}-{int(total_ms)}ms.prof'
+    profiler.dump_stats(os.path.join(directory, name))
+
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith('.prof')),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in profiles[:-settings.PROFILING_MAX_PROFILES]:
+        os.remove(entry.path)
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    """Should come first in MIDDLEWARE so "total" covers the whole stack"""
+
+    def process_request(self, request):
+        if not should_profile(request):
+            return None
+        profile = RequestProfile()
+        request._profile = profile
+        _current.set(profile)
+        if settings.PROFILING_PROFILE_DIR:
+            profile.profiler = cProfile.Profile()
+            try:
+                profile.profiler.enable()
+            except ValueError:
+                # Another request in this process is already being profiled
+                profile.profiler = None
+        return None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = getattr(request, '_profile', None)
+        if profile is not None:
+            profile.view_started = time.perf_counter()
+        return None
+
+    def process_template_response(self, request, response):
+        profile = getattr(request, '_profile', None)
+        if profile is not None:
+            profile.view_finished = time.perf_counter()
+
+            def rendered(response):
+                profile.render_finished = time.perf_counter()
+            response.add_post_render_callback(rendered)
+        return response
+
+    def process_response(self, request, response):
+        profile = getattr(request, '_profile', None)
+        if profile is None:
+            return response
+        if profile.profiler is not None:
+            profile.profiler.disable()
+        # Not reset(): under ASGI this may run in another context copy
+        _current.set(None)
+
+        timings = profile.timings()
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={duration:.1f}' + (f';desc="{profile.queries} queries"' if name == 'db' else '')
+            for name, duration in timings.items()
+        )
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.queries,
+            **{f'{name}_ms': round(duration, 2) for name, duration in timings.items()},
+            'allocated_blocks': sys.getallocatedblocks() - profile.allocated_blocks,
+        }))
+        if profile.profiler is not None and timings['total'] >= settings.PROFILING_SLOW_MS:
+            save_profile(profile.profiler, request, timings['total'])
+        return response
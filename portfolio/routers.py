@@ -0,0 +1,95 @@
+"""
+Database routing between the primary and the read replica.
+
+Everything reads from and writes to the primary ('default') except views
+wrapped in @replica_reads, the public pages, whose reads go to 'replica'.
+After a browser sends a write (any unsafe request, e.g. an admin save),
+primary_stickiness_middleware sets a short-lived cookie that keeps its
+public page views on the primary, so the editor sees their change even if
+the replica lags behind.
+"""
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.utils.decorators import sync_and_async_middleware
+
+PRIMARY_ALIAS = 'default'
+REPLICA_ALIAS = 'replica'
+STICKY_COOKIE = 'primary_until'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # Reads inside a transaction on the primary stay on it, so they see
+        # its uncommitted writes
+        if _replica_reads.get() and not connections[PRIMARY_ALIAS].in_atomic_block:
+            return REPLICA_ALIAS
+        return PRIMARY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary through replication;
+        # migrate --database=replica must not create tables on it
+        return db == PRIMARY_ALIAS
+
+
+def is_sticky(request):
+    """Whether ``request`` comes from a browser that wrote recently"""
+    try:
+        return float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def replica_reads(view):
+    """Route the view's reads to the replica unless the browser is sticky"""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            token = _replica_reads.set(not is_sticky(request))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+    else:
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            token = _replica_reads.set(not is_sticky(request))
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+    return inner
+
+
+def _mark_sticky(request, response):
+    if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+        seconds = settings.REPLICA_STICKY_SECONDS
+        response.set_cookie(
+            STICKY_COOKIE, str(time.time() + seconds), max_age=seconds,
+            httponly=True, samesite='Lax', secure=request.is_secure(),
+        )
+    return response
+
+
+@sync_and_async_middleware
+def primary_stickiness_middleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return _mark_sticky(request, await get_response(request))
+    else:
+        def middleware(request):
+            return _mark_sticky(request, get_response(request))
+    return middleware
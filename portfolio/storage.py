@@ -0,0 +1,155 @@
+"""
+Storages for static files and uploads.
+
+Static: the files under static/css and static/js are the readable sources;
+at collectstatic time they're minified in STATIC_ROOT, and the minified
+copies are what gets hashed into the manifest and precompressed by
+WhiteNoise, so browsers can cache them forever.
+
+Media: uploads are named after their content (ContentHashedStorage), so
+identical uploads share one file and every media URL can be cached forever.
+"""
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+CSS_SPACE_RE = re.compile(r'\s+')
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+CSS_COLON_RE = re.compile(r':\s+')
+
+
+def minify_css(source):
+    css = CSS_COMMENT_RE.sub('', source)
+    css = CSS_SPACE_RE.sub(' ', css)
+    css = CSS_PUNCTUATION_RE.sub(r'\1', css)
+    css = CSS_COLON_RE.sub(':', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    """
+    Conservative minification: drop indentation, blank lines and whole-line
+    comments. Line breaks are kept so automatic semicolon insertion is
+    unaffected, and template literals are left alone.
+    """
+    lines = []
+    in_template = False
+    for line in source.splitlines():
+        if in_template:
+            lines.append(line)
+        else:
+            stripped = line.strip()
+            if stripped and not stripped.startswith('//'):
+                lines.append(stripped)
+        if line.count('`') % 2:
+            in_template = not in_template
+    return '\n'.join(lines) + '\n'
+
+
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+
+class MinifiedStaticFilesMixin:
+    # Only our own sources; vendored files arrive already minified
+    minify_prefixes = ('css/', 'js/')
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for path in paths:
+                if self.minify(path):
+                    # The manifest storage hashes and copies from the source
+                    # storage given here; point it at the minified copy
+                    paths[path] = (self, path)
+        yield from super().post_process(paths, dry_run, **options)
+
+    def minify(self, path):
+        """Minify the collected copy of ``path`` in place; False if it's left as is"""
+        extension = path[path.rfind('.'):]
+        if extension not in MINIFIERS or '.min.' in path or not path.startswith(self.minify_prefixes):
+            return False
+        with self.open(path) as source:
+            original = source.read().decode('utf-8')
+        minified = MINIFIERS[extension](original)
+        with open(self.path(path), 'w', encoding='utf-8') as target:
+            target.write(minified)
+        return True
+
+
+class MinifiedCompressedManifestStaticFilesStorage(MinifiedStaticFilesMixin,
+                                                   CompressedManifestStaticFilesStorage):
+    pass
+
+
+# Hex digits of the SHA-256 kept in names; 128 bits won't collide
+HASH_LENGTH = 32
+HASHED_NAME_RE = re.compile(rf'^[0-9a-f]{{{HASH_LENGTH}}}\.[^./]+$')
+# Variants of a stored file, such as image derivatives, are named after it:
+# "<hash>.w640.webp"
+VARIANT_NAME_RE = re.compile(rf'^[0-9a-f]{{{HASH_LENGTH}}}\.[^/]+\.[^./]+$')
+
+
+def is_hashed_name(name):
+    return bool(HASHED_NAME_RE.match(posixpath.basename(name)))
+
+
+class ContentHashedStorage(FileSystemStorage):
+    """
+    File system storage naming each file by its content:
+    ``project_images/shot.png`` is stored as ``project_images/<hash>.png``.
+
+    Saving content that's already stored returns the existing name without
+    writing anything, and a name never points at different content, so
+    URLs are immutable. Every save() is hashed, whatever the name given;
+    only save_variant(), used by the code deriving files from stored ones
+    (``<hash>.w640.webp``), picks its own name.
+
+    Files may be shared by several rows, so code deleting a file has to
+    check ``deduplicates`` first.
+    """
+    deduplicates = True
+
+    def __init__(self, **kwargs):
+        # Two saves of one name can only be the same bytes, or the same
+        # derivative of them; rewriting is harmless and avoids
+        # "<hash>_AbCdEf1.png" names on a race
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
+
+    def save_variant(self, name, content):
+        """
+        Store a file derived from a stored one under ``name``, which must
+        be the source's hash with a suffix: ``<hash>.w640.webp``.
+        """
+        if not VARIANT_NAME_RE.match(posixpath.basename(name)):
+            raise ValueError(f"Not a variant name: {name}")
+        return super().save(name, content)
+
+    def hashed_name(self, name, content):
+        """``name`` with its file name replaced by the digest of ``content``"""
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        directory, basename = posixpath.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        return posixpath.join(directory, digest.hexdigest()[:HASH_LENGTH] + extension)
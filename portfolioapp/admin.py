@@ -1,6 +1,7 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import Project, Skill, Experience, Education, Certification,ProjectImage
+from .models import Project, Skill, Experience, Education, Certification,ProjectImage, Technology, ProjectTechnology, Job
 
 
 
@@ -36,11 +37,37 @@ class EducationAdmin(admin.ModelAdmin):
 class CertificationAdmin(admin.ModelAdmin):
     list_display = ['title', 'issuer', 'completion_date']
 
+@admin.register(Technology)
+class TechnologyAdmin(admin.ModelAdmin):
+    list_display = ['name', 'slug', 'category']
+    search_fields = ['name']
+    prepopulated_fields = {'slug': ['name']}
+
+class ProjectTechnologyInline(admin.TabularInline):
+    model = ProjectTechnology
+    extra = 1
+    autocomplete_fields = ['technology']
+
 class ProjectImageInline(admin.TabularInline):
     model = ProjectImage
     extra = 1
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
-    inlines = [ProjectImageInline]
-    list_display = ['title', 'featured', 'created_at']
\ No newline at end of file
+    inlines = [ProjectTechnologyInline, ProjectImageInline]
+    list_display = ['title', 'featured', 'created_at']
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'target', 'status', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'task']
+    readonly_fields = ['task', 'payload', 'attempts', 'error', 'created_at', 'started_at', 'finished_at']
+    actions = ['retry']
+
+    def target(self, obj):
+        return ', '.join(f'{key}={value}' for key, value in obj.payload.items())
+
+    @admin.action(description='Retry selected jobs')
+    def retry(self, request, queryset):
+        queryset.exclude(status=Job.RUNNING).update(status=Job.PENDING, attempts=0, run_after=timezone.now())
+
@@ -0,0 +1,245 @@
+"""
+Read-only JSON API over the portfolio data.
+
+    GET /api/projects/          newest first, ?cursor= paginated, ?limit= per page
+                                and the listing's ?technology=/?year=/?featured=
+    GET /api/projects/<id>/     one project with its images and related projects
+    GET /api/profile/           personal info, skills, experience, education
+                                and certifications
+
+Rows are read with .values() and shaped by the field tables below, so no
+model instances are built. ``?fields=title,technologies`` returns only
+those fields, and only their columns and relations are queried; unknown
+fields are a 400. Responses carry the same validators as the HTML pages
+(see conditional.py), so clients can revalidate with If-None-Match, and
+are compressed by CompressionMiddleware.
+"""
+from functools import wraps
+
+from django.core.files.storage import default_storage
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_safe
+
+from portfolio.budgets import query_budget
+from portfolio.routers import replica_reads
+from .conditional import conditional_page
+from .facets import filter_projects
+from .forms import ProjectFilterForm
+from .models import (
+    Certification, Education, Experience, Project, ProjectImage, ProjectTechnology, RelatedProject, Skill,
+)
+from .pagination import paginate_by_cursor
+from .views import PERSONAL_INFO, profile_content, project_detail_content, projects_content
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# Clients may reuse a response this long before revalidating it
+API_MAX_AGE = 60
+
+
+def media_url(name):
+    return default_storage.url(name) if name else None
+
+
+def isoformat(value):
+    return value.isoformat() if value else None
+
+
+def project_url(project_id):
+    return reverse('api_project', kwargs={'project_id': project_id})
+
+
+# API field: (column read with .values(), converter or None)
+PROJECT_COLUMNS = {
+    'id': ('id', None),
+    'title': ('title', None),
+    'short_description': ('short_description', None),
+    'description': ('description', None),
+    'image': ('image', media_url),
+    'project_url': ('project_url', None),
+    'github_url': ('github_url', None),
+    'featured': ('featured', None),
+    'created_at': ('created_at', isoformat),
+    'updated_at': ('updated_at', isoformat),
+    'url': ('id', project_url),
+}
+
+
+def project_technologies(project_ids):
+    names = {project_id: [] for project_id in project_ids}
+    rows = (
+        ProjectTechnology.objects.filter(project_id__in=project_ids)
+        .order_by('technology__name').values_list('project_id', 'technology__name')
+    )
+    for project_id, name in rows:
+        names[project_id].append(name)
+    return names
+
+
+def project_images(project_ids):
+    images = {project_id: [] for project_id in project_ids}
+    rows = (
+        ProjectImage.objects.filter(project_id__in=project_ids)
+        .order_by('order', 'id').values_list('project_id', 'image', 'caption')
+    )
+    for project_id, image, caption in rows:
+        images[project_id].append({'url': media_url(image), 'caption': caption})
+    return images
+
+
+def related_projects(project_ids):
+    related = {project_id: [] for project_id in project_ids}
+    rows = (
+        RelatedProject.objects.filter(project_id__in=project_ids)
+        .order_by('project_id', 'rank').values_list('project_id', 'related_id', 'related__title')
+    )
+    for project_id, related_id, title in rows:
+        related[project_id].append({'id': related_id, 'title': title, 'url': project_url(related_id)})
+    return related
+
+
+# API field: function of the page's project ids returning {id: value},
+# one query per page rather than one per project
+PROJECT_RELATIONS = {
+    'technologies': project_technologies,
+    'images': project_images,
+    'related': related_projects,
+}
+
+PROJECT_LIST_FIELDS = [
+    'id', 'title', 'short_description', 'image', 'project_url', 'github_url',
+    'featured', 'created_at', 'technologies', 'url',
+]
+PROJECT_DETAIL_FIELDS = [*PROJECT_COLUMNS, *PROJECT_RELATIONS]
+
+
+def profile_section(queryset, columns, converters={}):
+    def load():
+        return [
+            {name: converters[name](value) if name in converters else value for name, value in row.items()}
+            for row in queryset.values(*columns)
+        ]
+    return load
+
+
+# API field: function returning its value, only called when requested
+PROFILE_FIELDS = {
+    **{name: (lambda value=value: value) for name, value in PERSONAL_INFO.items()},
+    'skills': profile_section(Skill.objects.order_by('category', 'name'), ['name', 'category', 'proficiency']),
+    'experiences': profile_section(
+        Experience.objects.order_by('-id'),
+        ['title', 'company', 'company_logo', 'description', 'start_date', 'end_date', 'current'],
+        {'company_logo': media_url},
+    ),
+    'education': profile_section(Education.objects.order_by('id'), ['degree', 'institution', 'score', 'year']),
+    'certifications': profile_section(
+        Certification.objects.order_by('id'), ['title', 'issuer', 'completion_date'],
+    ),
+}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def requested_fields(request, available, default):
+    """The fields named in ?fields=, in the order given, or ``default``"""
+    fields = [name.strip() for name in request.GET.get('fields', '').split(',') if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise BadRequest(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}")
+    return list(dict.fromkeys(fields)) or default
+
+
+def serialize_projects(rows, fields):
+    """Shape .values() rows of projects into API objects with ``fields``"""
+    project_ids = [row['id'] for row in rows]
+    relations = {
+        name: PROJECT_RELATIONS[name](project_ids) for name in fields if name in PROJECT_RELATIONS
+    }
+    results = []
+    for row in rows:
+        result = {}
+        for name in fields:
+            if name in relations:
+                result[name] = relations[name][row['id']]
+            else:
+                column, convert = PROJECT_COLUMNS[name]
+                result[name] = convert(row[column]) if convert else row[column]
+        results.append(result)
+    return results
+
+
+def project_columns(fields, *required):
+    return list(dict.fromkeys(
+        [*required, *(PROJECT_COLUMNS[name][0] for name in fields if name in PROJECT_COLUMNS)]
+    ))
+
+
+def api_view(get_querysets):
+    """
+    Read-only, revalidatable JSON view reading from the replica.
+    BadRequest raised by the view becomes a 400.
+    """
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            try:
+                return view(request, *args, **kwargs)
+            except BadRequest as error:
+                return JsonResponse({'error': str(error)}, status=400)
+        decorators = [
+            require_safe, cache_control(public=True, max_age=API_MAX_AGE),
+            replica_reads, conditional_page(get_querysets),
+        ]
+        for decorate in reversed(decorators):
+            inner = decorate(inner)
+        return inner
+    return decorator
+
+
+# Validators, one page and a query per requested relation
+@query_budget(queries=5, ms=100)
+@api_view(projects_content)
+def project_list(request):
+    fields = requested_fields(request, [*PROJECT_COLUMNS, *PROJECT_RELATIONS], PROJECT_LIST_FIELDS)
+    try:
+        limit = min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        raise BadRequest("limit must be a number")
+
+    queryset = filter_projects(Project.objects.all(), **ProjectFilterForm(request.GET).filters())
+    # created_at and id are always read for the cursor
+    rows, next_cursor = paginate_by_cursor(
+        queryset.values(*project_columns(fields, 'id', 'created_at')),
+        request.GET.get('cursor'), limit,
+    )
+    next_url = None
+    if next_cursor:
+        query = request.GET.copy()
+        query['cursor'] = next_cursor
+        next_url = f"{request.path}?{query.urlencode()}"
+    return JsonResponse({
+        'results': serialize_projects(rows, fields),
+        'next_cursor': next_cursor,
+        'next': next_url,
+    })
+
+
+@query_budget(queries=5, ms=100)
+@api_view(project_detail_content)
+def project_detail(request, project_id):
+    fields = requested_fields(request, PROJECT_DETAIL_FIELDS, PROJECT_DETAIL_FIELDS)
+    rows = list(Project.objects.filter(id=project_id).values(*project_columns(fields, 'id')))
+    if not rows:
+        return JsonResponse({'error': "No project found matching the query"}, status=404)
+    return JsonResponse(serialize_projects(rows, fields)[0])
+
+
+@query_budget(queries=5, ms=100)
+@api_view(profile_content)
+def profile(request):
+    fields = requested_fields(request, list(PROFILE_FIELDS), list(PROFILE_FIELDS))
+    return JsonResponse({name: PROFILE_FIELDS[name]() for name in fields})
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PortfolioappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'portfolioapp'
+
+    def ready(self):
+        # Connect cache invalidation handlers and register background tasks
+        from . import signals, tasks  # noqa: F401
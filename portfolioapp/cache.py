@@ -0,0 +1,98 @@
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.middleware.cache import CacheMiddleware
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import decorator_from_middleware_with_args
+
+from portfolio.routers import is_sticky
+
+from .models import Project
+
+
+# Cache alias that holds full rendered pages (see CACHES in settings.py)
+PAGE_CACHE_ALIAS = 'pages'
+
+
+def page_cache_timeout():
+    """Seconds a rendered page may be served from the page cache"""
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 15)
+
+
+def clear_page_cache():
+    """Drop every cached page so the next request renders fresh data"""
+    caches[PAGE_CACHE_ALIAS].clear()
+
+
+class PageCacheMiddleware(CacheMiddleware):
+    """
+    cache_page's middleware, except that a browser that just wrote (see
+    portfolio.routers) never gets a cached page: it may have been rendered
+    from a replica that hadn't caught up. Its page, read from the primary,
+    replaces the cached one instead.
+    """
+    def process_request(self, request):
+        if is_sticky(request):
+            # Tells process_response to store the page
+            request._cache_update_cache = True
+            return None
+        return super().process_request(request)
+
+
+def cache_public_page(view):
+    """Serve ``view`` from the page cache for PAGE_CACHE_TIMEOUT, like cache_page"""
+    return decorator_from_middleware_with_args(PageCacheMiddleware)(
+        page_timeout=page_cache_timeout(), cache_alias=PAGE_CACHE_ALIAS
+    )(view)
+
+
+def revalidated(view):
+    """
+    Have clients revalidate every use of a page served by cache_page, which
+    gives responses a max-age of the server-side timeout. Only the server's
+    copy is cleared when data changes; an ETag keeps revalidating cheap.
+    """
+    def patch(response):
+        patch_cache_control(response, no_cache=True, max_age=0)
+        response.headers.pop('Expires', None)
+
+    def finish(response):
+        # cache_page stores a template response once it's rendered; patch
+        # after that, or it won't store a no-cache response
+        if getattr(response, 'is_rendered', True):
+            patch(response)
+        else:
+            response.add_post_render_callback(patch)
+        return response
+
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            return finish(await view(request, *args, **kwargs))
+    else:
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            return finish(view(request, *args, **kwargs))
+    return inner
+
+
+def project_version(project):
+    """
+    Version of a project's cached fragments: its updated_at.
+
+    It's loaded with the row, so costs no lookup, and lives in the
+    database, so a change made by one process is seen by all of them.
+    """
+    return project.updated_at.isoformat()
+
+
+def bump_project_version(*project_ids):
+    """
+    Invalidate every fragment rendered for these projects, after a change
+    to something their cards show besides the project row itself
+    """
+    # update() doesn't send signals, so this doesn't invalidate itself
+    Project.objects.filter(pk__in=project_ids).update(updated_at=timezone.now())
@@ -0,0 +1,140 @@
+"""
+Validators for conditional GET.
+
+A page's ETag and Last-Modified come from the rows it renders: the newest
+updated_at and the number of rows, so deleting a row changes them too.
+Both are read for every table a page uses in one query, once per request,
+and a matching request gets a 304 before the view renders.
+
+Each is a scalar subquery of its own, ``SELECT MAX(updated_at)`` and
+``SELECT COUNT(*)``, which the database answers from the updated_at index
+and the table's row count without visiting the rows; one query computing
+both scans the whole index.
+"""
+import hashlib
+import os
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+from operator import itemgetter
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.models import DateTimeField, F, Func, IntegerField, Value
+from django.views.decorators.http import condition
+
+LATEST = Func(F('updated_at'), function='MAX')
+ROWS = Func(template='COUNT(*)', output_field=IntegerField())
+
+
+def release_time():
+    """
+    When the templates or static bundles last changed.
+
+    Those change on deploy without touching any row, so pages are never
+    older than this. It's read from the files, so every process serving
+    one release agrees on it.
+    """
+    paths = [os.path.join(settings.STATIC_ROOT, 'staticfiles.json')]
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for root, _, files in os.walk(directory):
+            paths.extend(os.path.join(root, name) for name in files)
+    mtimes = [os.path.getmtime(path) for path in paths if os.path.exists(path)]
+    return datetime.fromtimestamp(max(mtimes, default=0), dt_timezone.utc).replace(microsecond=0)
+
+
+RELEASED_AT = release_time()
+
+
+def _scalar(queryset, expression, connection):
+    sql, params = queryset.order_by().values(value=expression).query.get_compiler(
+        connection=connection
+    ).as_sql()
+    return f'({sql})', params
+
+
+def content_state(querysets, not_before=RELEASED_AT):
+    """
+    ``(etag, last_modified)`` for the rows of ``querysets``.
+
+    Both are None when the first queryset is empty, which is the page's
+    main object not existing, so the view can 404 as usual. Pass
+    ``not_before=None`` for validators that only depend on the data.
+    """
+    connection = connections[querysets[0].db]
+    selects, params = [], []
+    for position, queryset in enumerate(querysets):
+        latest_sql, latest_params = _scalar(queryset, LATEST, connection)
+        rows_sql, rows_params = _scalar(queryset, ROWS, connection)
+        # The constant tags the row, as UNION ALL doesn't promise order
+        selects.append(f'SELECT {latest_sql}, {rows_sql}, {position}')
+        params.extend([*latest_params, *rows_params])
+    with connection.cursor() as cursor:
+        cursor.execute(' UNION ALL '.join(selects), params)
+        results = sorted(cursor.fetchall(), key=itemgetter(2))
+
+    # Raw rows skip the ORM's conversions, e.g. SQLite's text datetimes
+    output = Value(None, output_field=DateTimeField())
+    converters = connection.ops.get_db_converters(output)
+    rows = []
+    for latest, count, _ in results:
+        for convert in converters:
+            latest = convert(latest, output, connection)
+        rows.append((latest, count))
+    if not rows[0][1]:
+        return None, None
+
+    timestamps = [latest for latest, _ in rows if latest]
+    if not_before:
+        timestamps.append(not_before)
+    newest = max(timestamps)
+    fingerprint = f"{settings.RELEASE_ID}:{newest.isoformat()}:{':'.join(str(count) for _, count in rows)}"
+    # HTTP dates have whole seconds; the ETag tells apart edits within one
+    return hashlib.md5(fingerprint.encode()).hexdigest(), newest.replace(microsecond=0)
+
+
+def conditional_page(get_querysets):
+    """
+    Like @condition, with both validators from one content_state() query.
+
+    ``get_querysets`` receives the view's URL kwargs and returns the
+    querysets the page renders, its main object's first. Works on sync
+    and async views. Responses are marked ``content_versioned``: their
+    ETag changes only with the data, so work derived from the body, like
+    compressing it, can be kept per ETag.
+    """
+    def state(request, *args, **kwargs):
+        if not hasattr(request, '_content_state'):
+            request._content_state = content_state(get_querysets(**kwargs))
+        return request._content_state
+
+    conditional = condition(
+        etag_func=lambda request, *args, **kwargs: state(request, *args, **kwargs)[0],
+        last_modified_func=lambda request, *args, **kwargs: state(request, *args, **kwargs)[1],
+    )
+
+    def decorator(view):
+        if not iscoroutinefunction(view):
+            @wraps(view)
+            def versioned(request, *args, **kwargs):
+                response = view(request, *args, **kwargs)
+                response.content_versioned = True
+                return response
+            return conditional(versioned)
+
+        @wraps(view)
+        async def versioned(request, *args, **kwargs):
+            response = await view(request, *args, **kwargs)
+            response.content_versioned = True
+            return response
+        wrapped = conditional(versioned)
+
+        # @condition calls the validator functions synchronously, which
+        # can't query from the event loop; load the state in a thread first
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            await sync_to_async(state)(request, *args, **kwargs)
+            return await wrapped(request, *args, **kwargs)
+        return inner
+
+    return decorator
@@ -0,0 +1,141 @@
+"""
+Static export of the public pages, see `manage.py export_static`.
+
+Every page is written as ``<path>/index.html`` so any static file server
+maps the URL to it. Later pages of the projects listing are addressed by
+``?cursor=``, which file servers ignore; they are written to
+``projects/cursor/<cursor>/index.html`` for the server to rewrite to, e.g.
+in nginx::
+
+    if ($arg_cursor) { rewrite ^/projects/$ /projects/cursor/$arg_cursor/ last; }
+
+The listing's filter links (``?technology=``, ``?year=``, ``?featured=``)
+are left out of exported pages: a file server would ignore the query and
+serve the unfiltered listing under them. Pages are rendered with
+``request.static_export`` set for templates to check.
+
+A manifest in the output directory records each page's ETag (see
+conditional.py) so a re-export only rewrites pages whose rows changed.
+
+Pool children are spawned from a clean interpreter, so models are only
+imported inside functions.
+"""
+import json
+import os
+import tempfile
+
+MANIFEST_NAME = '.export-manifest.json'
+
+
+def page_file(path, cursor=None):
+    """Output file, relative to the export root, for a page URL"""
+    if cursor:
+        path = f'{path}cursor/{cursor}/'
+    return os.path.join(path.strip('/'), 'index.html')
+
+
+def export_pages():
+    """
+    ``[(path, cursor, etag), ...]`` for every public page.
+
+    Pages whose ETag can't be computed are left out: a project deleted
+    while the list was being built.
+    """
+    from django.urls import reverse
+    from .conditional import content_state
+    from .models import Project
+    from .pagination import encode_cursor
+    from .views import ProjectsListView, index_content, project_detail_content, projects_content
+
+    def etag(querysets):
+        # The export tracks data changes only; --full covers template changes
+        return content_state(querysets, not_before=None)[0]
+
+    pages = [(reverse('index'), None, etag(index_content()))]
+
+    listing = reverse('projects')
+    listing_etag = etag(projects_content())
+    pages.append((listing, None, listing_etag))
+    # Each listing page starts after the last project of the one before
+    per_page = ProjectsListView.paginate_by
+    ordered = Project.objects.order_by('-created_at', '-id').only('id', 'created_at')
+    for position, project in enumerate(ordered.iterator(), start=1):
+        if position % per_page == 0:
+            pages.append((listing, encode_cursor(project), listing_etag))
+    # The last boundary starts an empty page unless more projects follow
+    if pages[-1][1] and Project.objects.count() % per_page == 0:
+        pages.pop()
+
+    for project_id in Project.objects.values_list('id', flat=True).iterator():
+        pages.append((
+            reverse('project_detail', kwargs={'project_id': project_id}),
+            None,
+            etag(project_detail_content(project_id)),
+        ))
+    return [page for page in pages if page[2]]
+
+
+def render_page(path, cursor=None):
+    """Render one page the way the view serves it; returns the response"""
+    from asgiref.sync import async_to_sync, iscoroutinefunction
+    from django.test import RequestFactory
+    from django.urls import resolve
+
+    request = RequestFactory().get(path, {'cursor': cursor} if cursor else {})
+    request.static_export = True
+    match = resolve(request.path_info)
+    view = async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func
+    response = view(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def export_page(root, path, cursor=None):
+    """
+    Render a page into ``root``; returns (path, cursor, status code).
+
+    The file is replaced atomically so a server never sees half a page.
+    """
+    response = render_page(path, cursor)
+    if response.status_code == 200:
+        target = os.path.join(root, page_file(path, cursor))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+        with os.fdopen(handle, 'wb') as output:
+            output.write(response.content)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, target)
+    return path, cursor, response.status_code
+
+
+def export_page_args(args):
+    """Pool entry point for export_page; pool.map passes one argument"""
+    return export_page(*args)
+
+
+def read_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST_NAME)) as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(root, manifest):
+    with open(os.path.join(root, MANIFEST_NAME), 'w') as output:
+        json.dump(manifest, output, indent=0, sort_keys=True)
+
+
+def remove_page(root, name):
+    """Delete an exported page and any directories it leaves empty"""
+    target = os.path.join(root, name)
+    if os.path.exists(target):
+        os.remove(target)
+    directory = os.path.dirname(target)
+    while directory != os.path.normpath(root):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
@@ -0,0 +1,93 @@
+"""
+Facet counts for the filters on the projects listing.
+
+Each facet is counted with the other active filters applied, so a count
+is the number of projects the visitor would get by picking that value.
+Counts come from three aggregate queries and are kept in the page cache,
+which the signal handlers clear whenever projects or their technologies
+change; only the first request for a combination of filters pays for them.
+"""
+from django.core.cache import caches
+from django.db.models import Count
+from django.db.models.functions import ExtractYear
+
+from .cache import PAGE_CACHE_ALIAS, page_cache_timeout
+from .models import Project, ProjectTechnology
+
+
+def filter_projects(queryset, technology=None, year=None, featured=None):
+    """
+    Narrow a Project queryset by the listing filters; ``None`` leaves a
+    filter off. ``technology`` is a Technology, ``featured`` a bool.
+    """
+    if technology is not None:
+        # A subquery instead of a join, so annotations over technologies
+        # elsewhere aren't affected
+        queryset = queryset.filter(
+            id__in=ProjectTechnology.objects.filter(technology=technology).values('project_id')
+        )
+    if year is not None:
+        # Becomes a created_at range, which can use the listing index
+        queryset = queryset.filter(created_at__year=year)
+    if featured is not None:
+        queryset = queryset.filter(featured=featured)
+    return queryset
+
+
+def _facets_key(technology, year, featured):
+    technology_id = technology.pk if technology is not None else ''
+    year = year if year is not None else ''
+    featured = '' if featured is None else int(featured)
+    return f'project-facets:{technology_id}:{year}:{featured}'
+
+
+def compute_facets(technology=None, year=None, featured=None):
+    projects = Project.objects.order_by()
+
+    technology_counts = ProjectTechnology.objects.order_by()
+    if year is not None or featured is not None:
+        technology_counts = technology_counts.filter(
+            project__in=filter_projects(projects, year=year, featured=featured).values('id')
+        )
+    technologies = [
+        {'slug': row['technology__slug'], 'name': row['technology__name'], 'count': row['count']}
+        for row in technology_counts.values('technology__slug', 'technology__name')
+        .annotate(count=Count('id')).order_by('-count', 'technology__name')
+    ]
+
+    years = [
+        {'year': row['year'], 'count': row['count']}
+        for row in filter_projects(projects, technology=technology, featured=featured)
+        .annotate(year=ExtractYear('created_at')).values('year')
+        .annotate(count=Count('id')).order_by('-year')
+    ]
+
+    featured_counts = dict(
+        filter_projects(projects, technology=technology, year=year)
+        .values_list('featured').annotate(count=Count('id'))
+    )
+    return {
+        'technologies': technologies,
+        'years': years,
+        'featured': featured_counts.get(True, 0),
+        'not_featured': featured_counts.get(False, 0),
+    }
+
+
+def project_facets(technology=None, year=None, featured=None, refresh=False):
+    """
+    ``{'technologies': [{'slug', 'name', 'count'}, ...], 'years': [{'year', 'count'}, ...],
+    'featured': n, 'not_featured': n}`` under the given filters, most
+    common technologies and newest years first.
+
+    ``refresh`` recounts and replaces the cached counts, for requests that
+    must see their own writes and read the primary: cached counts may come
+    from a lagging replica.
+    """
+    key = _facets_key(technology, year, featured)
+    cache = caches[PAGE_CACHE_ALIAS]
+    facets = None if refresh else cache.get(key)
+    if facets is None:
+        facets = compute_facets(technology, year, featured)
+        cache.set(key, facets, page_cache_timeout())
+    return facets
@@ -2,130 +2,21 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from .models import 
+from .models import Project, ProjectImage, Technology, Skill, Experience, Education, Certification
 
 
-class ContactForm(forms.ModelForm):
-    class Meta:
-        model = ContactMessage
-        fields = ['name', 'email', 'subject', 'message']
-        widgets = {
-            'name': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'Your Full Name',
-                'required': True
-            }),
-            'email': forms.EmailInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'your.email@example.com',
-                'required': True
-            }),
-            'subject': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'Subject of your message',
-                'required': True
-            }),
-            'message': forms.Textarea(attrs={
-                'class': 'form-control',
-                'placeholder': 'Your message here...',
-                'rows': 6,
-                'required': True
-            }),
-        }
-        labels = {
-            'name': 'Full Name',
-            'email': 'Email Address',
-            'subject': 'Subject',
-            'message': 'Message'
-        }
-
-    def clean_email(self):
-        email = self.cleaned_data.get('email')
-        # Basic email validation
-        if not email:
-            raise ValidationError("Email is required")
-        return email
-
-    def clean_message(self):
-        message = self.cleaned_data.get('message')
-        if len(message.strip()) < 10:
-            raise ValidationError("Message must be at least 10 characters long")
-        return message
-
-class ProfileForm(forms.ModelForm):
-    class Meta:
-        model = Profile
-        fields = ['title', 'bio', 'profile_picture', 'email', 'phone', 'location', 'resume']
-        widgets = {
-            'title': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'e.g., Full Stack Developer'
-            }),
-            'bio': forms.Textarea(attrs={
-                'class': 'form-control',
-                'placeholder': 'Write a compelling bio about yourself...',
-                'rows': 5
-            }),
-            'email': forms.EmailInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'your.email@example.com'
-            }),
-            'phone': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': '+1 (555) 123-4567'
-            }),
-            'location': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'City, Country'
-            }),
-            'profile_picture': forms.FileInput(attrs={
-                'class': 'form-control-file'
-            }),
-            'resume': forms.FileInput(attrs={
-                'class': 'form-control-file'
-            }),
-        }
-        labels = {
-            'profile_picture': 'Profile Picture',
-            'resume': 'Resume/CV'
-        }
-
-class SocialLinkForm(forms.ModelForm):
-    class Meta:
-        model = SocialLink
-        fields = ['platform', 'url', 'icon_class']
-        widgets = {
-            'platform': forms.Select(attrs={
-                'class': 'form-control'
-            }),
-            'url': forms.URLInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'https://example.com/your-profile'
-            }),
-            'icon_class': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'fab fa-github (Font Awesome class)'
-            }),
-        }
-
-SocialLinkFormSet = forms.inlineformset_factory(
-    Profile, SocialLink, 
-    form=SocialLinkForm,
-    extra=1,
-    can_delete=True
-)
-
 class SkillForm(forms.ModelForm):
     class Meta:
         model = Skill
-        fields = ['name', 'category', 'proficiency', 'icon', 'order']
+        fields = ['name', 'category', 'proficiency']
         widgets = {
             'name': forms.TextInput(attrs={
                 'class': 'form-control',
                 'placeholder': 'e.g., Python, React, AWS'
             }),
-            'category': forms.Select(attrs={
-                'class': 'form-control'
+            'category': forms.TextInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'e.g., Backend, Frontend, Database'
             }),
             'proficiency': forms.NumberInput(attrs={
                 'class': 'form-control',
@@ -133,14 +24,6 @@ class SkillForm(forms.ModelForm):
                 'max': 100,
                 'type': 'range'
             }),
-            'icon': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'fab fa-python (Font Awesome class)'
-            }),
-            'order': forms.NumberInput(attrs={
-                'class': 'form-control',
-                'min': 0
-            }),
         }
 
     def clean_proficiency(self):
@@ -149,13 +32,6 @@ class SkillForm(forms.ModelForm):
             raise ValidationError("Proficiency must be between 1 and 100")
         return proficiency
 
-SkillFormSet = forms.inlineformset_factory(
-    Profile, Skill,
-    form=SkillForm,
-    extra=1,
-    can_delete=True
-)
-
 class ProjectForm(forms.ModelForm):
     technologies = forms.ModelMultipleChoiceField(
         queryset=Technology.objects.all(),
@@ -168,9 +44,8 @@ class ProjectForm(forms.ModelForm):
     class Meta:
         model = Project
         fields = [
-            'title', 'short_description', 'description', 'project_type',
-            'featured_image', 'github_url', 'live_url', 'technologies',
-            'featured', 'start_date', 'end_date'
+            'title', 'short_description', 'description', 'image',
+            'github_url', 'project_url', 'technologies', 'featured'
         ]
         widgets = {
             'title': forms.TextInput(attrs={
@@ -187,28 +62,17 @@ class ProjectForm(forms.ModelForm):
                 'placeholder': 'Detailed project description...',
                 'rows': 8
             }),
-            'project_type': forms.Select(attrs={
-                'class': 'form-control'
-            }),
-            'featured_image': forms.FileInput(attrs={
+            'image': forms.FileInput(attrs={
                 'class': 'form-control-file'
             }),
             'github_url': forms.URLInput(attrs={
                 'class': 'form-control',
                 'placeholder': 'https://github.com/username/project'
             }),
-            'live_url': forms.URLInput(attrs={
+            'project_url': forms.URLInput(attrs={
                 'class': 'form-control',
                 'placeholder': 'https://your-project.com'
             }),
-            'start_date': forms.DateInput(attrs={
-                'class': 'form-control',
-                'type': 'date'
-            }),
-            'end_date': forms.DateInput(attrs={
-                'class': 'form-control',
-                'type': 'date'
-            }),
             'featured': forms.CheckboxInput(attrs={
                 'class': 'form-check-input'
             }),
@@ -216,19 +80,9 @@ class ProjectForm(forms.ModelForm):
         labels = {
             'featured': 'Mark as Featured Project',
             'github_url': 'GitHub Repository URL',
-            'live_url': 'Live Demo URL'
+            'project_url': 'Live Demo URL'
         }
 
-    def clean(self):
-        cleaned_data = super().clean()
-        start_date = cleaned_data.get('start_date')
-        end_date = cleaned_data.get('end_date')
-        
-        if end_date and start_date and end_date < start_date:
-            raise ValidationError("End date cannot be before start date")
-        
-        return cleaned_data
-
     def clean_short_description(self):
         short_description = self.cleaned_data.get('short_description')
         if len(short_description) > 300:
@@ -349,10 +203,7 @@ class ExperienceForm(forms.ModelForm):
 class EducationForm(forms.ModelForm):
     class Meta:
         model = Education
-        fields = [
-            'institution', 'degree', 'field_of_study',
-            'start_date', 'end_date', 'current', 'description', 'grade'
-        ]
+        fields = ['institution', 'degree', 'score', 'year']
         widgets = {
             'institution': forms.TextInput(attrs={
                 'class': 'form-control',
@@ -362,258 +213,46 @@ class EducationForm(forms.ModelForm):
                 'class': 'form-control',
                 'placeholder': 'e.g., Bachelor of Science'
             }),
-            'field_of_study': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'e.g., Computer Science'
-            }),
-            'start_date': forms.DateInput(attrs={
-                'class': 'form-control',
-                'type': 'date'
-            }),
-            'end_date': forms.DateInput(attrs={
-                'class': 'form-control',
-                'type': 'date'
-            }),
-            'current': forms.CheckboxInput(attrs={
-                'class': 'form-check-input'
-            }),
-            'description': forms.Textarea(attrs={
-                'class': 'form-control',
-                'placeholder': 'Additional information about your education...',
-                'rows': 4
-            }),
-            'grade': forms.TextInput(attrs={
+            'score': forms.TextInput(attrs={
                 'class': 'form-control',
                 'placeholder': 'e.g., 3.8 GPA, First Class Honors'
             }),
-        }
-        labels = {
-            'current': 'I currently study here'
-        }
-
-    def clean(self):
-        cleaned_data = super().clean()
-        start_date = cleaned_data.get('start_date')
-        end_date = cleaned_data.get('end_date')
-        current = cleaned_data.get('current')
-        
-        if current and end_date:
-            raise ValidationError("Cannot have both end date and current education checked")
-        
-        if not current and not end_date:
-            raise ValidationError("Either set end date or mark as current education")
-        
-        if end_date and start_date and end_date < start_date:
-            raise ValidationError("End date cannot be before start date")
-        
-        return cleaned_data
-
-EducationFormSet = forms.inlineformset_factory(
-    Profile, Education,
-    form=EducationForm,
-    extra=1,
-    can_delete=True
-)
-
-class CertificateForm(forms.ModelForm):
-    class Meta:
-        model = Certificate
-        fields = ['name', 'issuing_organization', 'issue_date', 'expiration_date', 'credential_id', 'credential_url']
-        widgets = {
-            'name': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'Certificate Name'
-            }),
-            'issuing_organization': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'Issuing Organization'
-            }),
-            'issue_date': forms.DateInput(attrs={
-                'class': 'form-control',
-                'type': 'date'
-            }),
-            'expiration_date': forms.DateInput(attrs={
-                'class': 'form-control',
-                'type': 'date'
-            }),
-            'credential_id': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'Credential ID (if any)'
-            }),
-            'credential_url': forms.URLInput(attrs={
+            'year': forms.TextInput(attrs={
                 'class': 'form-control',
-                'placeholder': 'URL to verify certificate'
+                'placeholder': 'e.g., 2021 - 2024'
             }),
         }
 
-    def clean(self):
-        cleaned_data = super().clean()
-        issue_date = cleaned_data.get('issue_date')
-        expiration_date = cleaned_data.get('expiration_date')
-        
-        if expiration_date and issue_date and expiration_date < issue_date:
-            raise ValidationError("Expiration date cannot be before issue date")
-        
-        return cleaned_data
-
-CertificateFormSet = forms.inlineformset_factory(
-    Profile, Certificate,
-    form=CertificateForm,
-    extra=1,
-    can_delete=True
-)
-
-class BlogPostForm(forms.ModelForm):
-    tags = forms.ModelMultipleChoiceField(
-        queryset=Tag.objects.all(),
-        widget=forms.CheckboxSelectMultiple(attrs={
-            'class': 'tag-checkboxes'
-        }),
-        required=False
-    )
-    
+class CertificationForm(forms.ModelForm):
     class Meta:
-        model = BlogPost
-        fields = [
-            'title', 'slug', 'excerpt', 'content', 'featured_image',
-            'status', 'published_date', 'tags'
-        ]
+        model = Certification
+        fields = ['title', 'issuer', 'completion_date']
         widgets = {
             'title': forms.TextInput(attrs={
                 'class': 'form-control',
-                'placeholder': 'Blog Post Title'
-            }),
-            'slug': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'url-friendly-slug'
-            }),
-            'excerpt': forms.Textarea(attrs={
-                'class': 'form-control',
-                'placeholder': 'Brief excerpt for preview...',
-                'rows': 3,
-                'maxlength': 300
-            }),
-            'content': forms.Textarea(attrs={
-                'class': 'form-control',
-                'placeholder': 'Write your blog post content here...',
-                'rows': 15
-            }),
-            'featured_image': forms.FileInput(attrs={
-                'class': 'form-control-file'
-            }),
-            'status': forms.Select(attrs={
-                'class': 'form-control'
-            }),
-            'published_date': forms.DateTimeInput(attrs={
-                'class': 'form-control',
-                'type': 'datetime-local'
-            }),
-        }
-
-    def clean_slug(self):
-        slug = self.cleaned_data.get('slug')
-        # Basic slug validation
-        if not slug.replace('-', '').isalnum():
-            raise ValidationError("Slug can only contain letters, numbers, and hyphens")
-        return slug
-
-    def clean_excerpt(self):
-        excerpt = self.cleaned_data.get('excerpt')
-        if len(excerpt) > 300:
-            raise ValidationError("Excerpt must be 300 characters or less")
-        return excerpt
-
-class TagForm(forms.ModelForm):
-    class Meta:
-        model = Tag
-        fields = ['name', 'slug']
-        widgets = {
-            'name': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'Tag Name'
-            }),
-            'slug': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'tag-slug'
-            }),
-        }
-
-class TestimonialForm(forms.ModelForm):
-    class Meta:
-        model = Testimonial
-        fields = [
-            'client_name', 'client_position', 'client_company',
-            'client_image', 'content', 'rating', 'featured'
-        ]
-        widgets = {
-            'client_name': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'Client Name'
-            }),
-            'client_position': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'Client Position'
+                'placeholder': 'Certificate Name'
             }),
-            'client_company': forms.TextInput(attrs={
+            'issuer': forms.TextInput(attrs={
                 'class': 'form-control',
-                'placeholder': 'Client Company'
-            }),
-            'client_image': forms.FileInput(attrs={
-                'class': 'form-control-file'
+                'placeholder': 'Issuing Organization'
             }),
-            'content': forms.Textarea(attrs={
+            'completion_date': forms.TextInput(attrs={
                 'class': 'form-control',
-                'placeholder': 'Testimonial content...',
-                'rows': 5
-            }),
-            'rating': forms.Select(attrs={
-                'class': 'form-control'
-            }),
-            'featured': forms.CheckboxInput(attrs={
-                'class': 'form-check-input'
+                'placeholder': 'e.g., Jun 2024'
             }),
         }
-        labels = {
-            'featured': 'Featured Testimonial'
-        }
-
-    def clean_rating(self):
-        rating = self.cleaned_data.get('rating')
-        if rating < 1 or rating > 5:
-            raise ValidationError("Rating must be between 1 and 5")
-        return rating
-
-TestimonialFormSet = forms.inlineformset_factory(
-    Profile, Testimonial,
-    form=TestimonialForm,
-    extra=1,
-    can_delete=True
-)
 
 # Search Form
 class SearchForm(forms.Form):
     q = forms.CharField(
         required=False,
-        widget=forms.TextInput(attrs={
+        max_length=200,
+        widget=forms.SearchInput(attrs={
             'class': 'form-control',
-            'placeholder': 'Search projects, blog posts, skills...',
+            'placeholder': 'Search projects by title, description or technology...',
             'aria-label': 'Search'
         })
     )
-    
-    search_type = forms.ChoiceField(
-        choices=[
-            ('all', 'All'),
-            ('projects', 'Projects'),
-            ('blog', 'Blog Posts'),
-            ('skills', 'Skills')
-        ],
-        required=False,
-        initial='all',
-        widget=forms.RadioSelect(attrs={
-            'class': 'search-type-radio'
-        })
-    )
 
 # Newsletter Subscription Form
 class NewsletterSubscriptionForm(forms.Form):
@@ -632,19 +271,11 @@ class NewsletterSubscriptionForm(forms.Form):
 
 # Project Filter Form
 class ProjectFilterForm(forms.Form):
-    PROJECT_TYPE_CHOICES = [('', 'All Types')] + Project.PROJECT_TYPES
-    
-    project_type = forms.ChoiceField(
-        choices=PROJECT_TYPE_CHOICES,
-        required=False,
-        widget=forms.Select(attrs={
-            'class': 'form-control',
-            'onchange': 'this.form.submit()'
-        })
-    )
-    
+    FEATURED_CHOICES = [('', 'All Projects'), ('yes', 'Featured'), ('no', 'Not Featured')]
+
     technology = forms.ModelChoiceField(
         queryset=Technology.objects.all(),
+        to_field_name='slug',
         required=False,
         empty_label="All Technologies",
         widget=forms.Select(attrs={
@@ -652,46 +283,32 @@ class ProjectFilterForm(forms.Form):
             'onchange': 'this.form.submit()'
         })
     )
-    
-    featured = forms.BooleanField(
-        required=False,
-        widget=forms.CheckboxInput(attrs={
-            'class': 'form-check-input',
-            'onchange': 'this.form.submit()'
-        }),
-        label='Featured Only'
-    )
 
-# Comment Form for Blog Posts
-class CommentForm(forms.Form):
-    name = forms.CharField(
-        max_length=100,
-        widget=forms.TextInput(attrs={
-            'class': 'form-control',
-            'placeholder': 'Your Name',
-            'required': True
-        })
-    )
-    
-    email = forms.EmailField(
-        widget=forms.EmailInput(attrs={
+    year = forms.IntegerField(
+        min_value=1970,
+        max_value=9999,
+        required=False,
+        widget=forms.NumberInput(attrs={
             'class': 'form-control',
-            'placeholder': 'Your Email (will not be published)',
-            'required': True
+            'onchange': 'this.form.submit()'
         })
     )
-    
-    comment = forms.CharField(
-        widget=forms.Textarea(attrs={
+
+    featured = forms.TypedChoiceField(
+        choices=FEATURED_CHOICES,
+        coerce=lambda value: value == 'yes',
+        empty_value=None,
+        required=False,
+        widget=forms.Select(attrs={
             'class': 'form-control',
-            'placeholder': 'Your comment...',
-            'rows': 4,
-            'required': True
+            'onchange': 'this.form.submit()'
         })
     )
-    
-    def clean_comment(self):
-        comment = self.cleaned_data.get('comment')
-        if len(comment.strip()) < 10:
-            raise ValidationError("Comment must be at least 10 characters long")
-        return comment
\ No newline at end of file
+
+    def filters(self):
+        """The valid filters as keyword arguments for facets.filter_projects"""
+        self.is_valid()
+        return {
+            name: self.cleaned_data.get(name)
+            for name in ('technology', 'year', 'featured')
+        }
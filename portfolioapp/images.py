@@ -0,0 +1,232 @@
+"""
+Resized and re-encoded variants ("derivatives") of uploaded images.
+
+For an upload such as ``projects/shop.png`` the derivatives live next to it
+as ``projects/shop.w640.png``, ``projects/shop.w640.webp`` and so on: one
+per width in DERIVATIVE_WIDTHS narrower than the original, in the original
+format plus each modern format Pillow can encode here.
+"""
+import hashlib
+import os
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from .models import Project, ProjectImage, Experience
+
+DERIVATIVE_WIDTHS = (320, 640, 1280)
+
+# Uploaded image fields that get processed; each has a <field>_sha256
+# companion holding the digest of the processed file
+IMAGE_FIELDS = (
+    (Project, 'image'),
+    (ProjectImage, 'image'),
+    (Experience, 'company_logo'),
+)
+
+# Served through <source> elements, best compression first
+MODERN_FORMATS = tuple(fmt for fmt in ('avif', 'webp') if features.check(fmt))
+
+MIME_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+}
+
+# How long the list of existing derivatives is trusted; generating them
+# clears it, through the shared cache, so this only bounds files written
+# outside generate_derivatives()
+AVAILABLE_LOOKUP_TIMEOUT = 60 * 5
+
+SAVE_OPTIONS = {
+    'avif': {'quality': 60},
+    'webp': {'quality': 80, 'method': 6},
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True},
+    'png': {'optimize': True},
+}
+
+
+def fallback_format(name):
+    """Format of the plain <img> variants: PNG stays PNG, the rest is JPEG"""
+    return 'png' if name.lower().endswith('.png') else 'jpeg'
+
+
+def derivative_name(name, width, fmt):
+    root, _ = os.path.splitext(name)
+    extension = 'jpg' if fmt == 'jpeg' else fmt
+    return f'{root}.w{width}.{extension}'
+
+
+def _available_key(name):
+    return f'image-derivatives:{name}'
+
+
+def _width_key(name):
+    return f'image-width:{name}'
+
+
+def without_metadata(source):
+    """
+    The image read from ``source`` re-encoded without its EXIF block
+    (camera serials, GPS...), or None if it has none or isn't an image.
+
+    The EXIF orientation is applied to the pixels first so the image still
+    displays the right way up.
+    """
+    try:
+        image = Image.open(source)
+        # Reading EXIF only needs the header; skip decoding clean files
+        if not image.getexif():
+            return None
+        image.load()
+    except (UnidentifiedImageError, OSError):
+        return None
+
+    fmt = image.format
+    cleaned = ImageOps.exif_transpose(image)
+    cleaned.info.pop('exif', None)
+    buffer = BytesIO()
+    options = {'quality': 90} if fmt == 'JPEG' else {}
+    cleaned.save(buffer, format=fmt, **options)
+    return buffer.getvalue()
+
+
+def strip_upload_metadata(field_file):
+    """
+    Strip an upload that isn't stored yet, so its metadata never gets a
+    public URL. Runs before the model saves it.
+    """
+    cleaned = without_metadata(field_file.file)
+    field_file.file.seek(0)
+    if cleaned is not None:
+        field_file.file = ContentFile(cleaned, name=field_file.name)
+
+
+def strip_metadata(field_file):
+    """
+    Rewrite a stored original without its EXIF block (see without_metadata).
+
+    For files stored before uploads were stripped on the way in. Returns
+    the stored name, which differs from the original if the storage picked
+    a new one, or None if there was nothing to strip. A deduplicating
+    storage keeps the original, which other rows may share; see
+    delete_unreferenced().
+    """
+    storage = field_file.storage
+    try:
+        with storage.open(field_file.name) as source:
+            cleaned = without_metadata(source)
+    except OSError:
+        return None
+    if cleaned is None:
+        return None
+    if not getattr(storage, 'deduplicates', False):
+        storage.delete(field_file.name)
+    return storage.save(field_file.name, ContentFile(cleaned))
+
+
+def delete_unreferenced(storage, name):
+    """Delete a stored image unless an IMAGE_FIELDS row still uses it"""
+    if not any(model.objects.filter(**{field_name: name}).exists() for model, field_name in IMAGE_FIELDS):
+        storage.delete(name)
+
+
+def file_sha256(field_file):
+    digest = hashlib.sha256()
+    with field_file.storage.open(field_file.name) as source:
+        for chunk in iter(lambda: source.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def generate_derivatives(field_file):
+    """
+    Write any missing derivatives of ``field_file``; returns the new names.
+
+    Existing derivatives are left alone, so running this again is cheap.
+    Files Pillow can't read (e.g. SVG logos) have no derivatives.
+    """
+    if not field_file:
+        return []
+    storage = field_file.storage
+    try:
+        with storage.open(field_file.name) as source:
+            image = Image.open(source)
+            image.load()
+    except (UnidentifiedImageError, OSError):
+        return []
+
+    image = ImageOps.exif_transpose(image)
+    formats = MODERN_FORMATS + (fallback_format(field_file.name),)
+    # A content-hashed storage names files by content unless told otherwise
+    save = getattr(storage, 'save_variant', storage.save)
+    created = []
+    for width in DERIVATIVE_WIDTHS:
+        if width >= image.width:
+            break
+        resized = None
+        for fmt in formats:
+            name = derivative_name(field_file.name, width, fmt)
+            if storage.exists(name):
+                continue
+            if resized is None:
+                height = round(image.height * width / image.width)
+                resized = image.resize((width, height), Image.LANCZOS)
+            output = resized
+            if fmt == 'jpeg' and output.mode not in ('RGB', 'L'):
+                output = output.convert('RGB')
+            buffer = BytesIO()
+            output.save(buffer, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+            created.append(save(name, ContentFile(buffer.getvalue())))
+    cache.delete(_available_key(field_file.name))
+    return created
+
+
+def available_derivatives(field_file):
+    """
+    ``{format: [(width, url), ...]}`` for the derivatives that exist.
+
+    Looked up once per file and cached until the derivatives are regenerated.
+    """
+    if not field_file:
+        return {}
+
+    def lookup():
+        storage = field_file.storage
+        formats = MODERN_FORMATS + (fallback_format(field_file.name),)
+        available = {}
+        for fmt in formats:
+            for width in DERIVATIVE_WIDTHS:
+                name = derivative_name(field_file.name, width, fmt)
+                if storage.exists(name):
+                    available.setdefault(fmt, []).append((width, storage.url(name)))
+        return available
+
+    return cache.get_or_set(_available_key(field_file.name), lookup, AVAILABLE_LOOKUP_TIMEOUT)
+
+
+def original_width(field_file):
+    """
+    Intrinsic width of an uploaded image, or None if Pillow can't read it.
+
+    Only the header is read, once per file until AVAILABLE_LOOKUP_TIMEOUT.
+    """
+    def lookup():
+        try:
+            with field_file.storage.open(field_file.name) as source:
+                return Image.open(source).width
+        except (UnidentifiedImageError, OSError):
+            return None
+
+    return cache.get_or_set(_width_key(field_file.name), lookup, AVAILABLE_LOOKUP_TIMEOUT)
+
+
+def thumbnail_url(field_file):
+    """URL of the smallest derivative of an image, or of the original"""
+    fallback = available_derivatives(field_file).get(fallback_format(field_file.name))
+    if fallback:
+        return fallback[0][1]
+    return field_file.url
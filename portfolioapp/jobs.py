@@ -0,0 +1,92 @@
+"""
+Database-backed job queue.
+
+Jobs are rows in the Job table; `manage.py run_worker` claims due jobs and
+runs them on a process pool, so slow work like image processing stays off
+the request path without an external broker.
+"""
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+MAX_ATTEMPTS = 3
+# Delay before retrying a failed job, multiplied by the attempt number
+RETRY_DELAY = timedelta(seconds=30)
+# Running jobs older than this are assumed to belong to a dead worker
+STALE_AFTER = timedelta(minutes=10)
+
+TASKS = {}
+
+
+def task(func):
+    """Register ``func`` as a job task under its name"""
+    TASKS[func.__name__] = func
+    return func
+
+
+def enqueue(task_name, **payload):
+    """
+    Queue a job unless an identical one is already waiting.
+
+    Returns the pending Job. Workers only see it once the current
+    transaction commits.
+    """
+    if task_name not in TASKS:
+        raise ValueError(f"Unknown task: {task_name}")
+    existing = Job.objects.filter(task=task_name, payload=payload, status=Job.PENDING).first()
+    if existing:
+        return existing
+    return Job.objects.create(task=task_name, payload=payload)
+
+
+def claim_jobs(limit):
+    """Mark up to ``limit`` due jobs as running and return their ids"""
+    now = timezone.now()
+    due = Job.objects.filter(status=Job.PENDING, run_after__lte=now).order_by('run_after', 'id')
+    claimed = []
+    for job_id in due.values_list('id', flat=True)[:limit]:
+        # Only one worker wins the update if several race for the same row
+        won = Job.objects.filter(id=job_id, status=Job.PENDING).update(
+            status=Job.RUNNING, started_at=now, attempts=F('attempts') + 1
+        )
+        if won:
+            claimed.append(job_id)
+    return claimed
+
+
+def requeue_stale_jobs():
+    """Put jobs left running by a crashed worker back in the queue"""
+    return Job.objects.filter(
+        status=Job.RUNNING, started_at__lt=timezone.now() - STALE_AFTER
+    ).update(status=Job.PENDING)
+
+
+def execute(job_id):
+    """
+    Run one claimed job and record the outcome.
+
+    Called in the pool's child processes; returns the final status.
+    """
+    job = Job.objects.get(id=job_id)
+    try:
+        with transaction.atomic():
+            TASKS[job.task](**job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < MAX_ATTEMPTS:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + RETRY_DELAY * job.attempts
+        else:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+    else:
+        job.status = Job.DONE
+        job.error = ''
+        job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'run_after', 'finished_at'])
+    return job.status
@@ -0,0 +1,67 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from portfolioapp.export import (
+    export_page, export_page_args, export_pages, page_file, read_manifest, remove_page, write_manifest,
+)
+from portfolioapp.worker import setup_child
+
+
+class Command(BaseCommand):
+    help = 'Pre-render the public pages into a directory of static HTML files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=os.path.join(settings.BASE_DIR, 'export'),
+                            help='Directory to write the pages to')
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help='Size of the process pool; 0 renders in this process')
+        parser.add_argument('--full', action='store_true',
+                            help='Rewrite every page, e.g. after a template change')
+
+    def handle(self, *args, **options):
+        root = options['output']
+        os.makedirs(root, exist_ok=True)
+        previous = {} if options['full'] else read_manifest(root)
+
+        pages = export_pages()
+        current = {page_file(path, cursor): etag for path, cursor, etag in pages}
+        stale = [
+            (root, path, cursor) for path, cursor, etag in pages
+            if previous.get(page_file(path, cursor)) != etag
+            or not os.path.exists(os.path.join(root, page_file(path, cursor)))
+        ]
+
+        if options['processes'] and len(stale) > 1:
+            # Spawn rather than fork so children never share the parent's
+            # database connections
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(options['processes'], mp_context=context, initializer=setup_child) as pool:
+                results = list(pool.map(export_page_args, stale, chunksize=16))
+        else:
+            results = [export_page(*args) for args in stale]
+
+        written = 0
+        for path, cursor, status in results:
+            if status == 200:
+                written += 1
+            else:
+                # Keep any earlier copy; its old ETag makes the next run retry
+                name = page_file(path, cursor)
+                if name in previous:
+                    current[name] = previous[name]
+                else:
+                    del current[name]
+                self.stderr.write(f'{path} {cursor or ""}: HTTP {status}')
+
+        removed = [name for name in previous if name not in current]
+        for name in removed:
+            remove_page(root, name)
+        write_manifest(root, current)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} pages, {len(pages) - len(stale)} unchanged, '
+            f'removed {len(removed)} to {root}'
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from portfolioapp.images import IMAGE_FIELDS, generate_derivatives
+
+class Command(BaseCommand):
+    help = 'Generate missing resized/WebP variants for every uploaded image'
+
+    def handle(self, *args, **options):
+        created = 0
+        for model, field_name in IMAGE_FIELDS:
+            queryset = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for instance in queryset.only('pk', field_name).iterator():
+                names = generate_derivatives(getattr(instance, field_name))
+                created += len(names)
+                for name in names:
+                    self.stdout.write(f'  {name}')
+
+        self.stdout.write(self.style.SUCCESS(f'Generated {created} image derivatives'))
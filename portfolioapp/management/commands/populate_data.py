@@ -1,32 +1,89 @@
+import random
+import time
+
+from django.core.cache import caches
 from django.core.management.base import BaseCommand
-from portfolioapp.models import Project, Skill, Experience, Education, Certification
+from django.db import connection, transaction
+from portfolioapp.models import (
+    Project, ProjectImage, ProjectTechnology, RelatedProject,
+    Technology, Skill, Experience, Education, Certification,
+)
+from portfolioapp.related import rebuild_related_projects
+from portfolioapp.search import rebuild_search_index
+from portfolioapp.synthetic import generate
+
+# Children before parents
+CLEARED_MODELS = [
+    RelatedProject, ProjectImage, ProjectTechnology, Project,
+    Technology, Skill, Experience, Education, Certification,
+]
+
 
 class Command(BaseCommand):
-    help = 'Populate initial data for portfolio'
+    help = 'Populate initial data for portfolio, plus synthetic projects with --scale'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=0,
+                            help='Also generate this many synthetic projects for load testing')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed; the same seed generates the same data')
+        parser.add_argument('--images-per-project', type=int, default=3,
+                            help='Gallery images per synthetic project')
+        parser.add_argument('--skip-related', action='store_true',
+                            help="Don't rebuild related projects afterwards (slow at large scales)")
 
     def handle(self, *args, **options):
-        # Clear existing data
-        Project.objects.all().delete()
-        Skill.objects.all().delete()
-        Experience.objects.all().delete()
-        Education.objects.all().delete()
-        Certification.objects.all().delete()
+        started = time.perf_counter()
+        with transaction.atomic():
+            self.clear()
+            self.populate()
+            if options['scale']:
+                counts = generate(
+                    options['scale'], random.Random(options['seed']), options['images_per_project']
+                )
+                summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+                self.stdout.write(f'Generated {summary}')
+            rebuild_search_index()
+
+        # Bulk inserts and raw deletes skip the signal handlers, hence the
+        # search index rebuild above
+        for alias in ('default', 'pages'):
+            caches[alias].clear()
+        if not options['skip_related']:
+            rebuild_related_projects()
+        self.stdout.write(f'Done in {time.perf_counter() - started:.1f}s')
 
+    def clear(self):
+        # Plain DELETEs; QuerySet.delete() would load every row to run the
+        # signal handlers and cascade, which takes minutes at scale
+        with connection.cursor() as cursor:
+            for model in CLEARED_MODELS:
+                cursor.execute(f'DELETE FROM {connection.ops.quote_name(model._meta.db_table)}')
+
+    def populate(self):
         # Add projects
-        Project.objects.create(
-            title="Women Safety Scream Alarm",
-            short_description="Women Security App with Scream Alert designed to enhance personal safety",
-            description="Women Security App with Scream Alert is designed to enhance personal safety for women by providing an automatic, real-time distress signaling solution. Key features: Real-time Sound producing, GPS Integration, Manual Panic Button for activating the alert",
-            technologies="Python, Django, React, GPS API",
-            featured=True
-        )
-        
-        Project.objects.create(
-            title="MovieCupid",
-            short_description="Personalized movie recommendation platform",
-            description="A personalized movie recommendation platform that identifies users' favorite genres, artists, and directors to suggest movies tailored to their interests. It integrates external movie database TMDb to fetch details about movies, reviews, ratings, and OTT availability.",
-            technologies="Django, HTML/CSS, TMDb API, PostgreSQL",
-            featured=True
+        projects = Project.objects.bulk_create([
+            Project(
+                title="Women Safety Scream Alarm",
+                short_description="Women Security App with Scream Alert designed to enhance personal safety",
+                description="Women Security App with Scream Alert is designed to enhance personal safety for women by providing an automatic, real-time distress signaling solution. Key features: Real-time Sound producing, GPS Integration, Manual Panic Button for activating the alert",
+                featured=True
+            ),
+            Project(
+                title="MovieCupid",
+                short_description="Personalized movie recommendation platform",
+                description="A personalized movie recommendation platform that identifies users' favorite genres, artists, and directors to suggest movies tailored to their interests. It integrates external movie database TMDb to fetch details about movies, reviews, ratings, and OTT availability.",
+                featured=True
+            ),
+        ])
+        stacks = [
+            ["Python", "Django", "React", "GPS API"],
+            ["Django", "HTML/CSS", "TMDb API", "PostgreSQL"],
+        ]
+        ProjectTechnology.objects.bulk_create(
+            ProjectTechnology(project=project, technology=technology)
+            for project, names in zip(projects, stacks)
+            for technology in Technology.objects.from_names(names)
         )
 
         # Add skills
@@ -42,56 +99,57 @@ class Command(BaseCommand):
             ('API Integration', 'Backend', 80),
         ]
         
-        for name, category, proficiency in skills_data:
-            Skill.objects.create(
-                name=name,
-                category=category,
-                proficiency=proficiency
-            )
+        Skill.objects.bulk_create(
+            Skill(name=name, category=category, proficiency=proficiency)
+            for name, category, proficiency in skills_data
+        )
 
         # Add experiences
-        Experience.objects.create(
-            title="Intern",
-            company="Luminar Technolab",
-            description="Pursuing a full stack course in Python Django and React with hands-on web development experience.",
-            start_date="Oct 2023",
-            current=True
-        )
-        
-        Experience.objects.create(
-            title="Intern",
-            company="Tech By Heart",
-            description="Gained hands-on experience in cybersecurity and learned to combat digital threats.",
-            start_date="Dec 2023",
-            end_date="Jan 2024"
-        )
+        Experience.objects.bulk_create([
+            Experience(
+                title="Intern",
+                company="Luminar Technolab",
+                description="Pursuing a full stack course in Python Django and React with hands-on web development experience.",
+                start_date="Oct 2023",
+                current=True
+            ),
+            Experience(
+                title="Intern",
+                company="Tech By Heart",
+                description="Gained hands-on experience in cybersecurity and learned to combat digital threats.",
+                start_date="Dec 2023",
+                end_date="Jan 2024"
+            ),
+        ])
 
         # Add education
-        Education.objects.create(
-            degree="Bachelor of Science in Computer Science",
-            institution="University Name",
-            score="CGPA 7.0",
-            year="2020-2023"
-        )
-        
-        Education.objects.create(
-            degree="Higher Secondary Education",
-            institution="School Name",
-            score="Aggregate: 85%",
-            year="2018-2020"
-        )
+        Education.objects.bulk_create([
+            Education(
+                degree="Bachelor of Science in Computer Science",
+                institution="University Name",
+                score="CGPA 7.0",
+                year="2020-2023"
+            ),
+            Education(
+                degree="Higher Secondary Education",
+                institution="School Name",
+                score="Aggregate: 85%",
+                year="2018-2020"
+            ),
+        ])
 
         # Add certifications
-        Certification.objects.create(
-            title="Python Django - React - Full Stack Web Development Expert",
-            issuer="Luminar Technolab",
-            completion_date="Oct 2025"
-        )
-        
-        Certification.objects.create(
-            title="Cyber Security Intern",
-            issuer="Tech By Heart",
-            completion_date="Dec 2023"
-        )
+        Certification.objects.bulk_create([
+            Certification(
+                title="Python Django - React - Full Stack Web Development Expert",
+                issuer="Luminar Technolab",
+                completion_date="Oct 2025"
+            ),
+            Certification(
+                title="Cyber Security Intern",
+                issuer="Tech By Heart",
+                completion_date="Dec 2023"
+            ),
+        ])
 
         self.stdout.write(self.style.SUCCESS('Successfully populated initial data'))
\ No newline at end of file
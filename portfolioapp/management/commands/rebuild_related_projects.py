@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+from portfolioapp.related import rebuild_related_projects
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed related projects for every project'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_related_projects()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt related projects for {count} projects in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+from portfolioapp.search import rebuild_search_index
+
+class Command(BaseCommand):
+    help = 'Re-index every project for full-text search, e.g. after bulk loading data'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = rebuild_search_index()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {count} projects in {elapsed:.2f}s'
+        ))
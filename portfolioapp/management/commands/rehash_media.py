@@ -0,0 +1,104 @@
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from portfolio.storage import is_hashed_name
+from portfolioapp.images import DERIVATIVE_WIDTHS, IMAGE_FIELDS, MODERN_FORMATS, derivative_name, fallback_format
+
+# Cached pages and srcsets link the old names. Clearing a per-process cache
+# here doesn't reach the web processes, so the old files have to stay until
+# their cached entries expire (PAGE_CACHE_TIMEOUT)
+CACHE_ALIASES = ('default', 'pages')
+
+
+def derivative_names(name):
+    for fmt in MODERN_FORMATS + (fallback_format(name),):
+        for width in DERIVATIVE_WIDTHS:
+            yield derivative_name(name, width, fmt)
+
+
+class Command(BaseCommand):
+    help = 'Move uploads stored under their original names to content-hashed names, merging duplicates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Rows per UPDATE')
+        parser.add_argument('--delete-old', action='store_true',
+                            help='Delete the old files and their derivatives afterwards. Needs '
+                                 'caches shared between processes; otherwise leave the old files '
+                                 'until the cached pages expire. Browsers and proxies may still '
+                                 'hold pages linking them for their max-age.')
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        if not getattr(storage, 'deduplicates', False):
+            raise CommandError('The default storage is not content-hashed; see STORAGES in settings')
+        local = [alias for alias in CACHE_ALIASES if isinstance(caches[alias], LocMemCache)]
+        if options['delete_old'] and local:
+            raise CommandError(
+                f'--delete-old needs shared caches, but {", ".join(local)} is per-process; '
+                'run without it and delete the old files once cached pages expire'
+            )
+
+        # Old name -> hashed name, or None when the file is missing; each
+        # file is read once however many rows use it
+        renamed = {}
+        rows = 0
+        now = timezone.now()
+        for model, field_name in IMAGE_FIELDS:
+            changed = []
+            queryset = model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            for instance in queryset.order_by().only('pk', field_name).iterator():
+                name = getattr(instance, field_name).name
+                if is_hashed_name(name):
+                    continue
+                if name not in renamed:
+                    renamed[name] = self.rehash(storage, name)
+                if renamed[name] is None:
+                    continue
+                setattr(instance, field_name, renamed[name])
+                # bulk_update skips auto_now; the page validators read it
+                instance.updated_at = now
+                changed.append(instance)
+            if changed:
+                with transaction.atomic():
+                    model.objects.bulk_update(
+                        changed, [field_name, 'updated_at'], batch_size=options['batch_size']
+                    )
+                rows += len(changed)
+
+        # bulk_update skips the signal handlers, and cached pages link the
+        # old names; clear them before the old files go
+        for alias in CACHE_ALIASES:
+            caches[alias].clear()
+
+        if options['delete_old']:
+            for name, new_name in renamed.items():
+                if new_name is not None:
+                    for old in (name, *derivative_names(name)):
+                        storage.delete(old)
+
+        stored = {new_name for new_name in renamed.values() if new_name is not None}
+        moved = sum(new_name is not None for new_name in renamed.values())
+        missing = sorted(name for name, new_name in renamed.items() if new_name is None)
+        for name in missing:
+            self.stderr.write(f'  missing: {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Rehashed {moved} files into {len(stored)} ({moved - len(stored)} duplicates), '
+            f'updated {rows} rows, {len(missing)} missing'
+        ))
+
+    def rehash(self, storage, name):
+        """Store ``name`` and its derivatives under the content hash; returns the new name"""
+        if not storage.exists(name):
+            return None
+        with storage.open(name) as content:
+            new_name = storage.save(name, content)
+        for old, new in zip(derivative_names(name), derivative_names(new_name)):
+            if storage.exists(old) and not storage.exists(new):
+                with storage.open(old) as content:
+                    storage.save_variant(new, content)
+        return new_name
@@ -0,0 +1,61 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from portfolioapp.jobs import claim_jobs, requeue_stale_jobs
+from portfolioapp.worker import run_job, setup_child
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (image processing) on a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help='Size of the process pool')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is drained instead of polling')
+        parser.add_argument('--requeue-interval', type=float, default=60.0,
+                            help='Seconds between checks for jobs left running by a crash')
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        # At startup, then every interval: a child can die mid-job while
+        # this keeps running
+        next_requeue = 0
+
+        # Spawn rather than fork so children never share the parent's
+        # database connections
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(processes, mp_context=context, initializer=setup_child) as pool:
+            running = {}
+            while True:
+                if time.monotonic() >= next_requeue:
+                    requeued = requeue_stale_jobs()
+                    if requeued:
+                        self.stdout.write(f'Requeued {requeued} stale jobs')
+                    next_requeue = time.monotonic() + options['requeue_interval']
+
+                for job_id in claim_jobs(processes - len(running)):
+                    running[pool.submit(run_job, job_id)] = job_id
+
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        status = future.result()
+                    except Exception as exc:
+                        # The child died before it could record the outcome;
+                        # requeue_stale_jobs picks the job up again later
+                        self.stderr.write(f'Job {job_id} crashed: {exc}')
+                    else:
+                        self.stdout.write(f'Job {job_id}: {status}')
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolioapp', '0003_projectimage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Technology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+                ('icon', models.CharField(blank=True, max_length=100)),
+                ('category', models.CharField(blank=True, max_length=50)),
+            ],
+            options={
+                'verbose_name_plural': 'technologies',
+                'ordering': ['name'],
+            },
+        ),
+        # Keep the comma-separated strings around until 0005 has parsed them
+        migrations.RenameField(
+            model_name='project',
+            old_name='technologies',
+            new_name='legacy_technologies',
+        ),
+        migrations.CreateModel(
+            name='ProjectTechnology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='portfolioapp.project')),
+                ('technology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='portfolioapp.technology')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='technologies',
+            field=models.ManyToManyField(blank=True, related_name='projects', through='portfolioapp.ProjectTechnology', to='portfolioapp.technology'),
+        ),
+        migrations.AddIndex(
+            model_name='projecttechnology',
+            index=models.Index(fields=['technology', 'project'], name='projtech_technology_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='projecttechnology',
+            constraint=models.UniqueConstraint(fields=('project', 'technology'), name='unique_project_technology'),
+        ),
+    ]
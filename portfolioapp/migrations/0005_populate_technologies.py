@@ -0,0 +1,48 @@
+from django.db import migrations
+from django.utils.text import slugify
+
+
+def slug_for(name):
+    # Mirrors Technology.slug_for at the time of this migration
+    return slugify(name.replace('+', ' plus ').replace('#', ' sharp '))
+
+
+def split_technologies(apps, schema_editor):
+    Project = apps.get_model('portfolioapp', 'Project')
+    Technology = apps.get_model('portfolioapp', 'Technology')
+    ProjectTechnology = apps.get_model('portfolioapp', 'ProjectTechnology')
+    db_alias = schema_editor.connection.alias
+
+    technologies = {tech.slug: tech for tech in Technology.objects.using(db_alias)}
+    links = []
+    for project in Project.objects.using(db_alias).exclude(legacy_technologies=''):
+        seen = set()
+        for name in project.legacy_technologies.split(','):
+            name = name.strip()
+            slug = slug_for(name)
+            if not slug or slug in seen:
+                continue
+            seen.add(slug)
+            if slug not in technologies:
+                technologies[slug] = Technology.objects.using(db_alias).create(name=name, slug=slug)
+            links.append(ProjectTechnology(project=project, technology=technologies[slug]))
+    ProjectTechnology.objects.using(db_alias).bulk_create(links, ignore_conflicts=True)
+
+
+def join_technologies(apps, schema_editor):
+    Project = apps.get_model('portfolioapp', 'Project')
+    db_alias = schema_editor.connection.alias
+    for project in Project.objects.using(db_alias).prefetch_related('technologies'):
+        project.legacy_technologies = ', '.join(tech.name for tech in project.technologies.all())
+        project.save(update_fields=['legacy_technologies'], using=db_alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolioapp', '0004_technology'),
+    ]
+
+    operations = [
+        migrations.RunPython(split_technologies, join_technologies),
+    ]
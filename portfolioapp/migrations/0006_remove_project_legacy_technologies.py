@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolioapp', '0005_populate_technologies'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='project',
+            name='legacy_technologies',
+        ),
+    ]
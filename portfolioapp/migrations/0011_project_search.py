@@ -0,0 +1,69 @@
+from django.db import migrations
+
+# Frozen copies of the index definition in search.py at the time of this
+# migration
+
+SQLITE_CREATE = """
+    CREATE VIRTUAL TABLE portfolioapp_project_search USING fts5(
+        title, short_description, description, technologies,
+        tokenize = 'porter unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+"""
+SQLITE_FILL = """
+    INSERT INTO portfolioapp_project_search (rowid, title, short_description, description, technologies)
+    SELECT p.id, p.title, p.short_description, p.description,
+           COALESCE((SELECT group_concat(t.name, ' ')
+                     FROM portfolioapp_projecttechnology pt
+                     JOIN portfolioapp_technology t ON t.id = pt.technology_id
+                     WHERE pt.project_id = p.id), '')
+    FROM portfolioapp_project p
+"""
+
+POSTGRES_CREATE = """
+    CREATE TABLE portfolioapp_project_search (
+        project_id bigint PRIMARY KEY
+            REFERENCES portfolioapp_project (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL
+    );
+    CREATE INDEX portfolioapp_project_search_document_idx
+        ON portfolioapp_project_search USING gin (document);
+"""
+POSTGRES_FILL = """
+    INSERT INTO portfolioapp_project_search (project_id, document)
+    SELECT p.id, setweight(to_tsvector('english', p.title), 'A')
+                 || setweight(to_tsvector('english', COALESCE((
+                        SELECT string_agg(t.name, ' ')
+                        FROM portfolioapp_projecttechnology pt
+                        JOIN portfolioapp_technology t ON t.id = pt.technology_id
+                        WHERE pt.project_id = p.id), '')), 'A')
+                 || setweight(to_tsvector('english', p.short_description), 'B')
+                 || setweight(to_tsvector('english', p.description), 'C')
+    FROM portfolioapp_project p
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_CREATE)
+        schema_editor.execute(SQLITE_FILL)
+    elif vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_CREATE)
+        schema_editor.execute(POSTGRES_FILL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE portfolioapp_project_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolioapp', '0010_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
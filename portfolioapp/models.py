@@ -2,35 +2,124 @@
 from django.db import models
 from django.utils import timezone
 from django.core.validators import FileExtensionValidator
+from django.utils.text import slugify
+
+
+class TechnologyManager(models.Manager):
+    def from_names(self, names):
+        """Return Technology rows for the given names, creating missing ones"""
+        technologies = []
+        for name in names:
+            name = name.strip()
+            slug = Technology.slug_for(name)
+            if not slug:
+                continue
+            technology, _ = self.get_or_create(slug=slug, defaults={'name': name})
+            if technology not in technologies:
+                technologies.append(technology)
+        return technologies
+
+
+class Technology(models.Model):
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+    icon = models.CharField(max_length=100, blank=True)
+    category = models.CharField(max_length=50, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = TechnologyManager()
+
+    @staticmethod
+    def slug_for(name):
+        # Keep "C++" and "C#" apart from "C" instead of slugifying them away
+        return slugify(name.replace('+', ' plus ').replace('#', ' sharp '))
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = self.slug_for(self.name)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = 'technologies'
+
 
 class Project(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     short_description = models.CharField(max_length=300, blank=True)
     image = models.ImageField(upload_to='projects/', blank=True, null=True)
+    image_sha256 = models.CharField(max_length=64, blank=True, editable=False)
     project_url = models.URLField(blank=True, null=True)
     github_url = models.URLField(blank=True, null=True)
-    technologies = models.CharField(max_length=500, blank=True)
+    technologies = models.ManyToManyField(
+        Technology, through='ProjectTechnology', related_name='projects', blank=True
+    )
     featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def get_technologies_list(self):
-        if self.technologies:
-            return [tech.strip() for tech in self.technologies.split(',')]
-        return []
+        # Uses the prefetch cache when the queryset prefetched technologies
+        return [tech.name for tech in self.technologies.all()]
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination on the projects listing
+            models.Index(fields=['-created_at', '-id'], name='project_created_id_idx'),
+        ]
+
+
+class ProjectTechnology(models.Model):
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    technology = models.ForeignKey(Technology, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.technology.name} in {self.project.title}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'technology'], name='unique_project_technology'),
+        ]
+        indexes = [
+            # Reverse lookups: projects using a technology
+            models.Index(fields=['technology', 'project'], name='projtech_technology_idx'),
+        ]
+
+
+class RelatedProject(models.Model):
+    """Precomputed nearest neighbours of a project, see related.py"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.related.title} related to {self.project.title}"
+
+    class Meta:
+        ordering = ['project', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'rank'], name='unique_related_project_rank'),
+        ]
 
 
 class ProjectImage(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='project_images/')
+    image_sha256 = models.CharField(max_length=64, blank=True, editable=False)
     caption = models.CharField(max_length=200, blank=True)
     order = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         return f"Image for {self.project.title}"
@@ -43,6 +132,7 @@ class Skill(models.Model):
     name = models.CharField(max_length=100)
     category = models.CharField(max_length=50)
     proficiency = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -57,10 +147,12 @@ class Experience(models.Model):
         null=True,
         validators=[FileExtensionValidator(['jpg', 'jpeg', 'png', 'svg', 'webp'])]
     )
+    company_logo_sha256 = models.CharField(max_length=64, blank=True, editable=False)
     description = models.TextField()
     start_date = models.CharField(max_length=50)  # Using CharField temporarily
     end_date = models.CharField(max_length=50, blank=True, null=True)
     current = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.title} at {self.company}"
@@ -71,6 +163,7 @@ class Education(models.Model):
     institution = models.CharField(max_length=200)
     score = models.CharField(max_length=100)
     year = models.CharField(max_length=50)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.degree
@@ -80,6 +173,41 @@ class Certification(models.Model):
     title = models.CharField(max_length=200)
     issuer = models.CharField(max_length=200)
     completion_date = models.CharField(max_length=50)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.title
+
+
+class Job(models.Model):
+    """A unit of background work, run by `manage.py run_worker`"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # The worker polls for due pending jobs
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
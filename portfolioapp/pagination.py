@@ -0,0 +1,51 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from django.http import Http404
+
+
+def encode_cursor(project):
+    """
+    Opaque cursor pointing just past ``project`` in newest-first order;
+    ``project`` may also be a .values() row with created_at and id
+    """
+    if isinstance(project, dict):
+        created_at, pk = project['created_at'], project['id']
+    else:
+        created_at, pk = project.created_at, project.pk
+    raw = f'{created_at.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the (created_at, id) pair encoded by encode_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise Http404("Invalid cursor")
+
+
+def paginate_by_cursor(queryset, cursor, per_page):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    Each page is a range scan on the (created_at, id) index starting from
+    the cursor, so page N costs the same as page 1 (no OFFSET). Returns the
+    rows of the page and the cursor of the next page, or None on the last page.
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        # The redundant created_at__lte lets the database seek into the
+        # index instead of scanning it from the newest row
+        queryset = queryset.filter(created_at__lte=created_at).filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+    # Fetch one extra row to learn whether another page exists
+    rows = list(queryset[:per_page + 1])
+    if len(rows) > per_page:
+        return rows[:per_page], encode_cursor(rows[per_page - 1])
+    return rows, None
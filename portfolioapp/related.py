@@ -0,0 +1,200 @@
+"""
+Related-projects engine.
+
+Projects are scored against each other on shared technologies (Jaccard)
+and on shared keywords, a project's keywords being its highest TF-IDF
+terms. Shared counts for all other projects are accumulated at once by
+counting over inverted indexes, so a project is only compared with
+projects it has something in common with, and only the strongest
+candidates are scored exactly. A full rebuild over thousands of projects
+stays in the seconds range. The top neighbours are stored in
+RelatedProject so the detail view reads them with one indexed lookup.
+
+Edits don't rescore anything themselves: they queue a refresh_related job
+(see tasks.py), which the background worker runs.
+"""
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from itertools import chain
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import Count, Min
+
+from .jobs import enqueue
+from .models import Project, ProjectTechnology, RelatedProject
+
+RELATED_PROJECTS_LIMIT = 3
+TECHNOLOGY_WEIGHT = 0.7
+KEYWORD_WEIGHT = 0.3
+KEYWORDS_PER_PROJECT = 10
+# How many of the best candidates by raw overlap get an exact score
+CANDIDATES_PER_FEATURE = 25
+
+STOP_WORDS = frozenset("""
+    a an and are as at be by for from has have in is it its of on or that the
+    this to was were will with using used use based app application project
+""".split())
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]+')
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class SimilarityIndex:
+    """Technologies and keywords of every project, plus inverted indexes"""
+
+    def __init__(self):
+        self.technologies = defaultdict(tuple)
+        rows = ProjectTechnology.objects.values_list('project_id', 'technology_id').order_by('project_id')
+        grouped = defaultdict(list)
+        for project_id, technology_id in rows:
+            grouped[project_id].append(technology_id)
+        self.technologies.update((project_id, tuple(ids)) for project_id, ids in grouped.items())
+
+        term_counts = {}
+        for project_id, title, short_description, description in Project.objects.values_list(
+            'id', 'title', 'short_description', 'description'
+        ):
+            counts = Counter(tokenize(f'{short_description} {description}'))
+            # Title words count double
+            for token in tokenize(title):
+                counts[token] += 2
+            term_counts[project_id] = counts
+        self.project_ids = list(term_counts)
+
+        document_frequency = Counter(chain.from_iterable(term_counts.values()))
+        total = len(self.project_ids)
+        self.keywords = {}
+        for project_id, counts in term_counts.items():
+            weights = {
+                term: (1 + math.log(count)) * math.log((1 + total) / document_frequency[term])
+                for term, count in counts.items()
+            }
+            top = heapq.nlargest(KEYWORDS_PER_PROJECT, weights.items(), key=itemgetter(1))
+            self.keywords[project_id] = tuple(term for term, _ in top)
+
+        self.technology_postings = defaultdict(list)
+        for project_id, technology_ids in self.technologies.items():
+            for technology_id in technology_ids:
+                self.technology_postings[technology_id].append(project_id)
+
+        self.keyword_postings = defaultdict(list)
+        for project_id, keywords in self.keywords.items():
+            for keyword in keywords:
+                self.keyword_postings[keyword].append(project_id)
+
+    def _overlap(self, features, postings):
+        # Counter.update over the posting lists counts in C
+        counts = Counter()
+        for feature in features:
+            counts.update(postings[feature])
+        return counts
+
+    def scores(self, project_id, exhaustive=False):
+        """
+        Similarity of other projects to ``project_id``.
+
+        Only the strongest candidates by raw overlap are scored unless
+        ``exhaustive``, in which case every overlapping project is.
+        Scores are symmetric.
+        """
+        technologies = self.technologies[project_id]
+        keywords = self.keywords.get(project_id, ())
+        shared_technologies = self._overlap(technologies, self.technology_postings)
+        shared_keywords = self._overlap(keywords, self.keyword_postings)
+        if exhaustive:
+            candidates = shared_technologies.keys() | shared_keywords.keys()
+        else:
+            candidates = {
+                other_id
+                for counts in (shared_technologies, shared_keywords)
+                for other_id, _ in counts.most_common(CANDIDATES_PER_FEATURE + 1)
+            }
+        candidates.discard(project_id)
+
+        scores = {}
+        for other_id in candidates:
+            shared = shared_technologies[other_id]
+            jaccard = 0.0
+            if shared:
+                jaccard = shared / (len(technologies) + len(self.technologies[other_id]) - shared)
+            keyword_similarity = 0.0
+            if shared_keywords[other_id]:
+                keyword_similarity = shared_keywords[other_id] / math.sqrt(
+                    len(keywords) * len(self.keywords[other_id])
+                )
+            scores[other_id] = TECHNOLOGY_WEIGHT * jaccard + KEYWORD_WEIGHT * keyword_similarity
+        return scores
+
+    def neighbours(self, project_id, limit=RELATED_PROJECTS_LIMIT):
+        """The ``limit`` best (other_id, score) pairs, newest id first on ties"""
+        return heapq.nlargest(limit, self.scores(project_id).items(), key=lambda item: (item[1], item[0]))
+
+
+def rebuild_related_projects(project_ids=None, index=None):
+    """
+    Recompute stored neighbours for ``project_ids`` (all projects if None).
+
+    Returns the number of projects whose neighbours were rebuilt.
+    """
+    index = index or SimilarityIndex()
+    rebuild_all = project_ids is None
+    if rebuild_all:
+        project_ids = index.project_ids
+    else:
+        known = set(index.project_ids)
+        project_ids = [project_id for project_id in project_ids if project_id in known]
+
+    rows = [
+        RelatedProject(project_id=project_id, related_id=other_id, score=score, rank=rank)
+        for project_id in project_ids
+        for rank, (other_id, score) in enumerate(index.neighbours(project_id))
+    ]
+    with transaction.atomic():
+        if rebuild_all:
+            RelatedProject.objects.all().delete()
+        else:
+            RelatedProject.objects.filter(project_id__in=project_ids).delete()
+        RelatedProject.objects.bulk_create(rows, batch_size=1000)
+    return len(project_ids)
+
+
+def refresh_related_projects(project_ids):
+    """
+    Rebuild neighbours after the given projects changed.
+
+    Besides the projects themselves, projects that listed them may lose
+    them, and projects they now outscore a stored neighbour of may gain them.
+    """
+    index = SimilarityIndex()
+    affected = set(project_ids)
+    affected.update(
+        RelatedProject.objects.filter(related_id__in=project_ids).values_list('project_id', flat=True)
+    )
+    weakest = {
+        row['project_id']: row for row in
+        RelatedProject.objects.values('project_id').annotate(weakest=Min('score'), count=Count('id'))
+    }
+    for project_id in project_ids:
+        for other_id, score in index.scores(project_id, exhaustive=True).items():
+            stored = weakest.get(other_id)
+            if stored is None or stored['count'] < RELATED_PROJECTS_LIMIT or score >= stored['weakest']:
+                affected.add(other_id)
+    rebuild_related_projects(affected, index=index)
+
+
+def schedule_related_refresh(project_ids):
+    """
+    Queue a refresh of the neighbours of ``project_ids`` for the worker.
+
+    The job is written in the current transaction, so a rollback drops it,
+    and signals asking for the same projects share one pending job.
+    """
+    project_ids = sorted(set(project_ids))
+    if project_ids:
+        enqueue('refresh_related', project_ids=project_ids)
@@ -0,0 +1,222 @@
+"""
+Full-text search over projects, behind /projects/search/.
+
+The index is a separate table, created by migration 0011, holding each
+project's title, descriptions and technology names:
+
+- SQLite: an FTS5 table keyed by the project id, ranked with bm25() and
+  highlighted with snippet(). Its prefix indexes make the prefix match on
+  the last word as cheap as a whole-word one
+- PostgreSQL: a weighted tsvector per project with a GIN index, ranked
+  with ts_rank_cd() and highlighted with ts_headline()
+
+Other backends fall back to icontains lookups without ranking.
+
+The signal handlers in signals.py re-index a project whenever it or its
+technologies change. Bulk inserts skip them, so anything that bulk loads
+projects (populate_data) calls rebuild_search_index() afterwards.
+"""
+import re
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Project
+
+SEARCH_TABLE = 'portfolioapp_project_search'
+# Longer queries only add cost; a handful of words is plenty
+MAX_TERMS = 8
+SNIPPET_WORDS = 24
+# Only the newest this many matches are ranked, which bounds the cost of
+# queries matching a large part of the table. Their scores barely differ
+# anyway, since a word found everywhere carries little weight
+MAX_RANKED = 5000
+# Highlight markers put in by the database, swapped for <mark> once the
+# snippet is escaped
+START_MARK, STOP_MARK = '\x02', '\x03'
+
+TERM_RE = re.compile(r'\w+')
+
+# The indexed text of each project, used by both index_project and the
+# full rebuild. {technologies} aggregates the names per backend
+DOCUMENT_SQL = """
+    SELECT p.id, p.title, p.short_description, p.description,
+           COALESCE((SELECT {technologies}
+                     FROM portfolioapp_projecttechnology pt
+                     JOIN portfolioapp_technology t ON t.id = pt.technology_id
+                     WHERE pt.project_id = p.id), '')
+    FROM portfolioapp_project p
+"""
+
+SQLITE_DOCUMENT_SQL = DOCUMENT_SQL.format(technologies="group_concat(t.name, ' ')")
+SQLITE_INSERT_SQL = (
+    f'INSERT INTO {SEARCH_TABLE} (rowid, title, short_description, description, technologies) '
+    f'{SQLITE_DOCUMENT_SQL}'
+)
+SQLITE_SEARCH_SQL = f"""
+    SELECT rowid, snippet({SEARCH_TABLE}, 2, %s, %s, '…', %s)
+    FROM {SEARCH_TABLE}
+    WHERE {SEARCH_TABLE} MATCH %s AND rowid >= (
+        SELECT COALESCE(MIN(rowid), 0) FROM (
+            SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s ORDER BY rowid DESC LIMIT %s
+        )
+    )
+    -- Title and technology matches count most
+    ORDER BY bm25({SEARCH_TABLE}, 10.0, 4.0, 1.0, 6.0), rowid DESC
+    LIMIT %s OFFSET %s
+"""
+
+POSTGRES_DOCUMENT_SQL = DOCUMENT_SQL.format(technologies="string_agg(t.name, ' ')")
+POSTGRES_INSERT_SQL = f"""
+    INSERT INTO {SEARCH_TABLE} (project_id, document)
+    SELECT id, setweight(to_tsvector('english', title), 'A')
+               || setweight(to_tsvector('english', technologies), 'A')
+               || setweight(to_tsvector('english', short_description), 'B')
+               || setweight(to_tsvector('english', description), 'C')
+    FROM ({POSTGRES_DOCUMENT_SQL} {{where}}) AS documents (id, title, short_description, description, technologies)
+    ON CONFLICT (project_id) DO UPDATE SET document = EXCLUDED.document
+"""
+POSTGRES_SEARCH_SQL = f"""
+    WITH query AS (SELECT websearch_to_tsquery('english', %s) AS query),
+    candidates AS (
+        SELECT s.project_id, s.document
+        FROM {SEARCH_TABLE} s, query
+        WHERE s.document @@ query.query
+        ORDER BY s.project_id DESC
+        LIMIT %s
+    ),
+    hits AS (
+        SELECT c.project_id, ts_rank_cd(c.document, query.query) AS rank
+        FROM candidates c, query
+        ORDER BY rank DESC, c.project_id DESC
+        LIMIT %s OFFSET %s
+    )
+    SELECT hits.project_id, ts_headline('english', p.description, query.query, %s)
+    FROM hits JOIN portfolioapp_project p ON p.id = hits.project_id, query
+    ORDER BY hits.rank DESC, hits.project_id DESC
+"""
+
+
+def search_terms(query):
+    return TERM_RE.findall(query.lower())[:MAX_TERMS]
+
+
+def fts5_query(terms):
+    """
+    All of ``terms``, the last one as a prefix so results show up while
+    the visitor is still typing. Every term is quoted, so FTS5 operators
+    in the input are matched as plain words.
+    """
+    query = ' '.join(f'"{term}"' for term in terms)
+    # One-letter prefixes aren't in the prefix index and match nearly
+    # everything; "C#" is indexed as "c"
+    return query + '*' if len(terms[-1]) > 1 else query
+
+
+def highlight(snippet):
+    """Escape a snippet from the database and turn its markers into <mark>"""
+    return mark_safe(
+        escape(snippet).replace(START_MARK, '<mark>').replace(STOP_MARK, '</mark>')
+    )
+
+
+def _connection():
+    return connections[router.db_for_write(Project)]
+
+
+def index_project(project_id, using=None):
+    """Bring the index entry of one project up to date, or drop it if the project is gone"""
+    connection = connections[using] if using else _connection()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [project_id])
+            cursor.execute(f'{SQLITE_INSERT_SQL} WHERE p.id = %s', [project_id])
+        elif connection.vendor == 'postgresql':
+            # The index row is deleted with the project by its foreign key
+            cursor.execute(POSTGRES_INSERT_SQL.format(where='WHERE p.id = %s'), [project_id])
+
+
+def unindex_project(project_id, using=None):
+    connection = connections[using] if using else _connection()
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [project_id])
+
+
+def rebuild_search_index(using=None):
+    """Re-index every project in one statement; returns the number of projects"""
+    connection = connections[using] if using else _connection()
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+            cursor.execute(SQLITE_INSERT_SQL)
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+            cursor.execute(POSTGRES_INSERT_SQL.format(where=''))
+    return Project.objects.using(connection.alias).count()
+
+
+def _hits(query, limit, offset):
+    """``[(project_id, snippet), ...]`` best match first"""
+    connection = connections[router.db_for_read(Project)]
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == 'sqlite':
+        sql = SQLITE_SEARCH_SQL
+        match = fts5_query(terms)
+        params = [START_MARK, STOP_MARK, SNIPPET_WORDS, match, match, MAX_RANKED, limit, offset]
+    elif connection.vendor == 'postgresql':
+        sql = POSTGRES_SEARCH_SQL
+        options = (
+            f'StartSel={START_MARK}, StopSel={STOP_MARK}, MaxWords={SNIPPET_WORDS}, '
+            'MinWords=8, MaxFragments=2'
+        )
+        params = [query, MAX_RANKED, limit, offset, options]
+    else:
+        matches = Q()
+        for term in terms:
+            matches &= (
+                Q(title__icontains=term) | Q(short_description__icontains=term)
+                | Q(description__icontains=term) | Q(technologies__name__icontains=term)
+            )
+        ids = (
+            Project.objects.filter(matches).distinct()
+            .order_by('-created_at', '-id').values_list('id', flat=True)[offset:offset + limit]
+        )
+        return [(project_id, '') for project_id in ids]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def search_projects(query, page=1, per_page=12):
+    """
+    One page of projects matching ``query``, best match first.
+
+    Returns ``(projects, has_next)``; each project carries a ``snippet`` of
+    its description with the matched words in <mark>.
+    """
+    offset = (page - 1) * per_page
+    if offset >= MAX_RANKED:
+        # Nothing is ranked past there, and a page number from the URL can
+        # be too big for the database's integers
+        return [], False
+    # One extra row tells whether another page exists
+    hits = _hits(query, per_page + 1, offset)
+    has_next = len(hits) > per_page
+    hits = hits[:per_page]
+
+    projects = Project.objects.prefetch_related('technologies').in_bulk([project_id for project_id, _ in hits])
+    results = []
+    for project_id, snippet in hits:
+        # A project deleted since the index was read is skipped
+        project = projects.get(project_id)
+        if project is not None:
+            project.snippet = highlight(snippet) if snippet else project.short_description
+            results.append(project)
+    return results, has_next
@@ -0,0 +1,172 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete, m2m_changed
+from .models import (
+    Project, ProjectImage, ProjectTechnology, RelatedProject, Technology,
+    Skill, Experience, Education, Certification,
+)
+from .cache import clear_page_cache, bump_project_version
+from .related import schedule_related_refresh
+from .images import IMAGE_FIELDS, strip_upload_metadata
+from .jobs import enqueue
+from .search import index_project, unindex_project
+
+
+# Models whose rows are rendered on cached pages
+CACHED_PAGE_MODELS = (
+    Project, ProjectImage, ProjectTechnology, Technology, Skill, Experience, Education, Certification
+)
+
+
+def invalidate_page_cache(sender, **kwargs):
+    """Clear cached pages whenever portfolio data is edited"""
+    # Not before the edit commits, or a request in between would cache the
+    # old data again for the full timeout
+    transaction.on_commit(clear_page_cache)
+
+
+def invalidate_project_fragments(sender, instance, **kwargs):
+    """Re-render only the cards of the project that changed"""
+    # A saved Project has a new updated_at already
+    bump_project_version(instance.project_id)
+
+
+def invalidate_technology_fragments(sender, instance, **kwargs):
+    """A renamed technology shows up on every card that uses it"""
+    bump_project_version(*instance.projects.values_list('pk', flat=True))
+
+
+def invalidate_on_technologies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """project.technologies.set()/add() bypass the save signals"""
+    if action == 'pre_clear' and reverse:
+        # technology.projects.clear() only knows its projects before the rows go
+        invalidate_technology_fragments(sender, instance)
+        return
+    if not action.startswith('post_'):
+        return
+    transaction.on_commit(clear_page_cache)
+    if not reverse:
+        bump_project_version(instance.pk)
+    else:
+        bump_project_version(*(pk_set or ()))
+
+
+def refresh_related_on_save(sender, instance, **kwargs):
+    """Re-score neighbours when a project's text or technologies change"""
+    if isinstance(instance, ProjectTechnology):
+        schedule_related_refresh([instance.project_id])
+    else:
+        schedule_related_refresh([instance.pk])
+
+
+def refresh_related_on_project_delete(sender, instance, **kwargs):
+    """Projects listing a deleted project need a replacement neighbour"""
+    schedule_related_refresh(
+        RelatedProject.objects.filter(related=instance).values_list('project_id', flat=True)
+    )
+
+
+def refresh_related_on_technologies_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        schedule_related_refresh(instance.projects.values_list('pk', flat=True))
+    elif action.startswith('post_'):
+        schedule_related_refresh(pk_set or () if reverse else [instance.pk])
+
+
+def reindex_on_save(sender, instance, using, **kwargs):
+    """Keep the search index entry of a project in step with its text and technologies"""
+    if isinstance(instance, ProjectTechnology):
+        index_project(instance.project_id, using)
+    else:
+        index_project(instance.pk, using)
+
+
+def unindex_on_project_delete(sender, instance, using, **kwargs):
+    unindex_project(instance.pk, using)
+
+
+def reindex_technology_projects(sender, instance, using, **kwargs):
+    """A renamed technology changes the indexed text of every project using it"""
+    for project_id in instance.projects.using(using).values_list('pk', flat=True):
+        index_project(project_id, using)
+
+
+def reindex_on_technologies_changed(sender, instance, action, reverse, pk_set, using, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # technology.projects.clear() only knows its projects before the rows go
+        instance._search_cleared = list(instance.projects.using(using).values_list('pk', flat=True))
+        return
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        project_ids = [instance.pk]
+    elif action == 'post_clear':
+        project_ids = instance.__dict__.pop('_search_cleared', ())
+    else:
+        project_ids = pk_set or ()
+    for project_id in project_ids:
+        index_project(project_id, using)
+
+
+def mark_new_uploads_unprocessed(sender, instance, **kwargs):
+    """A freshly uploaded file hasn't been committed to storage yet"""
+    for model, field_name in IMAGE_FIELDS:
+        field_file = getattr(instance, field_name) if sender is model else None
+        if field_file and not field_file._committed:
+            setattr(instance, f'{field_name}_sha256', '')
+
+
+def strip_new_uploads(sender, instance, **kwargs):
+    """Uploads are stored without EXIF from the start"""
+    for model, field_name in IMAGE_FIELDS:
+        field_file = getattr(instance, field_name) if sender is model else None
+        if field_file and not field_file._committed:
+            strip_upload_metadata(field_file)
+
+
+def queue_image_processing(sender, instance, **kwargs):
+    """Hand unprocessed uploads to the background worker"""
+    for model, field_name in IMAGE_FIELDS:
+        if sender is model and getattr(instance, field_name) and not getattr(instance, f'{field_name}_sha256'):
+            enqueue('process_image', model=model._meta.label, pk=instance.pk, field=field_name)
+
+
+for model in CACHED_PAGE_MODELS:
+    post_save.connect(invalidate_page_cache, sender=model,
+                      dispatch_uid=f'page_cache_save_{model.__name__}')
+    post_delete.connect(invalidate_page_cache, sender=model,
+                        dispatch_uid=f'page_cache_delete_{model.__name__}')
+
+for model in (ProjectImage, ProjectTechnology):
+    post_save.connect(invalidate_project_fragments, sender=model,
+                      dispatch_uid=f'fragment_cache_save_{model.__name__}')
+    post_delete.connect(invalidate_project_fragments, sender=model,
+                        dispatch_uid=f'fragment_cache_delete_{model.__name__}')
+
+post_save.connect(invalidate_technology_fragments, sender=Technology,
+                  dispatch_uid='fragment_cache_save_Technology')
+m2m_changed.connect(invalidate_on_technologies_changed, sender=Project.technologies.through,
+                    dispatch_uid='technologies_changed')
+
+post_save.connect(refresh_related_on_save, sender=Project, dispatch_uid='related_save_Project')
+post_save.connect(refresh_related_on_save, sender=ProjectTechnology,
+                  dispatch_uid='related_save_ProjectTechnology')
+post_delete.connect(refresh_related_on_save, sender=ProjectTechnology,
+                    dispatch_uid='related_delete_ProjectTechnology')
+pre_delete.connect(refresh_related_on_project_delete, sender=Project,
+                   dispatch_uid='related_delete_Project')
+m2m_changed.connect(refresh_related_on_technologies_changed, sender=Project.technologies.through,
+                    dispatch_uid='related_technologies_changed')
+post_save.connect(reindex_on_save, sender=Project, dispatch_uid='search_save_Project')
+post_save.connect(reindex_on_save, sender=ProjectTechnology, dispatch_uid='search_save_ProjectTechnology')
+post_delete.connect(reindex_on_save, sender=ProjectTechnology, dispatch_uid='search_delete_ProjectTechnology')
+post_delete.connect(unindex_on_project_delete, sender=Project, dispatch_uid='search_delete_Project')
+post_save.connect(reindex_technology_projects, sender=Technology, dispatch_uid='search_save_Technology')
+m2m_changed.connect(reindex_on_technologies_changed, sender=Project.technologies.through,
+                    dispatch_uid='search_technologies_changed')
+for model, _ in IMAGE_FIELDS:
+    pre_save.connect(mark_new_uploads_unprocessed, sender=model,
+                     dispatch_uid=f'image_uploads_{model.__name__}')
+    pre_save.connect(strip_new_uploads, sender=model,
+                     dispatch_uid=f'image_metadata_{model.__name__}')
+    post_save.connect(queue_image_processing, sender=model,
+                      dispatch_uid=f'image_processing_{model.__name__}')
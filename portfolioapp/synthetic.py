@@ -0,0 +1,194 @@
+"""
+Synthetic portfolio data for load testing, see `populate_data --scale`.
+
+Everything is drawn from one seeded Random, so a seed always produces the
+same rows (only updated_at differs). Rows go in with bulk_create, which
+skips save() and signals: the caller clears caches and rebuilds related
+projects afterwards. Images are a small pool of tiny generated PNGs
+shared between rows, so seeding doesn't write a file per row.
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from .models import Experience, Project, ProjectImage, ProjectTechnology, Skill, Technology
+
+BATCH_SIZE = 5000
+IMAGE_POOL_SIZE = 32
+IMAGE_SIZE = (64, 40)
+EPOCH = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+
+# Technology stacks by category; projects draw mostly from one of each
+STACKS = {
+    'Backend': ['Python', 'Django', 'Flask', 'FastAPI', 'Node.js', 'Express', 'Go', 'Java', 'Spring', 'C#', '.NET'],
+    'Frontend': ['React', 'Vue', 'Angular', 'Svelte', 'TypeScript', 'JavaScript', 'HTML/CSS', 'Tailwind', 'Bootstrap'],
+    'Database': ['PostgreSQL', 'MySQL', 'SQLite', 'MongoDB', 'Redis', 'Elasticsearch'],
+    'DevOps': ['Docker', 'Kubernetes', 'AWS', 'GCP', 'Nginx', 'GitHub Actions', 'Celery'],
+    'Data': ['Pandas', 'NumPy', 'scikit-learn', 'TensorFlow', 'PyTorch', 'OpenCV'],
+    'API': ['REST API', 'GraphQL', 'WebSockets', 'Stripe API', 'TMDb API', 'OpenAI API', 'Google Maps API'],
+}
+
+ADJECTIVES = [
+    'Smart', 'Secure', 'Realtime', 'Open', 'Rapid', 'Personal', 'Collaborative', 'Minimal',
+    'Automated', 'Distributed', 'Green', 'Social', 'Adaptive', 'Instant', 'Offline-first',
+]
+SUBJECTS = [
+    'Expense', 'Recipe', 'Fitness', 'Movie', 'Music', 'Travel', 'Weather', 'Library', 'Clinic',
+    'Inventory', 'Parking', 'Event', 'Learning', 'Job', 'News', 'Crypto', 'Pet', 'Garden',
+]
+PRODUCTS = [
+    'Tracker', 'Planner', 'Dashboard', 'Marketplace', 'Assistant', 'Scheduler', 'Portal',
+    'Recommender', 'Analyzer', 'Companion', 'Hub', 'Bot', 'Monitor', 'Platform',
+]
+FEATURES = [
+    'user authentication with email verification', 'role-based access control',
+    'a REST API consumed by a single-page frontend', 'realtime notifications over WebSockets',
+    'full-text search with filters', 'payment integration', 'CSV and PDF exports',
+    'an admin dashboard with charts', 'background jobs for slow work', 'offline support',
+    'image uploads with automatic thumbnails', 'a recommendation engine', 'map-based browsing',
+    'scheduled email digests', 'multi-language support', 'dark mode', 'OAuth login',
+]
+AUDIENCES = ['students', 'small businesses', 'families', 'clinics', 'hobbyists', 'remote teams', 'travellers']
+COMPANIES = [
+    'Luminar Technolab', 'Tech By Heart', 'Brightside Labs', 'Northwind Digital', 'Pixel Forge',
+    'Cloudline Systems', 'Greenleaf Software', 'Bluebird Analytics', 'Quantum Works', 'Orbit Apps',
+]
+ROLES = ['Intern', 'Junior Developer', 'Backend Developer', 'Full Stack Developer', 'Frontend Developer']
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def image_pool(rng):
+    """Write the shared tiny PNGs if missing; returns [(name, sha256), ...]"""
+    pool = []
+    for number in range(IMAGE_POOL_SIZE):
+        start = tuple(rng.randrange(256) for _ in range(3))
+        end = tuple(rng.randrange(256) for _ in range(3))
+        image = Image.new('RGB', IMAGE_SIZE)
+        width = IMAGE_SIZE[0]
+        for x in range(width):
+            colour = tuple(a + (b - a) * x // (width - 1) for a, b in zip(start, end))
+            image.paste(colour, (x, 0, x + 1, IMAGE_SIZE[1]))
+        buffer = BytesIO()
+        image.save(buffer, format='PNG')
+        content = buffer.getvalue()
+        # Same seed, same bytes; the content-hashed storage keeps one copy
+        name = default_storage.save(f'synthetic/{number:02d}.png', ContentFile(content))
+        pool.append((name, hashlib.sha256(content).hexdigest()))
+    return pool
+
+
+def technologies():
+    names = [name for names in STACKS.values() for name in names]
+    created = {technology.name: technology for technology in Technology.objects.from_names(names)}
+    for category, names in STACKS.items():
+        Technology.objects.filter(name__in=names, category='').update(category=category)
+    return {category: [created[name] for name in names] for category, names in STACKS.items()}
+
+
+def project_stack(rng, stacks):
+    """A plausible set of 2-7 technologies: backend, frontend, database and extras"""
+    chosen = {rng.choice(stacks['Backend']), rng.choice(stacks['Frontend'])}
+    if rng.random() < 0.8:
+        chosen.add(rng.choice(stacks['Database']))
+    for category in ('DevOps', 'Data', 'API'):
+        if rng.random() < 0.35:
+            chosen.add(rng.choice(stacks[category]))
+    return sorted(chosen, key=lambda technology: technology.name)
+
+
+def project_text(rng, stack):
+    title = f'{rng.choice(ADJECTIVES)} {rng.choice(SUBJECTS)} {rng.choice(PRODUCTS)}'
+    audience = rng.choice(AUDIENCES)
+    features = rng.sample(FEATURES, 3)
+    names = ', '.join(technology.name for technology in stack)
+    short_description = f'{title} for {audience}, built with {names}'
+    description = (
+        f'{title} helps {audience} get more done. It offers {features[0]}, {features[1]} '
+        f'and {features[2]}. Built with {names}, with a focus on performance and accessibility.'
+    )
+    return title, short_description[:300], description
+
+
+def generate(scale, rng, images_per_project=3):
+    """
+    Insert ``scale`` projects with technologies and gallery images, plus
+    scaled experiences and skills. Returns row counts by model name.
+    """
+    pool = image_pool(rng)
+    stacks = technologies()
+    counts = {'Project': 0, 'ProjectTechnology': 0, 'ProjectImage': 0}
+    # Newest last, one project every few hours going back from EPOCH
+    first_created = EPOCH - timedelta(hours=3 * scale)
+
+    for offset in range(0, scale, BATCH_SIZE):
+        numbers = range(offset, min(offset + BATCH_SIZE, scale))
+        projects, stacks_by_project = [], []
+        for number in numbers:
+            stack = project_stack(rng, stacks)
+            title, short_description, description = project_text(rng, stack)
+            image, image_sha256 = rng.choice(pool)
+            slug = f'{title.lower().replace(" ", "-")}-{number}'
+            projects.append(Project(
+                title=title,
+                short_description=short_description,
+                description=description,
+                image=image,
+                image_sha256=image_sha256,
+                project_url=f'https://{slug}.example.com' if rng.random() < 0.6 else None,
+                github_url=f'https://github.com/example/{slug}',
+                featured=rng.random() < 0.05,
+                created_at=first_created + timedelta(hours=3 * number, minutes=rng.randrange(180)),
+            ))
+            stacks_by_project.append(stack)
+        Project.objects.bulk_create(projects)
+
+        links = [
+            ProjectTechnology(project=project, technology=technology)
+            for project, stack in zip(projects, stacks_by_project)
+            for technology in stack
+        ]
+        ProjectTechnology.objects.bulk_create(links)
+
+        images = []
+        for project in projects:
+            for order in range(images_per_project):
+                image, image_sha256 = rng.choice(pool)
+                images.append(ProjectImage(
+                    project=project, image=image, image_sha256=image_sha256,
+                    caption=f'{project.title} screenshot {order + 1}', order=order,
+                ))
+        ProjectImage.objects.bulk_create(images)
+
+        counts['Project'] += len(projects)
+        counts['ProjectTechnology'] += len(links)
+        counts['ProjectImage'] += len(images)
+
+    experiences = []
+    for number in range(max(3, scale // 100)):
+        start = rng.randrange(2015, 2025)
+        current = number == 0
+        experiences.append(Experience(
+            title=rng.choice(ROLES),
+            company=rng.choice(COMPANIES),
+            description=f'Worked on {rng.choice(FEATURES)} and {rng.choice(FEATURES)}.',
+            start_date=f'{rng.choice(MONTHS)} {start}',
+            end_date=None if current else f'{rng.choice(MONTHS)} {start + rng.randint(0, 2)}',
+            current=current,
+        ))
+    Experience.objects.bulk_create(experiences)
+    counts['Experience'] = len(experiences)
+
+    existing = set(Skill.objects.values_list('name', flat=True))
+    skills = [
+        Skill(name=technology.name, category=category, proficiency=rng.randrange(40, 96, 5))
+        for category, members in stacks.items()
+        for technology in members
+        if technology.name not in existing
+    ]
+    Skill.objects.bulk_create(skills)
+    counts['Skill'] = len(skills)
+    return counts
@@ -0,0 +1,52 @@
+"""Background tasks, run by `manage.py run_worker` (see jobs.py)"""
+from functools import partial
+
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_project_version, clear_page_cache
+from .images import delete_unreferenced, file_sha256, generate_derivatives, strip_metadata
+from .jobs import task
+from .models import ProjectImage
+from .related import refresh_related_projects
+
+
+@task
+def process_image(model, pk, field):
+    """Strip EXIF, record the digest and generate derivatives of an upload"""
+    model_class = apps.get_model(model)
+    instance = model_class.objects.filter(pk=pk).first()
+    if instance is None:
+        # Deleted before the worker got to it
+        return
+    field_file = getattr(instance, field)
+    if not field_file:
+        return
+
+    updates = {}
+    stored_name = strip_metadata(field_file)
+    if stored_name and stored_name != field_file.name:
+        if getattr(field_file.storage, 'deduplicates', False):
+            # The original still has its metadata and a public URL; it goes
+            # once this row points elsewhere, unless other rows share it
+            transaction.on_commit(partial(delete_unreferenced, field_file.storage, field_file.name))
+        field_file.name = updates[field] = stored_name
+    updates[f'{field}_sha256'] = file_sha256(field_file)
+    updates['updated_at'] = timezone.now()
+    # update() rather than save() so this doesn't queue itself again
+    model_class.objects.filter(pk=pk).update(**updates)
+
+    if generate_derivatives(field_file) or stored_name:
+        # execute() runs this in a transaction; pages re-rendered before it
+        # commits would link the old files
+        transaction.on_commit(clear_page_cache)
+        # A Project's own updated_at was set above
+        if isinstance(instance, ProjectImage):
+            bump_project_version(instance.project_id)
+
+
+@task
+def refresh_related(project_ids):
+    """Rescore neighbours after the given projects changed (see related.py)"""
+    refresh_related_projects(project_ids)
@@ -0,0 +1,77 @@
+from django import template
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.utils.safestring import mark_safe
+from ..cache import project_version
+from .. import images
+from ..images import MIME_TYPES, MODERN_FORMATS, available_derivatives, fallback_format, original_width
+
+register = template.Library()
+
+
+@register.filter
+def version(project):
+    """Cache version of a project, for use as a {% cache %} vary_on argument"""
+    return project_version(project)
+
+
+@register.inclusion_tag('main/partials/responsive_image.html')
+def responsive_image(image, alt='', css_class='', sizes='100vw'):
+    """
+    <picture> for an uploaded image with a srcset per derivative format.
+
+    Falls back to a plain <img> of the original until derivatives exist.
+    Derivatives are only made narrower than the original, so the original
+    ends every srcset as the candidate for the widest viewports; it's in
+    a format every browser shows, being the <img> src already.
+    """
+    available = available_derivatives(image)
+    original = []
+    if available:
+        width = original_width(image)
+        if width:
+            original = [(width, image.url)]
+
+    def srcset(candidates):
+        return ', '.join(f'{url} {width}w' for width, url in candidates + original) if candidates else ''
+
+    sources = [
+        {'type': MIME_TYPES[fmt], 'srcset': srcset(available[fmt])}
+        for fmt in MODERN_FORMATS if fmt in available
+    ]
+    return {
+        'src': image.url,
+        'srcset': srcset(available.get(fallback_format(image.name), [])),
+        'sources': sources,
+        'sizes': sizes,
+        'alt': alt,
+        'css_class': css_class,
+    }
+
+
+@register.simple_tag
+def thumbnail_url(image):
+    """URL of the smallest derivative of an image, or of the original"""
+    return images.thumbnail_url(image)
+
+
+_inlined = {}
+
+
+@register.simple_tag
+def inline_static(path):
+    """
+    Contents of a static file, for critical CSS that must not wait on a request.
+
+    Reads the collected (minified) copy when there is one, otherwise the
+    source file, and keeps it in memory for the life of the process.
+    """
+    if path not in _inlined:
+        try:
+            with staticfiles_storage.open(path) as collected:
+                contents = collected.read().decode('utf-8')
+        except (OSError, ValueError):
+            with open(finders.find(path), encoding='utf-8') as source:
+                contents = source.read()
+        _inlined[path] = mark_safe(contents)
+    return _inlined[path]
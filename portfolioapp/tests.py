@@ -1,3 +1,1442 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO, StringIO
+from unittest import mock, skipIf
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage, storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.template import Context, Origin, Template
+from django.db import connection, connections, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from PIL import Image
+
+from portfolio.budgets import Budget, record_queries, view_budget
+from portfolio.compression import ENCODINGS, CompressionMiddleware, brotli, compress, negotiate
+from portfolio.files import FileServingMiddleware
+from portfolio.routers import (
+    STICKY_COOKIE, PrimaryReplicaRouter, primary_stickiness_middleware, replica_reads,
+)
+from portfolio.storage import is_hashed_name, minify_css, minify_js
+
+from .cache import PAGE_CACHE_ALIAS, project_version
+from .conditional import RELEASED_AT, content_state
+from .jobs import MAX_ATTEMPTS, STALE_AFTER, TASKS, claim_jobs, enqueue, execute
+from .models import Job, Project, ProjectImage, ProjectTechnology, RelatedProject, Technology
+from .images import MODERN_FORMATS, derivative_name, generate_derivatives
+from .related import rebuild_related_projects
+from .search import rebuild_search_index, search_projects
+from .views import ProjectsListView, projects_content
 
 # Create your tests here.
+
+# Test requests are plain HTTP, and templates shouldn't need collectstatic
+portfolio_test_settings = override_settings(
+    SECURE_SSL_REDIRECT=False,
+    STORAGES={
+        **settings.STORAGES,
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+
+
+@portfolio_test_settings
+class IndexPageCacheTests(TestCase):
+    def setUp(self):
+        caches[PAGE_CACHE_ALIAS].clear()
+        self.project = Project.objects.create(
+            title="Cached Project", description="Desc", featured=True
+        )
+
+    def test_second_request_served_from_cache(self):
+        self.client.get(reverse('index'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('index'))
+        self.assertContains(response, "Cached Project")
+
+    def test_clients_revalidate_cached_page(self):
+        # Only the server's copy is cleared on edits
+        for _ in range(2):
+            response = self.client.get(reverse('index'))
+            self.assertIn('no-cache', response['Cache-Control'])
+            self.assertIn('max-age=0', response['Cache-Control'])
+            self.assertFalse(response.has_header('Expires'))
+
+    def test_cache_cleared_when_data_changes(self):
+        self.client.get(reverse('index'))
+        self.project.title = "Renamed Project"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, "Renamed Project")
+
+    def test_cache_cleared_only_after_commit(self):
+        self.client.get(reverse('index'))
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.project.title = "Renamed Project"
+                self.project.save()
+                # A request before the commit gets the cached page rather
+                # than re-caching what it can see
+                with self.assertNumQueries(0):
+                    self.client.get(reverse('index'))
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, "Renamed Project")
+
+    def test_cache_cleared_when_row_deleted(self):
+        self.client.get(reverse('index'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.delete()
+        response = self.client.get(reverse('index'))
+        self.assertNotContains(response, "Cached Project")
+
+    def test_cache_cleared_from_another_process(self):
+        # As the background worker does after processing an upload
+        self.client.get(reverse('index'))
+        subprocess.run(
+            [sys.executable, 'manage.py', 'shell', '-c',
+             'from portfolioapp.cache import clear_page_cache; clear_page_cache()'],
+            cwd=settings.BASE_DIR, check=True,
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('index'))
+        self.assertTrue(queries)
+
+
+@portfolio_test_settings
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        caches[PAGE_CACHE_ALIAS].clear()
+        self.project = Project.objects.create(title="Validated", description="Desc")
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_matching_etag_returns_304_without_rendering(self):
+        url = reverse('projects')
+        response = self.client.get(url)
+        self.assertTrue(response.has_header('Last-Modified'))
+        # Just the validators query
+        with self.assertNumQueries(1):
+            revalidated = self.revalidate(url, response)
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_if_modified_since_returns_304(self):
+        url = reverse('project_detail', kwargs={'project_id': self.project.pk})
+        response = self.client.get(url)
+        revalidated = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_detail_etag_changes_with_gallery(self):
+        url = reverse('project_detail', kwargs={'project_id': self.project.pk})
+        response = self.client.get(url)
+        ProjectImage.objects.create(project=self.project, image='project_images/shot.png')
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_etag_changes_when_row_deleted(self):
+        other = Project.objects.create(title="Other", description="Desc")
+        url = reverse('projects')
+        response = self.client.get(url)
+        other.delete()
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_cached_index_revalidates_without_queries(self):
+        url = reverse('index')
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            revalidated = self.revalidate(url, response)
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_missing_project_still_404s(self):
+        response = self.client.get(reverse('project_detail', kwargs={'project_id': 999}))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_validators_shared_by_processes_of_a_release(self):
+        # Nothing per process goes into them
+        state = content_state(projects_content())
+        self.assertEqual(content_state(projects_content()), state)
+        self.assertGreaterEqual(state[1], RELEASED_AT)
+        with override_settings(RELEASE_ID='next'):
+            self.assertNotEqual(content_state(projects_content())[0], state[0])
+
+    def test_newest_update_looked_up_in_the_index(self):
+        # A SEARCH of the index rather than a SCAN of every entry
+        with CaptureQueriesContext(connection) as queries:
+            content_state(projects_content())
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + queries[0]['sql'])
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('SEARCH portfolioapp_project USING COVERING INDEX portfolioapp_project_updated_at', plan)
+
+
+@portfolio_test_settings
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        caches[PAGE_CACHE_ALIAS].clear()
+        self.project = Project.objects.create(title="Async Project", description="Desc", featured=True)
+        self.other = Project.objects.create(title="Neighbour", description="Desc")
+        RelatedProject.objects.create(project=self.project, related=self.other, score=1, rank=0)
+
+    async def test_index_under_asgi(self):
+        response = await self.async_client.get(reverse('index'))
+        self.assertContains(response, "Async Project")
+        revalidated = await self.async_client.get(reverse('index'), headers={'if-none-match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+
+    async def test_detail_under_asgi(self):
+        url = reverse('project_detail', kwargs={'project_id': self.project.pk})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.context['related_projects'], [self.other])
+        revalidated = await self.async_client.get(url, headers={'if-none-match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+
+    async def test_missing_project_404s(self):
+        response = await self.async_client.get(reverse('project_detail', kwargs={'project_id': 999}))
+        self.assertEqual(response.status_code, 404)
+
+
+@portfolio_test_settings
+class ProjectCardFragmentCacheTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.first = Project.objects.create(title="First", description="Desc")
+        self.second = Project.objects.create(title="Second", description="Desc")
+
+    def version(self, project):
+        return project_version(Project.objects.get(pk=project.pk))
+
+    def test_saving_project_bumps_only_its_version(self):
+        first_version = self.version(self.first)
+        second_version = self.version(self.second)
+        self.first.save()
+        self.assertNotEqual(self.version(self.first), first_version)
+        self.assertEqual(self.version(self.second), second_version)
+
+    def test_project_image_change_bumps_project_version(self):
+        version = self.version(self.first)
+        ProjectImage.objects.create(project=self.first, image='project_images/shot.png')
+        self.assertNotEqual(self.version(self.first), version)
+
+    def test_setting_technologies_bumps_project_version(self):
+        version = self.version(self.first)
+        self.first.technologies.set(Technology.objects.from_names(["Django"]))
+        self.assertNotEqual(self.version(self.first), version)
+
+    def test_renaming_a_technology_bumps_its_projects(self):
+        django, = Technology.objects.from_names(["Django"])
+        self.first.technologies.set([django])
+        first_version, second_version = self.version(self.first), self.version(self.second)
+        django.name = "Django 5"
+        django.save()
+        self.assertNotEqual(self.version(self.first), first_version)
+        self.assertEqual(self.version(self.second), second_version)
+
+    def test_version_is_shared_between_processes(self):
+        # Nothing is kept in the (per-process) cache
+        version = self.version(self.first)
+        caches['default'].clear()
+        self.assertEqual(self.version(self.first), version)
+
+    def test_edited_card_is_rerendered(self):
+        self.client.get(reverse('projects'))
+        self.first.title = "First Renamed"
+        self.first.save()
+        response = self.client.get(reverse('projects'))
+        self.assertContains(response, "First Renamed")
+        self.assertContains(response, "Second")
+
+
+@portfolio_test_settings
+class TechnologyTests(TestCase):
+    def test_from_names_reuses_rows_by_slug(self):
+        first = Technology.objects.from_names(["Python", "Django"])
+        second = Technology.objects.from_names([" python ", "C++", "C", ""])
+        self.assertEqual(first[0], second[0])
+        self.assertEqual([tech.slug for tech in second], ["python", "c-plus-plus", "c"])
+        self.assertEqual(Technology.objects.count(), 4)
+
+    def test_projects_filtered_by_technology(self):
+        project = Project.objects.create(title="Tagged", description="Desc")
+        Project.objects.create(title="Untagged", description="Desc")
+        project.technologies.set(Technology.objects.from_names(["Django", "React"]))
+        self.assertQuerySetEqual(Project.objects.filter(technologies__slug='django'), [project])
+        self.assertEqual(project.get_technologies_list(), ["Django", "React"])
+
+    def test_projects_page_lists_technology_tags(self):
+        project = Project.objects.create(title="Tagged", description="Desc")
+        project.technologies.set(Technology.objects.from_names(["Django", "React", "Python", "Redis"]))
+        response = self.client.get(reverse('projects'))
+        self.assertContains(response, '<span class="tech-tag">Django</span>', html=True)
+        self.assertContains(response, '+1')
+
+
+@portfolio_test_settings
+class ProjectsListQueryCountTests(TestCase):
+    def create_projects(self, count):
+        technologies = Technology.objects.from_names(["Python", "Django", "React", "Redis", "Celery"])
+        projects = Project.objects.bulk_create(
+            Project(title=f"Project {i}", description="Desc", featured=i % 3 == 0)
+            for i in range(count)
+        )
+        ProjectTechnology.objects.bulk_create(
+            ProjectTechnology(project=project, technology=technology)
+            for project in projects
+            for technology in technologies[:1 + project.pk % len(technologies)]
+        )
+
+    def assert_listing_queries(self, count):
+        self.create_projects(count)
+        caches['default'].clear()
+        caches[PAGE_CACHE_ALIAS].clear()
+        # Validators, one page of projects, one prefetch for technologies
+        # and, until they're cached, three facet aggregates
+        with self.assertNumQueries(6):
+            self.client.get(reverse('projects'))
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('projects'))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_with_10_projects(self):
+        response = self.assert_listing_queries(10)
+        self.assertEqual(len(response.context['featured_projects']), 4)
+
+    def test_query_count_with_10000_projects(self):
+        self.assert_listing_queries(10000)
+
+
+@portfolio_test_settings
+class ProjectSearchTests(TestCase):
+    def setUp(self):
+        self.tracker = Project.objects.create(
+            title="Expense Tracker", description="Keeps a running total of <b>spending</b>."
+        )
+        self.planner = Project.objects.create(
+            title="Trip Planner", description="Plans trips and tracks expenses along the way."
+        )
+
+    def titles(self, query):
+        return [project.title for project in search_projects(query)[0]]
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.titles("expense"), ["Expense Tracker", "Trip Planner"])
+
+    def test_last_word_matches_as_prefix(self):
+        self.assertEqual(self.titles("trip plan"), ["Trip Planner"])
+
+    def test_snippet_is_escaped_and_highlighted(self):
+        project = search_projects("total")[0][0]
+        self.assertIn("<mark>total</mark>", project.snippet)
+        self.assertIn("&lt;b&gt;spending&lt;/b&gt;", project.snippet)
+
+    def test_search_syntax_is_matched_as_words(self):
+        self.assertEqual(self.titles('"expense" OR NEAR(*'), [])
+
+    def test_index_follows_edits(self):
+        self.tracker.title = "Budget Book"
+        self.tracker.save()
+        self.planner.technologies.set(Technology.objects.from_names(["Django"]))
+        self.assertEqual(self.titles("budget"), ["Budget Book"])
+        self.assertEqual(self.titles("django"), ["Trip Planner"])
+
+        django = Technology.objects.get(slug='django')
+        django.name = "Flask"
+        django.save()
+        self.assertEqual(self.titles("flask"), ["Trip Planner"])
+        django.projects.clear()
+        self.assertEqual(self.titles("flask"), [])
+
+        self.planner.delete()
+        self.assertEqual(self.titles("trip"), [])
+
+    def test_rebuild_indexes_bulk_created_projects(self):
+        Project.objects.bulk_create([Project(title="Weather Station", description="Desc")])
+        self.assertEqual(self.titles("weather"), [])
+        rebuild_search_index()
+        self.assertEqual(self.titles("weather"), ["Weather Station"])
+
+    def test_search_page(self):
+        response = self.client.get(reverse('project_search'), {'q': 'running'})
+        self.assertContains(response, "Expense Tracker")
+        self.assertContains(response, "<mark>running</mark>")
+        self.assertNotContains(response, "Trip Planner")
+        response = self.client.get(reverse('project_search'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_pages_past_the_ranked_results_are_empty(self):
+        response = self.client.get(reverse('project_search'), {'q': 'expense', 'page': '9' * 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['results'], [])
+        self.assertIsNone(response.context['next_page'])
+        self.assertEqual(response.context['results'], [])
+
+
+@portfolio_test_settings
+class ProjectFilterTests(TestCase):
+    def setUp(self):
+        caches[PAGE_CACHE_ALIAS].clear()
+        django, react = Technology.objects.from_names(["Django", "React"])
+        self.projects = {}
+        for title, year, featured, technologies in [
+            ("Old Django", 2022, False, [django]),
+            ("Featured Django", 2023, True, [django, react]),
+            ("New React", 2023, False, [react]),
+        ]:
+            project = Project.objects.create(
+                title=title, description="Desc", featured=featured,
+                created_at=timezone.make_aware(timezone.datetime(year, 6, 1)),
+            )
+            project.technologies.set(technologies)
+            self.projects[title] = project
+
+    def titles(self, response):
+        return [project.title for project in response.context['projects']]
+
+    def test_filters_narrow_the_listing(self):
+        response = self.client.get(reverse('projects'), {'technology': 'django'})
+        self.assertEqual(self.titles(response), ["Featured Django", "Old Django"])
+        response = self.client.get(reverse('projects'), {'technology': 'django', 'year': 2023})
+        self.assertEqual(self.titles(response), ["Featured Django"])
+        response = self.client.get(reverse('projects'), {'featured': 'no', 'year': 2023})
+        self.assertEqual(self.titles(response), ["New React"])
+
+    def test_invalid_filters_are_ignored(self):
+        response = self.client.get(reverse('projects'), {'technology': 'cobol', 'year': 'soon'})
+        self.assertEqual(len(response.context['projects']), 3)
+
+    def test_facets_count_under_the_other_filters(self):
+        facets = self.client.get(reverse('projects'), {'year': 2023}).context['facets']
+        self.assertEqual(
+            [(facet['slug'], facet['count']) for facet in facets['technologies']],
+            [("react", 2), ("django", 1)],
+        )
+        # The year facet itself ignores the year filter
+        self.assertEqual(facets['years'], [{'year': 2023, 'count': 2}, {'year': 2022, 'count': 1}])
+        self.assertEqual((facets['featured'], facets['not_featured']), (1, 1))
+
+    def test_facets_cached_until_projects_change(self):
+        self.client.get(reverse('projects'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.projects["New React"].technologies.clear()
+        facets = self.client.get(reverse('projects')).context['facets']
+        self.assertEqual(
+            [(facet['slug'], facet['count']) for facet in facets['technologies']],
+            [("django", 2), ("react", 1)],
+        )
+
+    def test_pagination_links_keep_the_filters(self):
+        for number in range(ProjectsListView.paginate_by):
+            Project.objects.create(title=f"Filler {number}", description="Desc", featured=True)
+        response = self.client.get(reverse('projects'), {'featured': 'yes'})
+        cursor = response.context['next_cursor']
+        self.assertContains(response, f'href="?featured=yes&amp;cursor={cursor}"')
+        response = self.client.get(reverse('projects'), {'featured': 'yes', 'cursor': cursor})
+        self.assertEqual(self.titles(response), ["Featured Django"])
+        data = self.client.get(reverse('projects_json'), {'featured': 'yes'}).json()
+        self.assertIn('featured=yes', data['next'])
+
+
+@portfolio_test_settings
+class ApiTests(TestCase):
+    def setUp(self):
+        caches[PAGE_CACHE_ALIAS].clear()
+        django, react = Technology.objects.from_names(["Django", "React"])
+        self.projects = []
+        for number in range(5):
+            project = Project.objects.create(
+                title=f"Project {number}", short_description="Short", description="Desc " * 50,
+                featured=number == 0,
+                created_at=timezone.make_aware(timezone.datetime(2023, 1, number + 1)),
+            )
+            project.technologies.set([django, react] if number % 2 else [react])
+            self.projects.append(project)
+
+    def test_project_list_newest_first_with_cursor(self):
+        data = self.client.get(reverse('api_projects'), {'limit': 3}).json()
+        self.assertEqual([project['title'] for project in data['results']], ["Project 4", "Project 3", "Project 2"])
+        self.assertEqual(data['results'][1]['technologies'], ["Django", "React"])
+        self.assertIn(f"cursor={data['next_cursor']}", data['next'])
+        self.assertIn('limit=3', data['next'])
+        data = self.client.get(data['next']).json()
+        self.assertEqual([project['title'] for project in data['results']], ["Project 1", "Project 0"])
+        self.assertIsNone(data['next'])
+
+    def test_sparse_fieldsets_query_only_what_is_asked(self):
+        # Validators and one page of rows; no technologies query
+        with self.assertNumQueries(2), CaptureQueriesContext(connection) as queries:
+            data = self.client.get(reverse('api_projects'), {'fields': 'title,url'}).json()
+        self.assertEqual(data['results'][0], {
+            'title': "Project 4", 'url': reverse('api_project', kwargs={'project_id': self.projects[4].id}),
+        })
+        self.assertNotIn('description', queries[-1]['sql'])
+        with self.assertNumQueries(3):
+            self.client.get(reverse('api_projects'), {'fields': 'title,technologies'})
+
+    def test_unknown_field_is_a_bad_request(self):
+        response = self.client.get(reverse('api_projects'), {'fields': 'title,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['error'])
+
+    def test_list_filters(self):
+        data = self.client.get(reverse('api_projects'), {'technology': 'django', 'fields': 'title'}).json()
+        self.assertEqual(data['results'], [{'title': "Project 3"}, {'title': "Project 1"}])
+        data = self.client.get(reverse('api_projects'), {'featured': 'yes', 'fields': 'title'}).json()
+        self.assertEqual(data['results'], [{'title': "Project 0"}])
+
+    def test_project_detail(self):
+        project = self.projects[1]
+        ProjectImage.objects.create(project=project, image='projects/gallery/shot.png', caption="Shot")
+        data = self.client.get(reverse('api_project', kwargs={'project_id': project.id})).json()
+        self.assertEqual(data['title'], "Project 1")
+        self.assertEqual(data['images'], [{'url': '/media/projects/gallery/shot.png', 'caption': "Shot"}])
+        self.assertEqual(data['related'], [])
+        response = self.client.get(reverse('api_project', kwargs={'project_id': 999999}))
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', response.json())
+
+    def test_revalidation_and_gzip(self):
+        response = self.client.get(reverse('api_projects'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('max-age=60', response['Cache-Control'])
+        response = self.client.get(reverse('api_projects'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.projects[0].save()
+        response = self.client.get(reverse('api_projects'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_profile(self):
+        data = self.client.get(reverse('api_profile'), {'fields': 'name,skills'}).json()
+        self.assertEqual(set(data), {'name', 'skills'})
+        self.assertEqual(data['skills'], [])
+
+
+@portfolio_test_settings
+class ProjectsCursorPaginationTests(TestCase):
+    def setUp(self):
+        created_at = timezone.now()
+        # Identical timestamps force the id tie-breaker to do its job
+        Project.objects.bulk_create(
+            Project(title=f"Project {i}", description="Desc", created_at=created_at)
+            for i in range(30)
+        )
+
+    def test_cursor_pages_cover_every_project_once(self):
+        seen = []
+        cursor = None
+        while True:
+            response = self.client.get(reverse('projects'), {'cursor': cursor} if cursor else {})
+            seen.extend(project.pk for project in response.context['projects'])
+            cursor = response.context['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(set(seen), set(Project.objects.values_list('pk', flat=True)))
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_json_pages_follow_next_links(self):
+        response = self.client.get(reverse('projects_json'))
+        data = response.json()
+        self.assertEqual(len(data['results']), ProjectsListView.paginate_by)
+        data = self.client.get(data['next']).json()
+        self.assertEqual(len(data['results']), ProjectsListView.paginate_by)
+        data = self.client.get(data['next']).json()
+        self.assertEqual(len(data['results']), 6)
+        self.assertIsNone(data['next'])
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(reverse('projects'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+@portfolio_test_settings
+class RelatedProjectsTests(TestCase):
+    def create_project(self, title, description, technologies):
+        project = Project.objects.create(title=title, description=description)
+        project.technologies.set(Technology.objects.from_names(technologies))
+        run_pending_jobs()
+        return project
+
+    def setUp(self):
+        self.shop = self.create_project("Shop", "Online store with a payment gateway", ["Django", "Stripe"])
+        self.market = self.create_project("Market", "Marketplace with a payment gateway", ["Django", "Stripe", "Redis"])
+        self.game = self.create_project("Game", "Browser puzzle game", ["JavaScript", "Canvas"])
+
+    def test_neighbours_ranked_by_shared_features(self):
+        related = list(RelatedProject.objects.filter(project=self.shop).values_list('related', flat=True))
+        self.assertEqual(related[0], self.market.pk)
+        self.assertNotIn(self.game.pk, related)
+
+    def test_new_project_enters_existing_neighbour_lists(self):
+        puzzle = self.create_project("Puzzle", "Browser puzzle game levels", ["JavaScript", "Canvas"])
+        related = RelatedProject.objects.filter(project=self.game).values_list('related', flat=True)
+        self.assertEqual(list(related)[0], puzzle.pk)
+
+    def test_deleted_project_leaves_neighbour_lists(self):
+        self.market.delete()
+        run_pending_jobs()
+        self.assertFalse(RelatedProject.objects.filter(project=self.shop).exists())
+
+    def test_edits_queue_a_refresh_job(self):
+        blog = Project.objects.create(title="Blog", description="Payment gateway blog")
+        blog.technologies.set(Technology.objects.from_names(["Django", "Stripe"]))
+        # Both edits ask for the same refresh; nothing is rescored in the request
+        self.assertEqual(Job.objects.filter(task='refresh_related', status=Job.PENDING).count(), 1)
+        self.assertFalse(RelatedProject.objects.filter(project=blog).exists())
+        run_pending_jobs()
+        self.assertTrue(RelatedProject.objects.filter(project=blog).exists())
+
+    def test_rolled_back_edits_queue_nothing(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.game.save()
+            raise RuntimeError
+        self.assertFalse(Job.objects.filter(task='refresh_related', status=Job.PENDING).exists())
+
+    def test_detail_view_lists_precomputed_related_projects(self):
+        response = self.client.get(reverse('project_detail', kwargs={'project_id': self.shop.pk}))
+        self.assertEqual(response.context['related_projects'], [self.market])
+
+    def test_full_rebuild_matches_incremental_updates(self):
+        before = list(RelatedProject.objects.values_list('project', 'related', 'rank'))
+        rebuild_related_projects()
+        after = list(RelatedProject.objects.values_list('project', 'related', 'rank'))
+        self.assertEqual(before, after)
+
+
+def make_image(width, height, fmt='PNG', name='shot.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (37, 99, 235)).save(buffer, format=fmt)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{fmt.lower()}')
+
+
+def run_pending_jobs():
+    for job_id in claim_jobs(100):
+        execute(job_id)
+
+
+@portfolio_test_settings
+class ImageDerivativeTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        caches['default'].clear()
+        self.project = Project.objects.create(title="Gallery", description="Desc")
+
+    def upload(self, *args):
+        project_image = ProjectImage.objects.create(project=self.project, image=make_image(*args))
+        run_pending_jobs()
+        project_image.refresh_from_db()
+        return project_image
+
+    def test_upload_generates_narrower_variants(self):
+        image = self.upload(700, 350).image
+        storage = image.storage
+        for fmt in MODERN_FORMATS + ('png',):
+            self.assertTrue(storage.exists(derivative_name(image.name, 320, fmt)))
+            self.assertTrue(storage.exists(derivative_name(image.name, 640, fmt)))
+            self.assertFalse(storage.exists(derivative_name(image.name, 1280, fmt)))
+        with Image.open(storage.path(derivative_name(image.name, 320, 'png'))) as variant:
+            self.assertEqual(variant.size, (320, 160))
+
+    def test_generation_is_idempotent(self):
+        image = self.upload(700, 350).image
+        self.assertEqual(generate_derivatives(image), [])
+
+    def test_unreadable_files_are_skipped(self):
+        image = ProjectImage.objects.create(project=self.project, image='project_images/missing.png').image
+        self.assertEqual(generate_derivatives(image), [])
+
+    def test_responsive_image_tag_emits_srcset(self):
+        self.project.image = make_image(700, 350, 'JPEG', 'cover.jpg')
+        self.project.save()
+        run_pending_jobs()
+        html = Template(
+            '{% load portfolio_tags %}{% responsive_image project.image alt="Cover" %}'
+        ).render(Context({'project': self.project}))
+        self.assertIn('.w320.jpg 320w', html)
+        self.assertIn('.w640.webp 640w', html)
+        self.assertIn('type="image/webp"', html)
+        # The original is the widest candidate of every srcset
+        original = f'{self.project.image.url} 700w'
+        self.assertEqual(html.count(original), len(MODERN_FORMATS) + 1)
+
+    def test_detail_gallery_built_once_from_the_prefetch(self):
+        for order, caption in [(2, "Third"), (0, "First"), (1, "")]:
+            project_image = self.upload(700, 350)
+            project_image.order, project_image.caption = order, caption
+            project_image.save()
+        caches[PAGE_CACHE_ALIAS].clear()
+        url = reverse('project_detail', kwargs={'project_id': self.project.pk})
+        self.client.get(url)
+        # Validators, the project, its images, technologies and related
+        # projects; nothing from the template
+        with self.assertNumQueries(5), record_queries() as log:
+            response = self.client.get(url)
+        self.assertFalse([origin for _, _, origin in log.queries if '.html:' in ''.join(origin)])
+
+        gallery = response.context['gallery']
+        self.assertEqual(gallery['count'], 3)
+        self.assertEqual([image['caption'] for image in gallery['images']], ["First", "", "Third"])
+        self.assertEqual(gallery['hero'], gallery['images'][0])
+        self.assertTrue(gallery['hero']['thumbnail_url'].endswith('.w320.png'))
+        self.assertContains(response, gallery['hero']['thumbnail_url'])
+        self.assertContains(response, 'class="gallery-nav"')
+
+    def test_detail_gallery_falls_back_to_the_cover(self):
+        self.project.image = make_image(200, 100, 'JPEG', 'cover.jpg')
+        self.project.save()
+        response = self.client.get(reverse('project_detail', kwargs={'project_id': self.project.pk}))
+        gallery = response.context['gallery']
+        self.assertEqual(gallery['count'], 1)
+        self.assertEqual(gallery['hero']['url'], self.project.image.url)
+        self.assertNotContains(response, 'class="gallery-nav"')
+
+
+@portfolio_test_settings
+class JobQueueTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.project = Project.objects.create(title="Gallery", description="Desc")
+
+    def test_upload_is_queued_not_processed_inline(self):
+        project_image = ProjectImage.objects.create(project=self.project, image=make_image(700, 350))
+        job = Job.objects.get(task='process_image')
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(job.payload, {'model': 'portfolioapp.ProjectImage', 'pk': project_image.pk, 'field': 'image'})
+        self.assertFalse(project_image.image.storage.exists(derivative_name(project_image.image.name, 320, 'png')))
+
+    def test_processed_upload_is_not_queued_again(self):
+        project_image = ProjectImage.objects.create(project=self.project, image=make_image(700, 350))
+        run_pending_jobs()
+        project_image.refresh_from_db()
+        project_image.caption = "Edited"
+        project_image.save()
+        self.assertEqual(Job.objects.get(task='process_image').status, Job.DONE)
+
+    def photo_with_exif(self):
+        exif = Image.Exif()
+        exif[0x0110] = "Secret Camera"
+        buffer = BytesIO()
+        Image.new('RGB', (400, 200)).save(buffer, format='JPEG', exif=exif.tobytes())
+        return buffer.getvalue()
+
+    def test_uploads_stored_without_exif(self):
+        upload = SimpleUploadedFile('photo.jpg', self.photo_with_exif(), content_type='image/jpeg')
+        project_image = ProjectImage.objects.create(project=self.project, image=upload)
+        # Before the worker runs, and with no copy of the original kept
+        stored = os.listdir(os.path.join(settings.MEDIA_ROOT, 'project_images'))
+        self.assertEqual(stored, [os.path.basename(project_image.image.name)])
+        with project_image.image.open() as stored_file:
+            self.assertNotIn(b"Secret Camera", stored_file.read())
+
+    def test_stored_original_with_exif_deleted_once_unused(self):
+        # Stored before uploads were stripped, and shared by two rows
+        name = default_storage.save('project_images/photo.jpg', ContentFile(self.photo_with_exif()))
+        first = ProjectImage.objects.create(project=self.project, image=name)
+        second = ProjectImage.objects.create(project=self.project, image=name)
+        with self.captureOnCommitCallbacks(execute=True):
+            execute(Job.objects.get(task='process_image', payload__pk=first.pk).pk)
+        self.assertTrue(default_storage.exists(name))
+        with self.captureOnCommitCallbacks(execute=True):
+            run_pending_jobs()
+        self.assertFalse(default_storage.exists(name))
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(default_storage.exists(first.image.name))
+
+    def test_processing_strips_exif_and_records_hash(self):
+        name = default_storage.save('project_images/photo.jpg', ContentFile(self.photo_with_exif()))
+        project_image = ProjectImage.objects.create(project=self.project, image=name)
+        run_pending_jobs()
+        project_image.refresh_from_db()
+        with project_image.image.open() as stored:
+            contents = stored.read()
+        self.assertNotIn(b"Secret Camera", contents)
+        self.assertEqual(project_image.image_sha256, hashlib.sha256(contents).hexdigest())
+
+    def test_failing_job_is_retried_then_marked_failed(self):
+        TASKS['explode'] = explode
+        self.addCleanup(TASKS.pop, 'explode')
+        job = enqueue('explode')
+        for _ in range(MAX_ATTEMPTS):
+            Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, MAX_ATTEMPTS)
+        self.assertIn("RuntimeError", job.error)
+
+    def test_worker_requeues_stale_jobs_while_polling(self):
+        job = enqueue('refresh_related', project_ids=[self.project.pk])
+
+        def poll(seconds):
+            if job.status == Job.PENDING:
+                # A child died running it, after the worker started
+                job.status = Job.RUNNING
+                job.started_at = timezone.now() - STALE_AFTER * 2
+                job.save()
+            else:
+                raise KeyboardInterrupt
+
+        # Keep the jobs out of the pool; only the requeue is under test
+        with mock.patch('portfolioapp.management.commands.run_worker.claim_jobs', return_value=[]), \
+                mock.patch('time.sleep', side_effect=poll), self.assertRaises(KeyboardInterrupt):
+            call_command('run_worker', processes=1, requeue_interval=0, stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+
+
+def explode():
+    raise RuntimeError("boom")
+
+
+@portfolio_test_settings
+class ExportStaticTests(TestCase):
+    def setUp(self):
+        self.output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output)
+        caches[PAGE_CACHE_ALIAS].clear()
+        self.projects = Project.objects.bulk_create(
+            Project(title=f"Exported {i}", description="Desc") for i in range(ProjectsListView.paginate_by + 1)
+        )
+
+    def export(self):
+        call_command('export_static', output=self.output, processes=0, stdout=StringIO())
+        with open(os.path.join(self.output, '.export-manifest.json')) as manifest:
+            return json.load(manifest)
+
+    def read(self, name):
+        with open(os.path.join(self.output, name)) as page:
+            return page.read()
+
+    def test_exports_every_page(self):
+        manifest = self.export()
+        self.assertIn('index.html', manifest)
+        self.assertIn('projects/index.html', manifest)
+        cursor_pages = [name for name in manifest if name.startswith('projects/cursor/')]
+        self.assertEqual(len(cursor_pages), 1)
+        self.assertIn("Exported 0", self.read(cursor_pages[0]))
+        for project in self.projects:
+            self.assertIn(f'projects/{project.pk}/index.html', manifest)
+
+    def test_filter_links_left_out(self):
+        Project.objects.filter(pk=self.projects[0].pk).update(featured=True)
+        self.assertContains(self.client.get(reverse('projects')), '?featured=yes')
+        self.export()
+        self.assertNotIn('?featured=', self.read('projects/index.html'))
+
+    def test_reexport_only_rewrites_changed_pages(self):
+        self.export()
+        project = self.projects[0]
+        detail = os.path.join(self.output, f'projects/{project.pk}/index.html')
+        other = os.path.join(self.output, f'projects/{self.projects[1].pk}/index.html')
+        os.utime(detail, (0, 0))
+        os.utime(other, (0, 0))
+
+        project.title = "Renamed"
+        project.save()
+        self.export()
+        self.assertIn("Renamed", self.read(detail))
+        self.assertNotEqual(os.path.getmtime(detail), 0)
+        self.assertEqual(os.path.getmtime(other), 0)
+
+    def test_deleted_project_page_removed(self):
+        self.export()
+        project = self.projects[0]
+        project.delete()
+        manifest = self.export()
+        self.assertNotIn(f'projects/{project.pk}/index.html', manifest)
+        self.assertFalse(os.path.exists(os.path.join(self.output, f'projects/{project.pk}')))
+
+
+@portfolio_test_settings
+class FileServingTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def write(self, name, content=b"%PDF-1.4 " + b"0123456789" * 100):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as media_file:
+            media_file.write(content)
+        return content
+
+    def test_media_served_with_validators_and_ranges(self):
+        content = self.write('project_images/shot.png')
+        response = self.client.get('/media/project_images/shot.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), content)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'max-age=3600, public')
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/media/project_images/shot.png', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Backed by the file itself, which WSGI servers can sendfile()
+        response = FileServingMiddleware()(RequestFactory().get('/media/project_images/shot.png'))
+        self.assertTrue(hasattr(response.file_to_stream, 'fileno'))
+        response.close()
+
+        response = self.client.get('/media/project_images/shot.png', HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(content)}')
+        self.assertEqual(b"".join(response.streaming_content), content[10:20])
+
+    def test_ranges_skip_precompressed_variants(self):
+        content = self.write('files/resume.pdf')
+        self.write('files/resume.pdf.gz', gzip.compress(content))
+        response = self.client.get('/media/files/resume.pdf', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        response = self.client.get('/media/files/resume.pdf', HTTP_ACCEPT_ENCODING='gzip', HTTP_RANGE='bytes=0-3')
+        self.assertEqual(response.status_code, 206)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF")
+
+    def test_content_hashed_names_are_immutable(self):
+        hashed = 'project_images/0123456789abcdef0123456789abcdef'
+        for name in (f'{hashed}.png', f'{hashed}.w640.webp'):
+            self.write(name)
+            self.assertIn('immutable', self.client.get(f'/media/{name}')['Cache-Control'])
+        # Names that merely look hashed can be reused for other content
+        for name in ('project_images/shot.0123456789abcdef01.w640.webp', f'{hashed}0.png'):
+            self.write(name)
+            self.assertEqual(self.client.get(f'/media/{name}')['Cache-Control'], 'max-age=3600, public')
+        media_storage = {'BACKEND': 'django.core.files.storage.FileSystemStorage'}
+        with override_settings(STORAGES={**settings.STORAGES, 'default': media_storage}):
+            response = FileServingMiddleware()(RequestFactory().get(f'/media/{hashed}.png'))
+        self.assertEqual(response['Cache-Control'], 'max-age=3600, public')
+        response.close()
+
+    def test_missing_and_outside_files_not_served(self):
+        self.assertEqual(self.client.get('/media/project_images/missing.png').status_code, 404)
+        self.assertEqual(self.client.get('/media/../manage.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/project_images/').status_code, 404)
+
+    @override_settings(WHITENOISE_USE_FINDERS=True, WHITENOISE_AUTOREFRESH=True)
+    def test_resume_supports_ranges(self):
+        url = '/static/files/RESUME%20PranavC.pdf'
+        response = self.client.get(url, HTTP_RANGE='bytes=0-4')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-")
+
+    def test_sendfile_hand_off(self):
+        self.write('project_images/shot.png')
+        with override_settings(SENDFILE_HEADER='X-Sendfile'):
+            response = self.client.get('/media/project_images/shot.png')
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, 'project_images', 'shot.png'))
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertFalse(response.has_header('Content-Length'))
+
+        # Each root has its own internal location, wherever it is
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root)
+        os.makedirs(os.path.join(static_root, 'files'))
+        with open(os.path.join(static_root, 'files', 'RESUME PranavC.pdf'), 'wb') as resume:
+            resume.write(b"%PDF-")
+        with override_settings(SENDFILE_HEADER='X-Accel-Redirect', STATIC_ROOT=static_root,
+                               WHITENOISE_AUTOREFRESH=True):
+            self.client = self.client_class()
+            response = self.client.get('/static/files/RESUME%20PranavC.pdf')
+            self.assertEqual(response['X-Accel-Redirect'], '/_files/static/files/RESUME%20PranavC.pdf')
+            response = self.client.get('/media/project_images/shot.png')
+            self.assertEqual(response['X-Accel-Redirect'], '/_files/media/project_images/shot.png')
+
+        # Files from the static finders are outside both roots
+        with override_settings(SENDFILE_HEADER='X-Accel-Redirect', WHITENOISE_USE_FINDERS=True,
+                               WHITENOISE_AUTOREFRESH=True):
+            self.client = self.client_class()
+            response = self.client.get('/static/files/RESUME%20PranavC.pdf')
+        self.assertFalse(response.has_header('X-Accel-Redirect'))
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF-"))
+
+
+@portfolio_test_settings
+class ContentHashedStorageTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_identical_uploads_share_one_file(self):
+        first = default_storage.save('project_images/shot.PNG', ContentFile(b"same bytes"))
+        second = default_storage.save('project_images/other.png', ContentFile(b"same bytes"))
+        third = default_storage.save('project_images/shot.png', ContentFile(b"other bytes"))
+        digest = hashlib.sha256(b"same bytes").hexdigest()[:32]
+        self.assertEqual(first, f'project_images/{digest}.png')
+        self.assertEqual(second, first)
+        self.assertNotEqual(third, first)
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, 'project_images'))), 2)
+
+    def test_hashed_names_served_as_immutable(self):
+        name = default_storage.save('project_images/shot.png', ContentFile(b"0123456789" * 30))
+        response = self.client.get(default_storage.url(name))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_uploads_cannot_take_variant_names(self):
+        name = default_storage.save('project_images/shot.png', ContentFile(b"original"))
+        variant = derivative_name(name, 640, 'webp')
+        default_storage.save_variant(variant, ContentFile(b"derivative"))
+        # An upload named like the derivative is stored under its own hash
+        uploaded = default_storage.save(variant, ContentFile(b"impostor"))
+        self.assertNotEqual(uploaded, variant)
+        with default_storage.open(variant) as stored:
+            self.assertEqual(stored.read(), b"derivative")
+        with self.assertRaises(ValueError):
+            default_storage.save_variant('project_images/shot.w640.webp', ContentFile(b"impostor"))
+
+    def test_derivatives_keep_their_names(self):
+        name = ProjectImage.objects.create(
+            project=Project.objects.create(title="Gallery", description="Desc"), image=make_image(700, 350),
+        ).image.name
+        run_pending_jobs()
+        self.assertTrue(is_hashed_name(name))
+        self.assertTrue(default_storage.exists(derivative_name(name, 320, 'png')))
+
+    def test_rehash_media_rewrites_rows_and_merges_duplicates(self):
+        plain = FileSystemStorage(location=self.media_root)
+        plain.save('project_images/a.png', ContentFile(b"duplicate"))
+        plain.save('project_images/b.png', ContentFile(b"duplicate"))
+        plain.save(derivative_name('project_images/a.png', 320, 'png'), ContentFile(b"small"))
+        project = Project.objects.create(title="Old", description="Desc", image='project_images/a.png')
+        gallery = ProjectImage.objects.create(project=project, image='project_images/b.png')
+        missing = ProjectImage.objects.create(project=project, image='project_images/gone.png')
+        Project.objects.filter(pk=project.pk).update(updated_at=timezone.now() - timezone.timedelta(days=1))
+
+        out = StringIO()
+        # A read per model and one UPDATE per model with changes
+        with self.assertNumQueries(9):
+            call_command('rehash_media', '--delete-old', stdout=out, stderr=StringIO())
+        self.assertIn('Rehashed 2 files into 1 (1 duplicates), updated 2 rows, 1 missing', out.getvalue())
+
+        project.refresh_from_db()
+        gallery.refresh_from_db()
+        missing.refresh_from_db()
+        name = f'project_images/{hashlib.sha256(b"duplicate").hexdigest()[:32]}.png'
+        self.assertEqual(project.image.name, name)
+        self.assertEqual(gallery.image.name, name)
+        self.assertEqual(missing.image.name, 'project_images/gone.png')
+        self.assertGreater(project.updated_at, timezone.now() - timezone.timedelta(hours=1))
+        self.assertTrue(plain.exists(derivative_name(name, 320, 'png')))
+        self.assertFalse(plain.exists('project_images/a.png'))
+        self.assertFalse(plain.exists(derivative_name('project_images/a.png', 320, 'png')))
+
+        # Already hashed names are left alone
+        out = StringIO()
+        call_command('rehash_media', stdout=out, stderr=StringIO())
+        self.assertIn('Rehashed 0 files', out.getvalue())
+
+    def test_rehash_media_keeps_old_files_under_per_process_caches(self):
+        plain = FileSystemStorage(location=self.media_root)
+        plain.save('project_images/a.png', ContentFile(b"original"))
+        project = Project.objects.create(title="Old", description="Desc", image='project_images/a.png')
+        locmem = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        with override_settings(CACHES={'default': locmem, 'pages': locmem}):
+            with self.assertRaisesMessage(CommandError, 'needs shared caches'):
+                call_command('rehash_media', '--delete-old', stdout=StringIO())
+            self.assertTrue(plain.exists('project_images/a.png'))
+            # Without --delete-old the rows move and the old file stays
+            call_command('rehash_media', stdout=StringIO())
+        project.refresh_from_db()
+        self.assertNotEqual(project.image.name, 'project_images/a.png')
+        self.assertTrue(plain.exists('project_images/a.png'))
+
+
+@portfolio_test_settings
+class CompressionTests(TestCase):
+    def setUp(self):
+        caches[PAGE_CACHE_ALIAS].clear()
+        self.project = Project.objects.create(title="Compressed", description="Desc " * 100)
+        self.url = reverse('project_detail', kwargs={'project_id': self.project.pk})
+
+    def test_negotiation(self):
+        self.assertEqual(negotiate('gzip, deflate'), 'gzip')
+        self.assertEqual(negotiate('br;q=0, gzip;q=0.5'), 'gzip')
+        self.assertIsNone(negotiate('identity'))
+        self.assertIsNone(negotiate('gzip;q=0'))
+        self.assertEqual(negotiate('*'), ENCODINGS[0])
+
+    def test_pages_are_gzipped_with_a_weak_etag(self):
+        plain = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response['ETag'], f"W/{plain['ETag']}")
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    @skipIf(brotli is None, "brotli isn't installed")
+    def test_brotli_preferred(self):
+        plain = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), plain.content)
+
+    def test_compressed_once_per_content_version(self):
+        with mock.patch('portfolio.compression.compress', wraps=compress) as compressing:
+            first = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip').content
+            self.assertEqual(self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip').content, first)
+            self.assertEqual(compressing.call_count, 1)
+            self.project.title = "Recompressed"
+            self.project.save()
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(compressing.call_count, 2)
+        self.assertIn(b"Recompressed", gzip.decompress(response.content))
+
+    def test_unversioned_etags_compressed_per_request(self):
+        # ConditionalGetMiddleware hashes the body of search results
+        url = reverse('project_search') + '?q=compressed'
+        with mock.patch('portfolio.compression.compress', wraps=compress) as compressing:
+            for _ in range(2):
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+                self.assertTrue(response.has_header('ETag'))
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(compressing.call_count, 2)
+        self.assertTrue(all(call.args[2:] == () for call in compressing.call_args_list))
+
+    def test_streaming_responses_compressed_chunk_by_chunk(self):
+        chunks = [b"<p>" + b"chunk " * 100 + b"</p>"] * 3
+        middleware = CompressionMiddleware(lambda request: StreamingHttpResponse(iter(chunks)))
+        response = middleware(RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip'))
+        compressed = list(response.streaming_content)
+        self.assertEqual(len(compressed), 4)
+        self.assertEqual(gzip.decompress(b"".join(compressed)), b"".join(chunks))
+        self.assertFalse(response.has_header('Content-Length'))
+
+    def test_responses_setting_cookies_left_alone(self):
+        def view(request):
+            response = HttpResponse("<p>secret</p>" * 50)
+            response.set_cookie('csrftoken', 'secret')
+            return response
+        response = CompressionMiddleware(view)(RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+@portfolio_test_settings
+class StaticBundleTests(TestCase):
+    def test_critical_css_inlined_and_bundles_linked(self):
+        response = self.client.get(reverse('projects'))
+        self.assertContains(response, '--primary: #2563eb;')
+        self.assertContains(response, 'href="/static/css/base.css"')
+        self.assertContains(response, 'href="/static/css/projects.css"')
+        self.assertContains(response, 'src="/static/js/projects.js"')
+        self.assertNotContains(response, '.projects-hero-section {')
+
+    def test_collected_bundles_are_minified_under_their_hashed_names(self):
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root)
+        # The production storage, which portfolio_test_settings replaces
+        production = {**settings.STORAGES, 'staticfiles': {
+            'BACKEND': 'portfolio.storage.MinifiedCompressedManifestStaticFilesStorage',
+        }}
+        with override_settings(STATIC_ROOT=static_root, STORAGES=production):
+            call_command('collectstatic', interactive=False, verbosity=0, ignore_patterns=['admin', 'images', 'files'])
+            storage = storages['staticfiles']
+            for path, minify in [('css/base.css', minify_css), ('js/base.js', minify_js)]:
+                hashed = storage.stored_name(path)
+                self.assertNotEqual(hashed, path)
+                with storage.open(hashed) as collected:
+                    contents = collected.read().decode()
+                with open(os.path.join(settings.BASE_DIR, 'static', path), encoding='utf-8') as source:
+                    self.assertEqual(contents, minify(source.read()))
+                with storage.open(hashed + '.gz') as compressed:
+                    self.assertEqual(gzip.decompress(compressed.read()).decode(), contents)
+
+    def test_minify_css(self):
+        css = "/* Header */\n.nav a:hover,\n.nav > a {\n    color: red;\n    margin: 0 auto;\n}\n"
+        self.assertEqual(minify_css(css), ".nav a:hover,.nav>a{color:red;margin:0 auto}")
+
+    def test_minify_js_keeps_line_breaks_and_template_literals(self):
+        js = "// Menu\n    const a = 1\n\n    const b = `x\n    y`\n"
+        self.assertEqual(minify_js(js), "const a = 1\nconst b = `x\n    y`\n")
+
+
+@portfolio_test_settings
+@override_settings(PROFILING_TOKEN='let-me-in', PROFILING_SAMPLE_RATE=0)
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        caches[PAGE_CACHE_ALIAS].clear()
+        self.project = Project.objects.create(title="Profiled", description="Desc")
+        self.url = reverse('project_detail', kwargs={'project_id': self.project.pk})
+
+    def test_unprofiled_requests_untouched(self):
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    def test_header_opt_in_reports_breakdown(self):
+        with self.assertLogs('portfolio.profiling', 'INFO') as logs:
+            response = self.client.get(self.url, headers={'x-profile': 'let-me-in'})
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", view;dur=[\d.]+, render;dur=')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], self.url)
+        self.assertGreater(record['queries'], 0)
+        self.assertIn('render_ms', record)
+
+    def test_wrong_token_ignored(self):
+        response = self.client.get(self.url, headers={'x-profile': 'guess'})
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    async def test_async_view_queries_counted(self):
+        with self.assertLogs('portfolio.profiling', 'INFO') as logs:
+            await self.async_client.get(self.url, headers={'x-profile': 'let-me-in'})
+        self.assertGreater(json.loads(logs.records[0].getMessage())['queries'], 0)
+
+    def test_slow_requests_keep_rotating_cprofile_dumps(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with override_settings(PROFILING_PROFILE_DIR=directory, PROFILING_SLOW_MS=0, PROFILING_MAX_PROFILES=1):
+            with self.assertLogs('portfolio.profiling', 'INFO'):
+                self.client.get(self.url, headers={'x-profile': 'let-me-in'})
+                time.sleep(0.01)
+                self.client.get(reverse('projects'), headers={'x-profile': 'let-me-in'})
+        dumps = os.listdir(directory)
+        self.assertEqual(len(dumps), 1)
+        self.assertIn('GET-projects-', dumps[0])
+
+
+@portfolio_test_settings
+class QueryBudgetTests(TestCase):
+    """Every public page stays within its @query_budget as the data grows"""
+    SCALES = [1, 30, 300]
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def budgeted_urls(self):
+        newest = Project.objects.first()
+        technology = Technology.objects.filter(projects=newest).first()
+        cursor = self.client.get(reverse('projects_json')).json()['next_cursor']
+        detail = {'project_id': newest.pk}
+        return [
+            reverse('index'),
+            reverse('projects'),
+            f"{reverse('projects')}?technology={technology.slug}&year={newest.created_at.year}",
+            f"{reverse('projects')}?cursor={cursor}" if cursor else reverse('projects'),
+            reverse('projects_json'),
+            f"{reverse('project_search')}?q=tracker",
+            reverse('project_detail', kwargs=detail),
+            reverse('api_projects'),
+            f"{reverse('api_projects')}?fields=title,technologies,images,related",
+            reverse('api_project', kwargs=detail),
+            reverse('api_profile'),
+        ]
+
+    def assert_within_budgets(self):
+        for url in self.budgeted_urls():
+            budget = view_budget(resolve(url.split('?')[0]).func)
+            self.assertIsNotNone(budget, f"{url} has no @query_budget")
+            # Templates compile on first use; the budget is for the steady
+            # state with cold data caches
+            self.client.get(url)
+            caches['default'].clear()
+            caches[PAGE_CACHE_ALIAS].clear()
+            with record_queries() as log:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            # Query counts only; time depends on the machine running the
+            # tests and is left to the runtime log and the benchmark
+            self.assertLessEqual(
+                len(log.queries), budget.queries,
+                f"{url} ran {len(log.queries)} queries, budget {budget.queries}:\n"
+                f"{json.dumps(log.report(), indent=2)}",
+            )
+
+    def test_budgets_hold_at_every_scale(self):
+        for scale in self.SCALES:
+            with self.subTest(scale=scale):
+                call_command('populate_data', scale=scale, images_per_project=3, stdout=StringIO())
+                self.assert_within_budgets()
+
+    def test_template_queries_are_attributed_to_their_line(self):
+        Project.objects.create(title="Budgeted", description="Desc")
+        template = Template(
+            "{% for project in projects %}\n{{ project.images.count }}{% endfor %}",
+            origin=Origin(name='inline', template_name='inline.html'),
+        )
+        with record_queries() as log:
+            template.render(Context({'projects': Project.objects.all()}))
+        origins = [origin for _, _, origin in log.queries]
+        self.assertEqual(origins[0][0], 'inline.html:1')
+        self.assertEqual(origins[1][0], 'inline.html:2')
+        self.assertRegex(origins[1][1], r'^portfolioapp/tests\.py:\d+ in test_template_queries')
+
+    def test_runtime_logging_of_requests_over_budget(self):
+        Project.objects.create(title="Budgeted", description="Desc")
+        # No time limits, which a slow machine could break
+        queries = ProjectsListView.query_budget.queries
+        with override_settings(QUERY_BUDGET_LOGGING=True):
+            with mock.patch.object(ProjectsListView, 'query_budget', Budget(queries=queries, ms=math.inf)):
+                with self.assertNoLogs('portfolio.budgets'):
+                    self.client.get(reverse('projects'))
+            with mock.patch.object(ProjectsListView, 'query_budget', Budget(queries=1, ms=math.inf)):
+                with self.assertLogs('portfolio.budgets', 'WARNING') as logs:
+                    self.client.get(reverse('projects'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'projects')
+        self.assertIn(f"{record['query_count']} queries, budget 1", record['over_budget'])
+        origins = [origin for query in record['queries'] for origin in query['origin']]
+        self.assertTrue(any(origin.startswith('portfolioapp/views.py:') for origin in origins), origins)
+
+    def test_logging_off_by_default(self):
+        Project.objects.create(title="Budgeted", description="Desc")
+        with mock.patch.object(ProjectsListView, 'query_budget', Budget(queries=0, ms=0)):
+            with self.assertNoLogs('portfolio.budgets'):
+                self.client.get(reverse('projects'))
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def read_alias(self, request):
+        return replica_reads(lambda request: PrimaryReplicaRouter().db_for_read(Project))(request)
+
+    def test_public_views_read_from_replica(self):
+        self.assertEqual(self.read_alias(RequestFactory().get('/')), 'replica')
+
+    def test_other_reads_and_all_writes_use_primary(self):
+        router = PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(Project), 'default')
+        self.assertEqual(router.db_for_write(Project), 'default')
+
+    def test_only_primary_migrated(self):
+        router = PrimaryReplicaRouter()
+        self.assertTrue(router.allow_migrate('default', 'portfolioapp', 'project'))
+        self.assertFalse(router.allow_migrate('replica', 'portfolioapp', 'project'))
+
+    def test_reads_in_transaction_stay_on_primary(self):
+        with mock.patch.object(connection, 'in_atomic_block', True):
+            self.assertEqual(self.read_alias(RequestFactory().get('/')), 'default')
+
+    def test_browser_that_wrote_sticks_to_primary(self):
+        middleware = primary_stickiness_middleware(lambda request: HttpResponse())
+        response = middleware(RequestFactory().post('/admin/portfolioapp/project/1/change/'))
+        request = RequestFactory().get('/')
+        request.COOKIES = {name: morsel.value for name, morsel in response.cookies.items()}
+        self.assertEqual(self.read_alias(request), 'default')
+
+    def test_expired_sticky_cookie_ignored(self):
+        request = RequestFactory().get('/')
+        request.COOKIES[STICKY_COOKIE] = '1'
+        self.assertEqual(self.read_alias(request), 'replica')
+
+
+@skipIf(
+    settings.DATABASES['replica'].get('TEST', {}).get('MIRROR'),
+    "needs DATABASE_REPLICA_URL pointing at a separate database",
+)
+@portfolio_test_settings
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Run with two SQLite files standing in for primary and replica:
+    DATABASE_URL=sqlite:///primary.sqlite3 DATABASE_REPLICA_URL=sqlite:///replica.sqlite3
+
+    Not a TestCase: reads inside its per-test transaction stay on the primary.
+    """
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The router keeps migrate off the replica; copy the migrated
+        # primary over it, as replication would
+        for alias in cls.databases:
+            connections[alias].ensure_connection()
+        connections['default'].connection.backup(connections['replica'].connection)
+
+    def setUp(self):
+        caches[PAGE_CACHE_ALIAS].clear()
+        # Written to the primary only; the replica hasn't caught up
+        Project.objects.create(title="Fresh Project", description="Desc")
+
+    def test_public_pages_read_the_replica(self):
+        self.assertNotContains(self.client.get(reverse('projects')), "Fresh Project")
+
+    def test_sticky_browser_reads_the_primary(self):
+        self.client.cookies[STICKY_COOKIE] = str(time.time() + 60)
+        self.assertContains(self.client.get(reverse('projects')), "Fresh Project")
+
+    def test_sticky_browser_replaces_pages_cached_from_the_replica(self):
+        # The index only lists featured projects
+        Project.objects.update(featured=True)
+        self.assertNotContains(self.client.get(reverse('index')), "Fresh Project")
+        self.assertEqual(self.client.get(reverse('projects')).context['project_count'], 0)
+        self.client.cookies[STICKY_COOKIE] = str(time.time() + 60)
+        self.assertContains(self.client.get(reverse('index')), "Fresh Project")
+        self.assertEqual(self.client.get(reverse('projects')).context['project_count'], 1)
+        # Everyone gets the primary's render from then on
+        del self.client.cookies[STICKY_COOKIE]
+        self.assertContains(self.client.get(reverse('index')), "Fresh Project")
+        self.assertEqual(self.client.get(reverse('projects')).context['project_count'], 1)
+
+
+class SQLiteTuningTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connection_pragmas(self):
+        # synchronous=NORMAL is 1; a negative cache_size is in KiB
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('cache_size'), -65536)
+
+
+class PopulateDataTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def populate(self, seed=0):
+        call_command('populate_data', scale=40, seed=seed, images_per_project=2, stdout=StringIO())
+        return list(Project.objects.filter(image__startswith='synthetic/').order_by('created_at').values_list(
+            'title', 'short_description', 'image', 'created_at',
+        ))
+
+    def test_scale_generates_projects_with_technologies_and_images(self):
+        self.assertEqual(len(self.populate()), 40)
+        synthetic = Project.objects.filter(image__startswith='synthetic/')
+        self.assertEqual(ProjectImage.objects.filter(project__in=synthetic).count(), 80)
+        self.assertFalse(synthetic.filter(technologies__isnull=True).exists())
+        self.assertTrue(RelatedProject.objects.exists())
+
+    def test_same_seed_generates_the_same_data(self):
+        first = self.populate()
+        self.assertEqual(self.populate(), first)
+        self.assertNotEqual(self.populate(seed=1), first)
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 # Remove app_name if it's causing issues, or use it consistently
 # app_name = 'portfolioapp'
@@ -8,8 +8,15 @@ urlpatterns = [
     # Class-based views
     path('', views.IndexView.as_view(), name='index'),
    path('projects/', views.ProjectsListView.as_view(), name='projects'),
+   path('projects/json/', views.projects_json, name='projects_json'),
+   path('projects/search/', views.ProjectSearchView.as_view(), name='project_search'),
      path('projects/<int:project_id>/', views.ProjectDetailView.as_view(), name='project_detail'),
      path('projects/<int:project_id>/images/', views.manage_project_images, name='manage_project_images'),
+
+    # Read-only JSON API, see api.py
+    path('api/projects/', api.project_list, name='api_projects'),
+    path('api/projects/<int:project_id>/', api.project_detail, name='api_project'),
+    path('api/profile/', api.profile, name='api_profile'),
     
     # Alternative: Function-based views (use one or the other)
     # path('', views.index, name='index'),
@@ -1,93 +1,283 @@
+import asyncio
 
 from django.shortcuts import render, get_object_or_404
 from django.views.generic import ListView, DetailView, TemplateView
-from .models import Project, ProjectImage, Skill, Experience, Education, Certification
+from .models import (
+    Project, ProjectImage, ProjectTechnology, RelatedProject, Technology,
+    Skill, Experience, Education, Certification,
+)
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView
 from django.urls import reverse
+from django.http import Http404, JsonResponse
+from django.utils.http import urlencode
+from django.utils.decorators import method_decorator
+from portfolio.budgets import query_budget
+from portfolio.routers import is_sticky, replica_reads
+from .cache import cache_public_page, revalidated
+from .conditional import conditional_page
+from .facets import filter_projects, project_facets
+from .forms import ProjectFilterForm, SearchForm
+from .images import thumbnail_url
+from .pagination import paginate_by_cursor
+from .search import search_projects
 
 
+# Your personal data, shown on the index page and served by the API
+PERSONAL_INFO = {
+    'name': 'Pranav C',
+    'title': 'Full Stack Web Developer (Python Django / React)',
+    'phone': '+917736707020',
+    'email': 'pranavc493@gmail.com',
+    'location': 'India',
+    'github': 'https://github.com/pranavratheesh',
+    'summary': 'Recent B.Sc. Computer Science graduate with a strong foundation in Python, Django, HTML, CSS, JavaScript, API integration, and SQL. Completed internships at Luminar Technolab and Tech By Heart, gaining practical experience in full-stack web development and backend integration.'
+}
+
+
+def index_content():
+    return [
+        Project.objects.all(), ProjectTechnology.objects.all(), Technology.objects.all(),
+        Skill.objects.all(), Experience.objects.all(), Education.objects.all(),
+        Certification.objects.all(),
+    ]
+
+
+def profile_content():
+    return [
+        Skill.objects.all(), Experience.objects.all(), Education.objects.all(),
+        Certification.objects.all(),
+    ]
+
+
+def projects_content():
+    return [Project.objects.all(), ProjectTechnology.objects.all(), Technology.objects.all()]
+
+
+def project_detail_content(project_id):
+    related_ids = RelatedProject.objects.filter(project_id=project_id).values('related_id')
+    return [
+        Project.objects.filter(id=project_id),
+        ProjectImage.objects.filter(project_id=project_id),
+        ProjectTechnology.objects.filter(project_id=project_id),
+        Technology.objects.filter(projects=project_id),
+        RelatedProject.objects.filter(project_id=project_id),
+        Project.objects.filter(id__in=related_ids),
+    ]
+
+
+def project_gallery(project):
+    """
+    The detail page's gallery, built once from the prefetched images:
+    ``{'images': [{'url', 'thumbnail_url', 'caption'}, ...], 'hero': the
+    first image or None, 'count': n}``. A project without gallery images
+    shows its cover image instead.
+    """
+    images = [
+        {'url': image.image.url, 'thumbnail_url': thumbnail_url(image.image), 'caption': image.caption}
+        for image in project.images.all()
+        if image.image
+    ]
+    if not images and project.image:
+        images = [{'url': project.image.url, 'thumbnail_url': thumbnail_url(project.image), 'caption': ''}]
+    return {'images': images, 'hero': images[0] if images else None, 'count': len(images)}
+
+
+async def fetch(queryset):
+    """Evaluate ``queryset`` (and its prefetches) without blocking the event loop"""
+    return [obj async for obj in queryset]
+
+
+# Validators, the six sections and one prefetch
+@query_budget(queries=8, ms=150)
+# Serve the whole rendered page from the page cache; it's cleared by the
+# signal handlers in signals.py whenever portfolio data changes, and
+# browsers that just wrote get a fresh render from the primary. On a miss
+# the validators are checked first, and ConditionalGetMiddleware answers
+# revalidations of cached copies. The page cache also gives the response a
+# max-age of the cache timeout, but only the server's copy is cleared on
+# edits, so clients are told to revalidate every time instead. Decorated on
+# get() because the async handler, not dispatch(), is the coroutine
+@method_decorator(
+    [
+        replica_reads,
+        revalidated,
+        cache_public_page,
+        conditional_page(index_content),
+    ],
+    name='get',
+)
 class IndexView(TemplateView):
     template_name = 'main/index.html'
     
+    def get_sections(self):
+        return {
+            'featured_projects': Project.objects.filter(featured=True).prefetch_related('technologies')[:3],
+            'projects': Project.objects.all()[:6],
+            'skills': Skill.objects.all(),
+            'experiences': Experience.objects.all().order_by('-id'),
+            'education': Education.objects.all(),
+            'certifications': Certification.objects.all(),
+        }
+    
+    async def get(self, request, *args, **kwargs):
+        # The sections are independent; under ASGI the worker serves other
+        # requests while they load
+        sections = self.get_sections()
+        results = await asyncio.gather(*(fetch(queryset) for queryset in sections.values()))
+        context = self.get_context_data(**dict(zip(sections, results)), **kwargs)
+        return self.render_to_response(context)
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
-        # Your personal data
-        personal_info = {
-            'name': 'Pranav C',
-            'title': 'Full Stack Web Developer (Python Django / React)',
-            'phone': '+917736707020',
-            'email': 'pranavc493@gmail.com',
-            'location': 'India',
-            'github': 'https://github.com/pranavratheesh',
-            'summary': 'Recent B.Sc. Computer Science graduate with a strong foundation in Python, Django, HTML, CSS, JavaScript, API integration, and SQL. Completed internships at Luminar Technolab and Tech By Heart, gaining practical experience in full-stack web development and backend integration.'
-        }
-        
-        context['personal_info'] = personal_info
-        
-        # Get projects with their first image for the homepage
-        featured_projects = Project.objects.filter(featured=True)[:3]
-        all_projects = Project.objects.all()[:6]
-        
-        context['featured_projects'] = featured_projects
-        context['projects'] = all_projects
-        context['skills'] = Skill.objects.all()
-        context['experiences'] = Experience.objects.all().order_by('-id')
-        context['education'] = Education.objects.all()
-        context['certifications'] = Certification.objects.all()
-        
+        context['personal_info'] = PERSONAL_INFO
         return context
 
 
+# Validators, one page, its technologies and, until cached, three facet
+# aggregates
+@query_budget(queries=7, ms=250)
+@method_decorator([replica_reads, conditional_page(projects_content)], name='dispatch')
 class ProjectsListView(ListView):
     model = Project
     template_name = 'main/projects.html'
     context_object_name = 'projects'
+    paginate_by = 12
+    
+    def get_filters(self):
+        """Filters picked with ?technology=, ?year= and ?featured=; invalid ones are ignored"""
+        self.filter_form = ProjectFilterForm(self.request.GET)
+        return self.filter_form.filters()
+    
+    def get_base_queryset(self):
+        # Prefetch technologies so the cards don't issue a query each
+        return filter_projects(Project.objects.prefetch_related('technologies'), **self.filters)
     
     def get_queryset(self):
-        # Get all projects, ordered by creation date (newest first)
-        # Prefetch related images for performance
-        return Project.objects.all().order_by('-created_at')
+        # One page of matching projects, newest first, starting after ?cursor=
+        self.filters = self.get_filters()
+        projects, self.next_cursor = paginate_by_cursor(
+            self.get_base_queryset(), self.request.GET.get('cursor'), self.paginate_by
+        )
+        for project in projects:
+            # Counted from the prefetched rows rather than a GROUP BY over
+            # every project
+            project.technology_count = len(project.technologies.all())
+        return projects
+    
+    def paginate_queryset(self, queryset, page_size):
+        # get_queryset already returns a single keyset page
+        return None, None, queryset, self.next_cursor is not None
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Add featured projects to context
-        context['featured_projects'] = Project.objects.filter(featured=True).order_by('-created_at')
+        context['next_cursor'] = self.next_cursor
+        context['is_first_page'] = not self.request.GET.get('cursor')
+        # Counts per filter value; cached until projects change
+        facets = project_facets(**self.filters, refresh=is_sticky(self.request))
+        featured = self.filters['featured']
+        context['filter_form'] = self.filter_form
+        context['filters'] = self.filters
+        context['facets'] = facets
+        context['project_count'] = (
+            facets['featured'] + facets['not_featured'] if featured is None
+            else facets['featured'] if featured else facets['not_featured']
+        )
+        # Featured projects come from the rows already loaded for the page
+        context['featured_projects'] = [
+            project for project in context['projects'] if project.featured
+        ]
+        return context
+
+
+@query_budget(queries=2, ms=100)
+@replica_reads
+def projects_json(request):
+    """Cursor-paginated JSON variant of the projects listing, with the same filters"""
+    view = ProjectsListView()
+    view.setup(request)
+    projects = view.get_queryset()
+    next_url = None
+    if view.next_cursor:
+        next_url = f"{reverse('projects_json')}?{urlencode({**request.GET.dict(), 'cursor': view.next_cursor})}"
+    return JsonResponse({
+        'results': [
+            {
+                'id': project.id,
+                'title': project.title,
+                'short_description': project.short_description,
+                'image': project.image.url if project.image else None,
+                'project_url': project.project_url,
+                'github_url': project.github_url,
+                'featured': project.featured,
+                'created_at': project.created_at.isoformat(),
+                'technologies': project.get_technologies_list(),
+                'url': reverse('project_detail', kwargs={'project_id': project.id}),
+            }
+            for project in projects
+        ],
+        'next_cursor': view.next_cursor,
+        'next': next_url,
+    })
+
+
+# The ranked hits, their projects and technologies
+@query_budget(queries=3, ms=100)
+@method_decorator(replica_reads, name='dispatch')
+class ProjectSearchView(TemplateView):
+    """Ranked full-text search over projects, see search.py"""
+    template_name = 'main/search.html'
+    paginate_by = 12
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        form = SearchForm(self.request.GET)
+        query = form.cleaned_data['q'].strip() if form.is_valid() else ''
+        try:
+            page = max(int(self.request.GET.get('page', 1)), 1)
+        except ValueError:
+            page = 1
+
+        results, has_next = search_projects(query, page, self.paginate_by) if query else ([], False)
+        context.update({
+            'form': form,
+            'query': query,
+            'results': results,
+            'page': page,
+            'previous_page': page - 1 if page > 1 else None,
+            'next_page': page + 1 if has_next else None,
+        })
         return context
 
 
+# Validators, the project, its images, technologies and related projects
+@query_budget(queries=5, ms=100)
+@method_decorator([replica_reads, conditional_page(project_detail_content)], name='get')
 class ProjectDetailView(DetailView):
     model = Project
     template_name = 'main/project_detail.html'
     context_object_name = 'project'
     pk_url_kwarg = 'project_id'
     
-    def get_object(self):
-        """Get the project object or return 404"""
+    async def get(self, request, *args, **kwargs):
+        """Load the project and its related projects concurrently"""
         project_id = self.kwargs.get('project_id')
-        # Get project with prefetched images for better performance
-        project = get_object_or_404(
-            Project.objects.prefetch_related('images'), 
-            id=project_id
+        try:
+            self.object, related = await asyncio.gather(
+                # Get project with prefetched images for better performance
+                Project.objects.prefetch_related('images', 'technologies').aget(id=project_id),
+                # Related projects are precomputed by related.py; one lookup
+                # on the (project, rank) index
+                fetch(RelatedProject.objects.filter(project_id=project_id).select_related('related')),
+            )
+        except Project.DoesNotExist:
+            raise Http404("No project found matching the query")
+        context = self.get_context_data(
+            object=self.object,
+            related_projects=[link.related for link in related],
+            gallery=project_gallery(self.object),
         )
-        return project
-    
-    def get_context_data(self, **kwargs):
-        """Add extra context data"""
-        context = super().get_context_data(**kwargs)
-        project = self.object
-        
-        # Get all images for this project (already prefetched)
-        # They're available in template as project.images.all()
-        
-        # Add related projects (exclude current project)
-        # Prefetch images for related projects too
-        context['related_projects'] = Project.objects.exclude(
-            id=project.id
-        ).prefetch_related('images')[:3]
-        
-        return context
+        return self.render_to_response(context)
 
 
 # Add these helper views for better UX
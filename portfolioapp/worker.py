@@ -0,0 +1,21 @@
+"""
+Entry points for the run_worker process pool.
+
+Pool children are spawned from a clean interpreter and unpickle these
+functions before Django is set up, so nothing here may import models at
+module level.
+"""
+
+
+def setup_child():
+    import django
+    django.setup()
+
+
+def run_job(job_id):
+    from django.db import connections
+    from .jobs import execute
+    try:
+        return execute(job_id)
+    finally:
+        connections.close_all()
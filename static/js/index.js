@@ -0,0 +1,264 @@
+var swiper = new Swiper(".hero-swiper", {
+    loop: true,
+    autoplay: {
+        delay: 5000,
+        disableOnInteraction: false
+    },
+    pagination: {
+        el: ".swiper-pagination",
+        clickable: true,
+        dynamicBullets: true
+    },
+    navigation: {
+        nextEl: ".swiper-button-next",
+        prevEl: ".swiper-button-prev",
+    },
+    speed: 1000,
+    effect: "fade",
+    fadeEffect: {
+        crossFade: true
+    },
+    parallax: true,
+    grabCursor: true,
+    keyboard: {
+        enabled: true,
+    }
+});
+document.addEventListener('DOMContentLoaded', function () {
+    // Filter functionality
+    const filterBtns = document.querySelectorAll('.filter-btn');
+    const projectCards = document.querySelectorAll('.project-card');
+
+    filterBtns.forEach(btn => {
+        btn.addEventListener('click', function () {
+            // Remove active class from all buttons
+            filterBtns.forEach(b => b.classList.remove('active'));
+            // Add active class to clicked button
+            this.classList.add('active');
+
+            const filter = this.dataset.filter;
+
+            // Filter project cards
+            projectCards.forEach(card => {
+                if (filter === 'all' || card.dataset.category === filter) {
+                    card.style.display = 'block';
+                    setTimeout(() => {
+                        card.style.opacity = '1';
+                        card.style.transform = 'translateY(0)';
+                    }, 100);
+                } else {
+                    card.style.opacity = '0';
+                    card.style.transform = 'translateY(20px)';
+                    setTimeout(() => {
+                        card.style.display = 'none';
+                    }, 300);
+                }
+            });
+        });
+    });
+
+    // Tech tag animation
+    const techTags = document.querySelectorAll('.tech-tag');
+    techTags.forEach(tag => {
+        tag.addEventListener('mouseenter', function () {
+            this.style.transform = 'translateY(-2px) scale(1.05)';
+        });
+
+        tag.addEventListener('mouseleave', function () {
+            this.style.transform = 'translateY(0) scale(1)';
+        });
+    });
+
+    // Project card hover effects
+    projectCards.forEach(card => {
+        card.addEventListener('mouseenter', function () {
+            const titleLine = this.querySelector('.title-line');
+            if (titleLine) {
+                titleLine.style.width = '100%';
+            }
+        });
+
+        card.addEventListener('mouseleave', function () {
+            const titleLine = this.querySelector('.title-line');
+            if (titleLine) {
+                titleLine.style.width = '0';
+            }
+        });
+    });
+
+    // Details button functionality
+    const detailsBtns = document.querySelectorAll('.details-btn');
+    detailsBtns.forEach(btn => {
+        btn.addEventListener('click', function () {
+            const projectId = this.dataset.project;
+            alert('Project details for ID: ' + projectId + ' would open here.');
+        });
+    });
+
+    // Animate project cards on load
+    setTimeout(() => {
+        projectCards.forEach((card, index) => {
+            card.style.opacity = '0';
+            card.style.transform = 'translateY(30px)';
+
+            setTimeout(() => {
+                card.style.transition = 'opacity 0.5s ease, transform 0.5s ease';
+                card.style.opacity = '1';
+                card.style.transform = 'translateY(0)';
+            }, index * 100);
+        });
+    }, 500);
+});
+
+document.addEventListener('DOMContentLoaded', function () {
+    // Tech card animations
+    const techCards = document.querySelectorAll('.tech-card');
+
+    techCards.forEach((card, index) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(30px)';
+
+        setTimeout(() => {
+            card.style.transition = 'opacity 0.5s ease, transform 0.5s ease';
+            card.style.opacity = '1';
+            card.style.transform = 'translateY(0)';
+        }, index * 100);
+
+        // Hover effect enhancement
+        card.addEventListener('mouseenter', function () {
+            const icon = this.querySelector('.tech-icon');
+            if (icon) {
+                icon.style.transform = 'scale(1.1) rotate(5deg)';
+            }
+        });
+
+        card.addEventListener('mouseleave', function () {
+            const icon = this.querySelector('.tech-icon');
+            if (icon) {
+                icon.style.transform = 'scale(1) rotate(0)';
+            }
+        });
+    });
+
+    document.addEventListener('DOMContentLoaded', function () {
+        // Timeline item animations
+        const timelineItems = document.querySelectorAll('.timeline-item, .path-item');
+
+        const observer = new IntersectionObserver((entries) => {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) {
+                    entry.target.style.opacity = '1';
+                    entry.target.style.transform = 'translateY(0)';
+                }
+            });
+        }, { threshold: 0.1 });
+
+        timelineItems.forEach((item, index) => {
+            item.style.opacity = '0';
+            item.style.transform = 'translateY(20px)';
+            item.style.transition = 'opacity 0.4s ease, transform 0.4s ease';
+
+            setTimeout(() => {
+                observer.observe(item);
+            }, index * 100);
+        });
+
+        // Experience card hover effect
+        const experienceCards = document.querySelectorAll('.experience-card');
+        experienceCards.forEach(card => {
+            card.addEventListener('mouseenter', function () {
+                const dot = this.closest('.timeline-item').querySelector('.dot-core');
+                if (dot) {
+                    dot.style.transform = 'scale(1.5)';
+                }
+            });
+
+            card.addEventListener('mouseleave', function () {
+                const dot = this.closest('.timeline-item').querySelector('.dot-core');
+                if (dot) {
+                    dot.style.transform = 'scale(1)';
+                }
+            });
+        });
+
+        // Tag hover effect
+        const tags = document.querySelectorAll('.tag');
+        tags.forEach(tag => {
+            tag.addEventListener('mouseenter', function () {
+                this.style.color = '#fff';
+            });
+
+            tag.addEventListener('mouseleave', function () {
+                this.style.color = '';
+            });
+        });
+
+        // Learning path items
+        const pathItems = document.querySelectorAll('.path-item');
+        pathItems.forEach((item, index) => {
+            const line = item.querySelector('.path-line');
+            if (line) {
+                setTimeout(() => {
+                    line.style.width = '100%';
+                    line.style.transition = 'width 0.8s ease';
+                }, index * 200);
+            }
+        });
+
+        // Skill items hover
+        const skillItems = document.querySelectorAll('.skill-item');
+        skillItems.forEach(item => {
+            item.addEventListener('mouseenter', function () {
+                this.style.borderColor = 'rgba(255,255,255,0.1)';
+                this.style.transform = 'translateX(4px)';
+            });
+
+            item.addEventListener('mouseleave', function () {
+                this.style.borderColor = '';
+                this.style.transform = '';
+            });
+        });
+    });
+
+    // Skill tags interaction
+    const skillTags = document.querySelectorAll('.skill-tag');
+    skillTags.forEach(tag => {
+        tag.addEventListener('mouseenter', function () {
+            this.style.transform = 'translateY(-2px) scale(1.05)';
+        });
+
+        tag.addEventListener('mouseleave', function () {
+            this.style.transform = 'translateY(0) scale(1)';
+        });
+    });
+
+    // Framework tags interaction
+    const frameworkTags = document.querySelectorAll('.framework-tag');
+    frameworkTags.forEach(tag => {
+        tag.addEventListener('mouseenter', function () {
+            this.style.transform = 'translateY(-1px)';
+        });
+
+        tag.addEventListener('mouseleave', function () {
+            this.style.transform = 'translateY(0)';
+        });
+    });
+
+    // Timeline animation
+    const timelineItems = document.querySelectorAll('.timeline-item');
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.style.opacity = '1';
+                entry.target.style.transform = 'translateX(0)';
+            }
+        });
+    }, { threshold: 0.3 });
+
+    timelineItems.forEach((item, index) => {
+        item.style.opacity = '0';
+        item.style.transform = index % 2 === 0 ? 'translateX(-50px)' : 'translateX(50px)';
+        item.style.transition = 'opacity 0.5s ease, transform 0.5s ease';
+        observer.observe(item);
+    });
+});
@@ -0,0 +1,79 @@
+// Gallery data is defined inline by the template as projectImages/projectCaptions
+
+let currentImageIndex = 0;
+const mainImage = document.getElementById('main-image');
+const imageCaption = document.getElementById('image-caption');
+const thumbnailContainer = document.getElementById('thumbnail-container');
+
+// Function to change main image
+function changeImage(index) {
+    if (projectImages[index]) {
+        currentImageIndex = index;
+        mainImage.src = projectImages[index];
+
+        // Update caption
+        if (projectCaptions[index]) {
+            imageCaption.textContent = projectCaptions[index];
+            imageCaption.style.opacity = '1';
+        } else {
+            imageCaption.style.opacity = '0';
+        }
+
+        // Update active thumbnail
+        const thumbnails = thumbnailContainer.querySelectorAll('.thumbnail');
+        thumbnails.forEach((thumb, i) => {
+            if (i === index) {
+                thumb.classList.add('active');
+            } else {
+                thumb.classList.remove('active');
+            }
+        });
+
+        // Smooth fade effect
+        mainImage.style.opacity = '0';
+        setTimeout(() => {
+            mainImage.style.opacity = '1';
+        }, 100);
+    }
+}
+
+// Next image
+function nextImage() {
+    if (projectImages.length > 1) {
+        const nextIndex = (currentImageIndex + 1) % projectImages.length;
+        changeImage(nextIndex);
+    }
+}
+
+// Previous image
+function prevImage() {
+    if (projectImages.length > 1) {
+        const prevIndex = (currentImageIndex - 1 + projectImages.length) % projectImages.length;
+        changeImage(prevIndex);
+    }
+}
+
+// Keyboard navigation
+document.addEventListener('keydown', (e) => {
+    if (e.key === 'ArrowLeft') {
+        prevImage();
+    } else if (e.key === 'ArrowRight') {
+        nextImage();
+    }
+});
+
+// If you only have one image, hide navigation
+if (projectImages.length <= 1) {
+    const navButtons = document.querySelector('.gallery-nav');
+    if (navButtons) {
+        navButtons.style.display = 'none';
+    }
+}
+
+// Initialize caption on page load
+window.addEventListener('DOMContentLoaded', function() {
+    if (projectCaptions[0]) {
+        imageCaption.textContent = projectCaptions[0];
+        imageCaption.style.opacity = '1';
+    }
+});